@@ -60,4 +60,101 @@ def tarea_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
         "prioridad": row["prioridad"],
         "proyectoId": row["proyectoId"],
         "fecha_creacion": row["fecha_creacion"]
-    }
\ No newline at end of file
+    }
+
+# ERRORES DE ACCESO A DATOS <--LOS TRADUCE main.py A 404 / 409 / 400
+class NoEncontradoError(Exception):
+    pass
+
+class DuplicadoError(Exception):
+    pass
+
+class ProyectoInexistenteError(Exception):
+    pass
+
+def _una_fila(cur: sqlite3.Cursor):
+    # CONSUME TODO EL RETURNING (ASÍ LA SENTENCIA TERMINA ANTES DEL COMMIT)
+    filas = cur.fetchall()
+    return filas[0] if filas else None
+
+def _es_error_fk(error: sqlite3.IntegrityError) -> bool:
+    return "FOREIGN KEY" in str(error).upper()
+
+def _es_error_unique(error: sqlite3.IntegrityError) -> bool:
+    return "UNIQUE" in str(error).upper()
+
+
+# ESCRITURAS CON UNA SOLA SENTENCIA (INSERT/UPDATE/DELETE ... RETURNING)
+# EN VEZ DE SELECT DE EXISTENCIA + SELECT DE DUPLICADO + ESCRITURA + SELECT FINAL.
+# LA EXISTENCIA SE DEDUCE DE SI RETURNING DEVOLVIÓ UNA FILA, Y LOS DUPLICADOS /
+# PROYECTOS INEXISTENTES DE LAS RESTRICCIONES UNIQUE Y FOREIGN KEY.
+
+def insertar_proyecto(conn: sqlite3.Connection, nombre: str, descripcion: str, fecha: str) -> Dict[str, Any]:
+    try:
+        cur = conn.execute("""
+            INSERT INTO proyecto (nombre, descripcion, fecha_creacion)
+            VALUES (?, ?, ?)
+            RETURNING *
+        """, (nombre, descripcion, fecha))
+        return proyecto_to_dict(_una_fila(cur))
+    except sqlite3.IntegrityError as e:
+        if _es_error_unique(e):
+            raise DuplicadoError(nombre)
+        raise
+
+def actualizar_proyecto_db(conn: sqlite3.Connection, proyecto_id: int, nombre: str, descripcion: str) -> Dict[str, Any]:
+    try:
+        cur = conn.execute("""
+            UPDATE proyecto SET nombre = ?, descripcion = ?
+            WHERE id = ?
+            RETURNING *
+        """, (nombre, descripcion, proyecto_id))
+        fila = _una_fila(cur)
+    except sqlite3.IntegrityError as e:
+        if _es_error_unique(e):
+            raise DuplicadoError(nombre)
+        raise
+    if fila is None:
+        raise NoEncontradoError(proyecto_id)
+    return proyecto_to_dict(fila)
+
+def eliminar_proyecto_db(conn: sqlite3.Connection, proyecto_id: int) -> None:
+    # LAS TAREAS SE BORRAN POR ON DELETE CASCADE
+    cur = conn.execute("DELETE FROM proyecto WHERE id = ? RETURNING id", (proyecto_id,))
+    if _una_fila(cur) is None:
+        raise NoEncontradoError(proyecto_id)
+
+def insertar_tarea(conn: sqlite3.Connection, descripcion: str, estado: str, prioridad: str, proyecto_id: int, fecha: str) -> Dict[str, Any]:
+    try:
+        cur = conn.execute("""
+            INSERT INTO tarea (descripcion, estado, prioridad, proyectoId, fecha_creacion)
+            VALUES (?, ?, ?, ?, ?)
+            RETURNING *
+        """, (descripcion, estado, prioridad, proyecto_id, fecha))
+        return tarea_to_dict(_una_fila(cur))
+    except sqlite3.IntegrityError as e:
+        if _es_error_fk(e):
+            raise ProyectoInexistenteError(proyecto_id)
+        raise
+
+def actualizar_tarea_db(conn: sqlite3.Connection, tarea_id: int, descripcion: str, estado: str, prioridad: str, proyecto_id: int) -> Dict[str, Any]:
+    # SI LA TAREA NO EXISTE NO SE ACTUALIZA NINGUNA FILA (Y NO SE CHEQUEA LA FK)
+    try:
+        cur = conn.execute("""
+            UPDATE tarea SET descripcion = ?, estado = ?, prioridad = ?, proyectoId = ?
+            WHERE id = ?
+            RETURNING *
+        """, (descripcion, estado, prioridad, proyecto_id, tarea_id))
+        fila = _una_fila(cur)
+    except sqlite3.IntegrityError as e:
+        if _es_error_fk(e):
+            raise ProyectoInexistenteError(proyecto_id)
+        raise
+    if fila is None:
+        raise NoEncontradoError(tarea_id)
+    return tarea_to_dict(fila)
+
+def eliminar_tarea_db(conn: sqlite3.Connection, tarea_id: int) -> None:
+    cur = conn.execute("DELETE FROM tarea WHERE id = ? RETURNING id", (tarea_id,))
+    if _una_fila(cur) is None:
+        raise NoEncontradoError(tarea_id)
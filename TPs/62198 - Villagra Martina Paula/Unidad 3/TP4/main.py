@@ -76,16 +76,14 @@ def crear_proyecto(proyecto: ProyectoCreate):
 
     fecha = datetime.now().isoformat(timespec="seconds")
 
-    with get_db_connection() as conn:
-        cur = conn.execute("""
-            INSERT INTO proyecto (nombre, descripcion, fecha_creacion)
-            VALUES (?, ?, ?)
-        """, (proyecto.nombre.strip(), proyecto.descripcion.strip(), fecha))
-        new_id = cur.lastrowid
+    nombre = proyecto.nombre.strip()
+    descripcion = (proyecto.descripcion or "").strip()
 
-        cur = conn.execute("SELECT * FROM proyecto WHERE id = ?", (new_id,))
-        nueva = cur.fetchone()
-        return proyecto_to_dict(nueva)
+    with get_db_connection() as conn:
+        try:
+            return insertar_proyecto(conn, nombre, descripcion, fecha)
+        except DuplicadoError:
+            raise HTTPException(status_code=409, detail={"error": f"Ya existe un proyecto de nombre: {nombre}."})
 
 # MODIFICAR UN PROYECTO EXISTENTE POR ID
 @app.put("/proyectos/{proyecto_id}", response_model = ProyectoOut, status_code=status.HTTP_200_OK)
@@ -97,33 +95,23 @@ def actualizar_proyecto(proyecto_id : int, proyecto: ProyectoCreate):
         raise HTTPException(status_code=400, detail={"error": "El nombre no puede estar vacio"})
     
     with get_db_connection() as conn:
-        cur = conn.execute("SELECT * FROM proyecto WHERE id = ?", (proyecto_id,))
-        proyecto = cur.fetchone()
-        if not proyecto:
+        try:
+            return actualizar_proyecto_db(conn, proyecto_id, nombre, descripcion)
+        except NoEncontradoError:
             raise HTTPException(status_code=404, detail={"error": f"Proyecto con ID {proyecto_id} no encontrado."})
-        cur = conn.execute("SELECT * FROM proyecto WHERE nombre = ? AND id != ?", (nombre, proyecto_id,))
-        duplicado = cur.fetchall()
-        if duplicado:
+        except DuplicadoError:
             raise HTTPException(status_code=409, detail={"error": f"Ya existe un proyecto de nombre: {nombre}."})
-        
-        conn.execute("UPDATE proyecto SET nombre = ?, descripcion = ? WHERE id = ?", (nombre, descripcion, proyecto_id))
-        conn.commit()
-
-        cur = conn.execute("SELECT * FROM proyecto WHERE id = ?", (proyecto_id,))
-        actualizado = cur.fetchone()
-        return proyecto_to_dict(actualizado)
 
 # BORRAR UN PROYECTO Y SUS TAREAS POR ID DE PROYECTO
 @app.delete("/proyectos/{proyecto_id}", status_code=status.HTTP_204_NO_CONTENT)
 def eliminar_proyecto(proyecto_id : int):
     with get_db_connection() as conn:
-        cur = conn.execute("SELECT * FROM PROYECTO WHERE id = ?", (proyecto_id,))
-        proyecto = cur.fetchone()
-        if not proyecto:
+        try:
+            eliminar_proyecto_db(conn, proyecto_id)
+        except NoEncontradoError:
             raise HTTPException(status_code=404, detail={"error": f"Proyecto con ID {proyecto_id} no encontrado."})
-        conn.execute("DELETE FROM proyecto WHERE id = ?", (proyecto_id,))
-        conn.commit()
-        raise ({"mensaje": "Proyecto y tareas asociadas eliminadas correctamente."})
+    # 204 SIN CUERPO: PROYECTO Y TAREAS ASOCIADAS ELIMINADAS
+    return None
 
 
 """"----------------TAREAS----------------"""
@@ -280,20 +268,10 @@ def crear_tarea(tarea: TareaCreate):
     fecha = datetime.now().isoformat(timespec="seconds")
 
     with get_db_connection() as conn:
-        cur = conn.execute("SELECT id FROM proyecto WHERE id = ?", (tarea.proyectoId,))
-        proyecto = cur.fetchone()
-        if not proyecto:
+        try:
+            return insertar_tarea(conn, descripcion, tarea.estado, tarea.prioridad, tarea.proyectoId, fecha)
+        except ProyectoInexistenteError:
             raise HTTPException(status_code=400, detail={"error": f"No hay proyecto con id: {tarea.proyectoId}"})
-        
-        cur = conn.execute("""
-            INSERT INTO tarea (descripcion, estado, prioridad, proyectoId, fecha_creacion)
-            VALUES (?, ?, ?, ?, ?)
-        """, (descripcion, tarea.estado, tarea.prioridad, tarea.proyectoId, fecha))
-
-        new_id = cur.lastrowid
-        cur = conn.execute("SELECT * FROM tarea WHERE id = ?", (new_id,))
-        nueva = cur.fetchone()
-        return tarea_to_dict(nueva)
 
 # MODIFICAR UNA TAREA INCLUSO SU ID DE PROYECTO
 @app.put("/tareas/{tarea_id}", response_model = TareaOut, status_code=status.HTTP_200_OK)
@@ -311,33 +289,23 @@ def actualizar_tarea(tarea_id: int, tarea: TareaCreate):
         raise HTTPException(status_code=400, detail={"error": "La prioridad no puede estar vacia"})
     
     with get_db_connection() as conn:
-        cur = conn.execute("SELECT * FROM tarea WHERE id = ?", (tarea_id,))
-        tarea = cur.fetchone()
-        if not tarea:
+        try:
+            return actualizar_tarea_db(conn, tarea_id, descripcion, estado, prioridad, proyectoId)
+        except NoEncontradoError:
             raise HTTPException(status_code=404, detail={"error": f"No existe tarea: {tarea_id}"})
-        cur = conn.execute("SELECT * from proyecto WHERE id = ?", (proyectoId,))
-        proyecto = cur.fetchone()
-        if not proyecto:
+        except ProyectoInexistenteError:
             raise HTTPException(status_code=404, detail={"error": f"No existe el proyecto: {proyectoId} que desea modificar"})
 
-        conn.execute("UPDATE tarea SET descripcion = ?, estado = ?, prioridad = ?, proyectoId = ? WHERE id = ?", (descripcion, estado, prioridad, proyectoId, tarea_id))
-        conn.commit()
-
-        cur = conn.execute("SELECT * FROM tarea WHERE Id = ?", (tarea_id,))
-        actualizado = cur.fetchone()
-        return tarea_to_dict(actualizado)
-
 # ELIMINAR UNA TAREA
 @app.delete("/tareas/{tarea_id}", status_code=status.HTTP_204_NO_CONTENT)
 def eliminar_tarea(tarea_id: int):
     with get_db_connection() as conn:
-        cur = conn.execute("SELECT * FROM tarea WHERE id = ?", (tarea_id,))
-        tarea = cur.fetchone()
-        if not tarea:
+        try:
+            eliminar_tarea_db(conn, tarea_id)
+        except NoEncontradoError:
             raise HTTPException(status_code=404, detail={"error": f"No existe tarea con ID: {tarea_id}"})
-        conn.execute("DELETE FROM tarea WHERE id = ?", (tarea_id,))
-        conn.commit()
-        raise ({"mensaje": "Tarea eliminada correctamente."})
+    # 204 SIN CUERPO: TAREA ELIMINADA
+    return None
     
 # LISTAR ESTADISTICAS DE UN PROYECTO
 @app.get("/proyectos/{proyecto_id}/resumen")
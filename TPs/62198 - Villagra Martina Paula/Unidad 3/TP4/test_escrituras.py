@@ -0,0 +1,72 @@
+"""
+Tests de las escrituras con RETURNING (database.py) y de los códigos de error de main.py.
+Ejecutar desde esta carpeta con: python -m pytest test_escrituras.py -v
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import database
+from main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def db_temporal(tmp_path, monkeypatch):
+    """Cada test usa una BD nueva (no toca Tareas.db)"""
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "test.db"))
+    database.init_db()
+
+
+def crear_proyecto(nombre="Proyecto"):
+    respuesta = client.post("/proyectos", json={"nombre": nombre, "descripcion": "desc"})
+    assert respuesta.status_code == 201
+    return respuesta.json()["id"]
+
+
+def crear_tarea(proyecto_id):
+    respuesta = client.post("/tareas", json={"descripcion": "Tarea", "proyectoId": proyecto_id})
+    assert respuesta.status_code == 201
+    return respuesta.json()["id"]
+
+
+def test_id_inexistente_da_404():
+    proyecto_id = crear_proyecto()
+    assert client.put("/proyectos/999", json={"nombre": "Otro"}).status_code == 404
+    assert client.delete("/proyectos/999").status_code == 404
+    tarea = {"descripcion": "Tarea", "proyectoId": proyecto_id}
+    assert client.put("/tareas/999", json=tarea).status_code == 404
+    assert client.delete("/tareas/999").status_code == 404
+
+
+def test_proyecto_duplicado_da_409():
+    crear_proyecto("Proyecto A")
+    proyecto_id = crear_proyecto("Proyecto B")
+    assert client.post("/proyectos", json={"nombre": "Proyecto A"}).status_code == 409
+    assert client.put(f"/proyectos/{proyecto_id}", json={"nombre": "Proyecto A"}).status_code == 409
+    # Sin descripción también se puede crear
+    assert client.post("/proyectos", json={"nombre": "Proyecto C"}).status_code == 201
+
+
+def test_tarea_de_proyecto_inexistente():
+    respuesta = client.post("/tareas", json={"descripcion": "Tarea", "proyectoId": 999})
+    assert respuesta.status_code == 400
+    tarea_id = crear_tarea(crear_proyecto())
+    respuesta = client.put(f"/tareas/{tarea_id}", json={"descripcion": "Tarea", "proyectoId": 999})
+    assert respuesta.status_code == 404
+
+
+def test_eliminar_devuelve_204_y_borra_en_cascada():
+    proyecto_id = crear_proyecto()
+    tarea_1 = crear_tarea(proyecto_id)
+    crear_tarea(proyecto_id)
+
+    respuesta = client.delete(f"/tareas/{tarea_1}")
+    assert respuesta.status_code == 204 and respuesta.content == b""
+    assert client.delete(f"/tareas/{tarea_1}").status_code == 404
+
+    respuesta = client.delete(f"/proyectos/{proyecto_id}")
+    assert respuesta.status_code == 204 and respuesta.content == b""
+    assert client.get(f"/proyectos/{proyecto_id}").status_code == 404
+    assert client.get("/tareas").status_code == 404  # sin tareas: las del proyecto se borraron
@@ -0,0 +1,96 @@
+# Respuestas JSON serializadas una sola vez, para datos que casi no cambian.
+#
+# En vez de que FastAPI convierta y serialice la lista en cada request, se guardan
+# los bytes ya armados (y sus versiones comprimidas con gzip y brotli) junto con
+# un ETag fuerte. Si el cliente manda If-None-Match con ese ETag se responde 304
+# sin cuerpo. Cuando los datos cambian hay que llamar a actualizar().
+import gzip
+import hashlib
+import json
+
+from fastapi import Request, Response
+
+try:  # brotli es opcional: sin el paquete solo se ofrece gzip
+    import brotli
+except ImportError:
+    brotli = None
+
+TIPO_JSON = "application/json"
+
+
+def _codificaciones_aceptadas(accept_encoding: str) -> set:
+    """Codificaciones del header Accept-Encoding que el cliente acepta (q > 0)"""
+    aceptadas = set()
+    for parte in accept_encoding.split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        calidad = 1.0
+        parametro, _, valor = parametros.strip().partition("=")
+        if parametro.strip() == "q":
+            try:
+                calidad = float(valor)
+            except ValueError:
+                calidad = 0.0
+        if nombre and calidad > 0:
+            aceptadas.add(nombre.strip().lower())
+    return aceptadas
+
+
+def _etag_coincide(if_none_match: str, etags) -> bool:
+    """Comparación débil de If-None-Match (RFC 9110): se ignora el prefijo W/"""
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidato.strip().removeprefix("W/") in etags for candidato in if_none_match.split(","))
+
+
+class RespuestaCacheada:
+    """
+    Cuerpo JSON pre-serializado de un dato, con ETag y variantes comprimidas.
+
+    Args:
+        datos: Lo que devolvería el endpoint (tiene que poder pasar por json.dumps)
+        minimo_comprimir: Tamaño desde el cual vale la pena ofrecer versiones comprimidas
+    """
+
+    def __init__(self, datos, minimo_comprimir: int = 500):
+        self._minimo_comprimir = minimo_comprimir
+        self.actualizar(datos)
+
+    def actualizar(self, datos):
+        """Vuelve a serializar (llamar después de cada cambio de los datos)"""
+        # Mismo formato que el JSONResponse de FastAPI
+        cuerpo = json.dumps(datos, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+        variantes = {"identity": cuerpo}
+        if len(cuerpo) >= self._minimo_comprimir:
+            variantes["gzip"] = gzip.compress(cuerpo, compresslevel=9, mtime=0)
+            if brotli is not None:
+                variantes["br"] = brotli.compress(cuerpo, quality=11)
+        # ETag fuerte distinto por codificación (los bytes son distintos), como hace Apache
+        base = hashlib.sha256(cuerpo).hexdigest()[:32]
+        etags = {c: f'"{base}"' if c == "identity" else f'"{base}-{c}"' for c in variantes}
+        # Una sola asignación: un request nunca ve el cuerpo nuevo con el ETag viejo
+        self._actual = (variantes, etags)
+
+    @property
+    def etag(self) -> str:
+        """ETag de la versión sin comprimir"""
+        return self._actual[1]["identity"]
+
+    def responder(self, request: Request) -> Response:
+        """Respuesta para este request: 304, o el cuerpo en la mejor codificación aceptada"""
+        variantes, etags = self._actual
+
+        codificacion = "identity"
+        aceptadas = _codificaciones_aceptadas(request.headers.get("accept-encoding", ""))
+        for opcion in ("br", "gzip"):
+            if opcion in variantes and (opcion in aceptadas or "*" in aceptadas):
+                codificacion = opcion
+                break
+        encabezados = {"ETag": etags[codificacion], "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+
+        # Cualquier ETag de estos datos vale: el cliente pudo haber cambiado de codificación
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_coincide(if_none_match, etags.values()):
+            return Response(status_code=304, headers=encabezados)
+        if codificacion != "identity":
+            encabezados["Content-Encoding"] = codificacion
+        return Response(content=variantes[codificacion], media_type=TIPO_JSON, headers=encabezados)
@@ -0,0 +1,151 @@
+# Agenda leída de un archivo grande (NDJSON o CSV) sin cargarla entera en memoria.
+#
+# El archivo se mapea en memoria (mmap) y se arma un índice con la posición donde
+# empieza cada línea (un contacto por línea). Pedir el contacto i es leer y
+# decodificar solo esa línea. El índice se guarda al lado del archivo
+# (<archivo>.idx) y se reutiliza mientras el archivo no cambie, así que arrancar
+# con una agenda de varios GB es abrir dos archivos.
+import csv
+import json
+import mmap
+import os
+from array import array
+from typing import Iterator, List, Optional, Sequence
+
+_CABECERA_INDICE = 3  # tamaño y fecha de modificación del archivo, cantidad de líneas
+
+
+class ContactosArchivo(Sequence):
+    """
+    Secuencia de contactos (dicts) respaldada por un archivo .ndjson / .jsonl o .csv.
+
+    Se usa como la lista original: len(), contactos[i], for contacto in contactos.
+    En CSV la primera línea tiene los nombres de las columnas y los valores no
+    pueden tener saltos de línea; la edad se convierte a int.
+    """
+
+    def __init__(self, ruta: str, guardar_indice: bool = True):
+        self.ruta = ruta
+        self._csv = ruta.lower().endswith(".csv")
+        self._archivo = open(ruta, "rb")
+        tamanio = os.fstat(self._archivo.fileno()).st_size
+        # mmap no acepta archivos vacíos
+        self._datos = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ) if tamanio else b""
+        self._columnas: Optional[List[str]] = None
+        self._mapa_indice: Optional[mmap.mmap] = None
+        inicio = 0
+        if self._csv and tamanio:
+            fin = self._fin_de_linea(0)
+            self._columnas = next(csv.reader([self._datos[:fin].decode("utf-8-sig")]))
+            inicio = fin + 1
+        self._inicios = self._cargar_indice() or self._armar_indice(inicio, guardar_indice)
+
+    def cerrar(self):
+        if isinstance(self._inicios, memoryview):
+            self._inicios.release()
+            self._mapa_indice.close()
+        if isinstance(self._datos, mmap.mmap):
+            self._datos.close()
+        self._archivo.close()
+
+    # ==================== SECUENCIA ====================
+
+    def __len__(self) -> int:
+        return len(self._inicios)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self._decodificar(i) for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice de contacto fuera de rango")
+        return self._decodificar(indice)
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(len(self)):
+            yield self._decodificar(i)
+
+    def json_en_partes(self, por_parte: int = 1000) -> Iterator[bytes]:
+        """La agenda entera como un array JSON, en pedazos (para StreamingResponse).
+        En NDJSON las líneas se copian tal cual, sin decodificarlas"""
+        yield b"["
+        for desde in range(0, len(self), por_parte):
+            hasta = min(desde + por_parte, len(self))
+            if self._csv:
+                partes = [json.dumps(self._decodificar(i), ensure_ascii=False).encode() for i in range(desde, hasta)]
+            else:
+                partes = [self._linea(i) for i in range(desde, hasta)]
+            yield (b"," if desde else b"") + b",".join(partes)
+        yield b"]"
+
+    # ==================== INTERNOS ====================
+
+    def _fin_de_linea(self, inicio: int) -> int:
+        fin = self._datos.find(b"\n", inicio)
+        return len(self._datos) if fin == -1 else fin
+
+    def _linea(self, indice: int) -> bytes:
+        inicio = self._inicios[indice]
+        return self._datos[inicio:self._fin_de_linea(inicio)].rstrip(b"\r")
+
+    def _decodificar(self, indice: int) -> dict:
+        texto = self._linea(indice).decode("utf-8")
+        if not self._csv:
+            return json.loads(texto)
+        contacto = dict(zip(self._columnas, next(csv.reader([texto]))))
+        if contacto.get("edad", "").isdigit():
+            contacto["edad"] = int(contacto["edad"])
+        return contacto
+
+    def _ruta_indice(self) -> str:
+        return self.ruta + ".idx"
+
+    def _firma(self) -> List[int]:
+        estado = os.fstat(self._archivo.fileno())
+        return [estado.st_size, estado.st_mtime_ns]
+
+    def _cargar_indice(self):
+        """El índice guardado, si corresponde a este mismo archivo. También se mapea
+        en memoria en vez de leerlo: abrirlo no depende de su tamaño"""
+        try:
+            with open(self._ruta_indice(), "rb") as archivo:
+                cabecera = array("q")
+                cabecera.fromfile(archivo, _CABECERA_INDICE)
+                if list(cabecera[:2]) != self._firma():
+                    return None
+                self._mapa_indice = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, EOFError, ValueError):
+            return None
+        inicio = cabecera.itemsize * _CABECERA_INDICE
+        inicios = memoryview(self._mapa_indice)[inicio:inicio + cabecera.itemsize * cabecera[2]].cast("q")
+        if len(inicios) != cabecera[2]:  # índice cortado a la mitad
+            inicios.release()
+            self._mapa_indice.close()
+            return None
+        return inicios
+
+    def _armar_indice(self, inicio: int, guardar: bool) -> array:
+        inicios = array("q")
+        datos, fin = self._datos, len(self._datos)
+        while inicio < fin:
+            siguiente = datos.find(b"\n", inicio)
+            if siguiente == -1:
+                siguiente = fin
+            # Las líneas en blanco no son contactos (solo se copian las muy cortas para revisarlas)
+            if siguiente - inicio > 2 or datos[inicio:siguiente].strip():
+                inicios.append(inicio)
+            inicio = siguiente + 1
+        if guardar:
+            self._guardar_indice(inicios)
+        return inicios
+
+    def _guardar_indice(self, inicios: array):
+        temporal = self._ruta_indice() + ".tmp"
+        try:
+            with open(temporal, "wb") as archivo:
+                array("q", self._firma() + [len(inicios)]).tofile(archivo)
+                inicios.tofile(archivo)
+            os.replace(temporal, self._ruta_indice())
+        except OSError:
+            pass  # carpeta de solo lectura: se vuelve a armar la próxima vez
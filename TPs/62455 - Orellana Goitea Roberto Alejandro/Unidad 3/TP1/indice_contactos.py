@@ -0,0 +1,145 @@
+# Índice de búsqueda de la agenda, armado una vez al cargar los contactos.
+#
+# Por cada campo de texto hay una lista ordenada de claves normalizadas (sin
+# tildes ni mayúsculas) con la posición del contacto al que pertenecen. Buscar
+# un prefijo son dos bisect sobre esa lista: O(log n + k) para k resultados,
+# sin recorrer la agenda. La edad tiene su propia lista ordenada para rangos.
+import heapq
+import re
+import unicodedata
+from functools import lru_cache
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Sequence
+
+# Campo de la búsqueda -> clave del contacto
+CAMPOS = {"nombre": "nombre", "apellido": "apellido", "email": "email", "telefono": "teléfono"}
+_NO_TELEFONO = re.compile(r"[^\d\s()+./-]")
+_NO_DIGITO = re.compile(r"\D")
+_PALABRA = re.compile(r"\w+")
+_FIN = "\U0010ffff"  # mayor que cualquier carácter: prefijo + _FIN acota todas las claves con ese prefijo
+
+
+def _quitar_tilde(caracter: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", caracter) if not unicodedata.combining(c))
+
+
+# Letras latinas con tilde -> sin tilde, para str.translate (mucho más rápido que NFKD letra por letra)
+_SIN_TILDES = str.maketrans({chr(c): _quitar_tilde(chr(c)) for c in range(0xC0, 0x250)
+                             if _quitar_tilde(chr(c)).isascii() and _quitar_tilde(chr(c)) != chr(c)})
+
+
+@lru_cache(maxsize=1 << 16)  # nombres y apellidos se repiten mucho
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin tildes: "Martínez" -> "martinez" """
+    texto = texto.casefold()
+    if texto.isascii():  # lo más común: no hay tildes que sacar
+        return texto
+    texto = texto.translate(_SIN_TILDES)
+    return texto if texto.isascii() else _quitar_tilde(texto)
+
+
+def clave_de(campo: str, texto: str) -> str:
+    """Clave de búsqueda de un texto: normalizado y, para el teléfono, solo los dígitos
+    (vacía si el texto no parece un teléfono, para que "perez99" no busque "99")"""
+    if campo == "telefono" and texto.isdigit():
+        return texto
+    texto = normalizar(texto)
+    if campo != "telefono":
+        return texto
+    return "" if _NO_TELEFONO.search(texto) else _NO_DIGITO.sub("", texto)
+
+
+def claves_de(campo: str, valor) -> List[str]:
+    """Claves con las que se indexa un valor: el valor completo y cada una de sus palabras"""
+    texto = clave_de(campo, str(valor))
+    palabras = _PALABRA.findall(texto)
+    if len(palabras) == 1 and palabras[0] == texto:
+        return palabras
+    return list(dict.fromkeys([texto] + palabras))
+
+
+class IndiceContactos:
+    """
+    Índice de prefijos por campo y de rangos de edad sobre una lista de contactos.
+    Guarda posiciones en la lista: si la lista cambia, hay que llamar a reconstruir().
+    """
+
+    def __init__(self, contactos: Sequence[dict]):
+        self.reconstruir(contactos)
+
+    def reconstruir(self, contactos: Sequence[dict]):
+        self._contactos = contactos
+        self._claves: Dict[str, List[str]] = {}
+        self._posiciones: Dict[str, List[int]] = {}
+        for campo, clave in CAMPOS.items():
+            claves, posiciones = [], []
+            for i, contacto in enumerate(contactos):
+                if clave in contacto:
+                    for k in claves_de(campo, contacto[clave]):
+                        claves.append(k)
+                        posiciones.append(i)
+            # Ordenar índices por clave es más rápido que ordenar tuplas (clave, posición)
+            orden = sorted(range(len(claves)), key=claves.__getitem__)
+            self._claves[campo] = [claves[j] for j in orden]
+            self._posiciones[campo] = [posiciones[j] for j in orden]
+        edades = [(c.get("edad"), i) for i, c in enumerate(contactos)]
+        edades = [par for par in edades if isinstance(par[0], int)]
+        orden = sorted(range(len(edades)), key=edades.__getitem__)
+        self._edades = [edades[j][0] for j in orden]
+        self._posiciones_edad = [edades[j][1] for j in orden]
+
+    def _con_prefijo(self, campo: str, prefijo: str) -> List[int]:
+        claves = self._claves[campo]
+        desde = bisect_left(claves, prefijo)
+        hasta = bisect_left(claves, prefijo + _FIN, desde)
+        return self._posiciones[campo][desde:hasta]
+
+    def _en_rango(self, edad_min: Optional[int], edad_max: Optional[int]) -> List[int]:
+        desde = 0 if edad_min is None else bisect_left(self._edades, edad_min)
+        hasta = len(self._edades) if edad_max is None else bisect_right(self._edades, edad_max)
+        return self._posiciones_edad[desde:hasta]
+
+    def buscar(self, texto: Optional[str] = None, campo: Optional[str] = None,
+               edad_min: Optional[int] = None, edad_max: Optional[int] = None,
+               limite: Optional[int] = None) -> List[int]:
+        """
+        Posiciones (en orden) de los contactos que coinciden.
+
+        Args:
+            texto: Cada palabra tiene que ser prefijo de alguna clave (de `campo`, o de cualquier campo)
+            campo: Uno de CAMPOS, o None para buscar en todos
+            edad_min, edad_max: Rango de edad, inclusivo
+            limite: Cantidad máxima de resultados
+        """
+        campos = [campo] if campo else list(CAMPOS)
+        consulta = [] if texto is None else texto.split()
+        posiciones = None
+        # Palabras más largas primero: suelen tener menos coincidencias
+        for palabra in sorted(consulta, key=len, reverse=True):
+            encontradas = set()
+            for c in campos:
+                clave = clave_de(c, palabra)
+                if clave:
+                    encontradas.update(self._con_prefijo(c, clave))
+            posiciones = encontradas if posiciones is None else posiciones & encontradas
+            if not posiciones:
+                return []
+
+        if posiciones is None and edad_min is None and edad_max is None:
+            total = len(self._contactos)
+            return list(range(total if limite is None else min(total, limite)))
+        if posiciones is None:
+            posiciones = self._en_rango(edad_min, edad_max)
+        elif edad_min is not None or edad_max is not None:
+            # Ya hay pocas candidatas: se filtran directamente en vez de recorrer el rango
+            posiciones = [i for i in posiciones if _edad_en_rango(self._contactos[i].get("edad"), edad_min, edad_max)]
+        if limite is not None:
+            # Un rango de edad amplio puede traer casi toda la agenda: no se ordena entera por 10 resultados
+            return heapq.nsmallest(limite, posiciones)
+        return sorted(posiciones)
+
+
+def _edad_en_rango(edad, edad_min: Optional[int], edad_max: Optional[int]) -> bool:
+    return (isinstance(edad, int)
+            and (edad_min is None or edad >= edad_min)
+            and (edad_max is None or edad <= edad_max))
@@ -1,4 +1,14 @@
-from fastapi import FastAPI
+import os
+import threading
+from enum import Enum
+from typing import List, Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from cache_respuestas import RespuestaCacheada
+from fuente_contactos import ContactosArchivo
+from indice_contactos import CAMPOS, IndiceContactos
 
 app = FastAPI()
 
@@ -15,10 +25,59 @@ contactos = [
     {"nombre": "Elena", "apellido": "Vargas", "edad": 38, "teléfono": "222333444", "email": "elena@example.com"}
 ]
 
+# Con AGENDA_ARCHIVO=<ruta de un .ndjson o .csv> la agenda se lee de ese archivo en vez
+# de la lista de arriba, sin cargarlo entero en memoria (ver fuente_contactos.py)
+AGENDA_ARCHIVO = os.environ.get("AGENDA_ARCHIVO")
+if AGENDA_ARCHIVO:
+    contactos = ContactosArchivo(AGENDA_ARCHIVO)
+
+# /contactos siempre devuelve la misma lista: se serializa una vez al arrancar
+# (si la lista cambia, llamar a contactos_cacheados.actualizar(contactos)).
+# Una agenda en archivo no entra en memoria: se manda en partes
+contactos_cacheados = None if AGENDA_ARCHIVO else RespuestaCacheada(contactos)
+
+# Índice para /contactos/buscar. Se arma con la primera búsqueda, porque con un archivo
+# grande hay que recorrerlo entero (si la lista cambia, llamar a indice.reconstruir(contactos))
+indice: Optional[IndiceContactos] = None
+_lock_indice = threading.Lock()
+
+
+def obtener_indice() -> IndiceContactos:
+    global indice
+    with _lock_indice:
+        if indice is None:
+            indice = IndiceContactos(contactos)
+        return indice
+
+
+CampoBusqueda = Enum("CampoBusqueda", {campo: campo for campo in CAMPOS}, type=str)
+
 @app.get("/")
 def root():
     return {"message": "Bienvenido a la Agenda de Contactos"}
 
 @app.get("/contactos")
-def get_contactos():
-    return contactos
\ No newline at end of file
+def get_contactos(request: Request):
+    if contactos_cacheados is None:
+        return StreamingResponse(contactos.json_en_partes(), media_type="application/json")
+    return contactos_cacheados.responder(request)
+
+@app.get("/contactos/buscar")
+def buscar_contactos(
+    q: Optional[str] = Query(None, description="Palabras a buscar (prefijos, sin importar tildes ni mayúsculas)"),
+    campo: Optional[CampoBusqueda] = Query(None, description="Buscar solo en este campo"),
+    edad_min: Optional[int] = Query(None, ge=0),
+    edad_max: Optional[int] = Query(None, ge=0),
+    limite: int = Query(100, ge=1, le=1000),
+) -> List[dict]:
+    if edad_min is not None and edad_max is not None and edad_min > edad_max:
+        raise HTTPException(status_code=400, detail="edad_min no puede ser mayor que edad_max")
+    posiciones = obtener_indice().buscar(q, campo.value if campo else None, edad_min, edad_max, limite)
+    return [contactos[i] for i in posiciones]
+
+@app.get("/contactos/{posicion}")
+def get_contacto(posicion: int):
+    # Con una agenda en archivo se decodifica solo esta línea
+    if not 0 <= posicion < len(contactos):
+        raise HTTPException(status_code=404, detail="Contacto no encontrado")
+    return contactos[posicion]
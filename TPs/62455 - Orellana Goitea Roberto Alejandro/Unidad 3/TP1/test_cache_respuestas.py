@@ -0,0 +1,48 @@
+"""
+Tests de la respuesta pre-serializada de /contactos (cache_respuestas.py).
+Ejecutar desde esta carpeta con: python -m pytest test_cache_respuestas.py -v
+"""
+
+import gzip
+
+from fastapi.testclient import TestClient
+
+import main
+
+client = TestClient(main.app)
+
+
+def test_contactos_igual_que_sin_cache():
+    """Mismo JSON que devolvía FastAPI, con ETag y comprimido si el cliente lo acepta"""
+    respuesta = client.get("/contactos", headers={"Accept-Encoding": "identity"})
+    assert respuesta.status_code == 200
+    assert respuesta.json() == main.contactos
+    assert respuesta.headers["content-type"] == "application/json"
+    assert "content-encoding" not in respuesta.headers
+
+    comprimida = client.get("/contactos", headers={"Accept-Encoding": "gzip"})
+    assert comprimida.headers["content-encoding"] == "gzip"
+    assert comprimida.json() == main.contactos  # httpx descomprime solo
+    assert comprimida.headers["etag"] != respuesta.headers["etag"]
+    assert comprimida.headers["vary"] == "Accept-Encoding"
+
+
+def test_if_none_match_y_actualizar():
+    """Con el ETag vigente responde 304 sin cuerpo; después de actualizar, 200 otra vez"""
+    etag = client.get("/contactos").headers["etag"]
+    no_modificado = client.get("/contactos", headers={"If-None-Match": f'"otro", W/{etag}'})
+    assert no_modificado.status_code == 304
+    assert no_modificado.content == b""
+
+    try:
+        main.contactos_cacheados.actualizar(main.contactos[:3])
+        cambiado = client.get("/contactos", headers={"If-None-Match": etag})
+        assert cambiado.status_code == 200
+        assert cambiado.json() == main.contactos[:3]
+    finally:
+        main.contactos_cacheados.actualizar(main.contactos)
+
+
+def test_variante_gzip_es_el_mismo_cuerpo():
+    variantes, _ = main.contactos_cacheados._actual
+    assert gzip.decompress(variantes["gzip"]) == variantes["identity"]
@@ -0,0 +1,67 @@
+"""
+Tests de la agenda leída de archivo (fuente_contactos.py).
+Ejecutar desde esta carpeta con: python -m pytest test_fuente_contactos.py -v
+"""
+
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from fuente_contactos import ContactosArchivo
+
+client = TestClient(main.app)
+
+
+def escribir_ndjson(ruta, contactos):
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        for contacto in contactos:
+            archivo.write(json.dumps(contacto, ensure_ascii=False) + "\n")
+            archivo.write("\n")  # las líneas en blanco se ignoran
+
+
+def test_ndjson_y_csv_como_la_lista(tmp_path):
+    ruta = tmp_path / "agenda.ndjson"
+    escribir_ndjson(ruta, main.contactos)
+    csv = tmp_path / "agenda.csv"
+    csv.write_text("nombre,apellido,edad,teléfono,email\r\n" + "".join(
+        f'{c["nombre"]},"{c["apellido"]}",{c["edad"]},{c["teléfono"]},{c["email"]}\r\n' for c in main.contactos
+    ), encoding="utf-8")
+
+    for archivo in [ruta, csv]:
+        contactos = ContactosArchivo(str(archivo))
+        assert len(contactos) == len(main.contactos)
+        assert list(contactos) == main.contactos
+        assert contactos[-1] == main.contactos[-1] and contactos[2:4] == main.contactos[2:4]
+        assert json.loads(b"".join(contactos.json_en_partes(por_parte=3))) == main.contactos
+        with pytest.raises(IndexError):
+            contactos[len(main.contactos)]
+        contactos.cerrar()
+
+
+def test_indice_se_reutiliza_hasta_que_cambia_el_archivo(tmp_path):
+    ruta = tmp_path / "agenda.ndjson"
+    escribir_ndjson(ruta, main.contactos[:3])
+    ContactosArchivo(str(ruta)).cerrar()
+    assert os.path.exists(str(ruta) + ".idx")
+
+    escribir_ndjson(ruta, main.contactos[:5])
+    os.utime(ruta, ns=(0, 12345))  # otra fecha de modificación aunque el cambio sea en el mismo instante
+    contactos = ContactosArchivo(str(ruta))
+    assert list(contactos) == main.contactos[:5]
+    contactos.cerrar()
+
+
+def test_api_con_agenda_en_archivo(tmp_path, monkeypatch):
+    ruta = tmp_path / "agenda.ndjson"
+    escribir_ndjson(ruta, main.contactos)
+    monkeypatch.setattr(main, "contactos", ContactosArchivo(str(ruta)))
+    monkeypatch.setattr(main, "contactos_cacheados", None)
+    monkeypatch.setattr(main, "indice", None)
+
+    assert client.get("/contactos").json() == main.contactos[:]
+    assert client.get("/contactos/3").json()["nombre"] == "Ana"
+    assert client.get("/contactos/10").status_code == 404
+    assert [c["nombre"] for c in client.get("/contactos/buscar", params={"q": "martinez"}).json()] == ["Ana"]
@@ -0,0 +1,65 @@
+"""
+Tests del índice de búsqueda de contactos (indice_contactos.py) y de /contactos/buscar.
+Ejecutar desde esta carpeta con: python -m pytest test_indice_contactos.py -v
+"""
+
+import random
+import re
+
+from fastapi.testclient import TestClient
+
+import main
+from indice_contactos import CAMPOS, IndiceContactos, normalizar
+
+client = TestClient(main.app)
+
+
+def buscar(**params):
+    respuesta = client.get("/contactos/buscar", params=params)
+    assert respuesta.status_code == 200
+    return [c["nombre"] for c in respuesta.json()]
+
+
+def test_buscar_contactos():
+    """Prefijos en cualquier campo, sin importar tildes ni mayúsculas, y rango de edad"""
+    assert buscar(q="MARTINEZ") == ["Ana"]
+    assert buscar(q="mar") == ["María", "Ana"]
+    assert buscar(q="sofía rodr") == ["Sofía"]
+    assert buscar(q="mar", campo="nombre") == ["María"]
+    assert buscar(q="111", campo="telefono") == ["Carlos"]
+    assert buscar(q="luis@") == ["Luis"]
+    assert buscar(edad_min=30, edad_max=35) == ["Juan", "Luis", "Laura"]
+    assert buscar(q="a", edad_max=28) == ["Ana"]
+    assert buscar(limite=2) == ["Juan", "María"]
+    assert client.get("/contactos/buscar", params={"edad_min": 40, "edad_max": 30}).status_code == 400
+
+
+def test_indice_coincide_con_recorrer_la_lista():
+    """En una agenda grande al azar, el índice da lo mismo que revisar contacto por contacto"""
+    rnd = random.Random(3)
+    nombres = ["Juan", "María José", "Ángel", "Lucía", "Martín", "Iñaki"]
+    contactos = [
+        {"nombre": rnd.choice(nombres), "apellido": rnd.choice(["Pérez", "Núñez", "Díaz"]) + str(i),
+         "edad": rnd.randrange(18, 90), "teléfono": str(rnd.randrange(10**6)), "email": f"c{i}@mail.com"}
+        for i in range(3000)
+    ]
+    indice = IndiceContactos(contactos)
+
+    def coincide(contacto, palabra, campos):
+        for campo in campos:
+            valor = normalizar(contacto[CAMPOS[campo]])
+            if any(p.startswith(palabra) for p in [valor] + re.findall(r"\w+", valor)):
+                return True
+        return False
+
+    for texto, campo, edad_min, edad_max in [("ma jo", None, None, None), ("angel", "nombre", 30, 40),
+                                             ("nunez1", "apellido", None, 25), ("iñaki díaz2", None, 50, None),
+                                             (None, None, 20, 21), ("c12", "email", None, None)]:
+        campos = [campo] if campo else list(CAMPOS)
+        esperado = [
+            i for i, c in enumerate(contactos)
+            if all(coincide(c, normalizar(p), campos) for p in (texto or "").split())
+            and (edad_min is None or c["edad"] >= edad_min) and (edad_max is None or c["edad"] <= edad_max)
+        ]
+        assert indice.buscar(texto, campo, edad_min, edad_max) == esperado
+        assert indice.buscar(texto, campo, edad_min, edad_max, limite=10) == esperado[:10]
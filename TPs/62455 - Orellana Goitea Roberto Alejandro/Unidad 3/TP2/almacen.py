@@ -0,0 +1,471 @@
+# Almacenamiento en memoria de las tareas del TP2, indexado para no recorrer
+# toda la lista en cada request.
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from itertools import count
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+
+def _clave(estado) -> str:
+    """El estado puede venir como EstadoTarea o como string"""
+    return getattr(estado, "value", estado)
+
+
+# ==================== NORMALIZACIÓN PARA LA BÚSQUEDA ====================
+
+# Se quitan tildes y diéresis; la ñ se mantiene distinta de la n
+_SIN_TILDES = (("á", "a"), ("é", "e"), ("í", "i"), ("ó", "o"), ("ú", "u"), ("ü", "u"))
+_PALABRA = re.compile(r"\w+")
+
+def normalizar_texto(texto: str) -> str:
+    """Pasa a minúsculas (casefold) y quita tildes"""
+    texto = texto.casefold()
+    if not texto.isascii():
+        # Varios replace son mucho más rápidos que str.translate con un dict
+        for con_tilde, sin_tilde in _SIN_TILDES:
+            if con_tilde in texto:
+                texto = texto.replace(con_tilde, sin_tilde)
+    return texto
+
+def palabras(texto: str) -> List[str]:
+    """Palabras normalizadas de un texto, en el orden en que aparecen"""
+    return _PALABRA.findall(normalizar_texto(texto))
+
+
+class _ListaOrdenada:
+    """Lista ordenada de strings partida en bloques de ~_TAMANIO elementos.
+
+    Con una sola lista, insertar o borrar una palabra nueva mueve en memoria todo
+    lo que está después (O(n)); acá solo se mueve un bloque (O(√n) en la práctica).
+    """
+    _TAMANIO = 1000
+
+    def __init__(self):
+        self._bloques: List[List[str]] = []
+        self._maximos: List[str] = []  # último elemento de cada bloque
+
+    def clear(self):
+        self._bloques.clear()
+        self._maximos.clear()
+
+    def __len__(self) -> int:
+        return sum(len(b) for b in self._bloques)
+
+    def __iter__(self) -> Iterator[str]:
+        for bloque in self._bloques:
+            yield from bloque
+
+    def agregar(self, valor: str):
+        if not self._bloques:
+            self._bloques.append([valor])
+            self._maximos.append(valor)
+            return
+        i = min(bisect_left(self._maximos, valor), len(self._bloques) - 1)
+        bloque = self._bloques[i]
+        insort(bloque, valor)
+        self._maximos[i] = bloque[-1]
+        if len(bloque) > 2 * self._TAMANIO:
+            self._bloques[i:i + 1] = [bloque[:self._TAMANIO], bloque[self._TAMANIO:]]
+            self._maximos[i:i + 1] = [bloque[self._TAMANIO - 1], bloque[-1]]
+
+    def quitar(self, valor: str):
+        i = bisect_left(self._maximos, valor)
+        bloque = self._bloques[i]
+        del bloque[bisect_left(bloque, valor)]
+        if bloque:
+            self._maximos[i] = bloque[-1]
+        else:
+            del self._bloques[i], self._maximos[i]
+
+    def desde(self, valor: str) -> Iterator[str]:
+        """Los elementos >= valor, en orden"""
+        i = bisect_left(self._maximos, valor)
+        if i < len(self._bloques):
+            bloque = self._bloques[i]
+            yield from bloque[bisect_left(bloque, valor):]
+            for bloque in self._bloques[i + 1:]:
+                yield from bloque
+
+
+# ==================== CONCURRENCIA ====================
+
+class LockLecturaEscritura:
+    """Lock de lectura/escritura: muchos lectores a la vez, o un solo escritor.
+
+    - Un lector nuevo espera si hay un escritor esperando (los escritores no se
+      quedan esperando para siempre si siempre hay lecturas).
+    - Es reentrante: un hilo que ya tiene el lock (de lectura o de escritura)
+      puede volver a tomar el de lectura, y el escritor el de escritura.
+      Pasar de lectura a escritura no está permitido (se bloquearía).
+    """
+
+    def __init__(self):
+        self._condicion = threading.Condition(threading.Lock())
+        self._lectores = 0
+        self._escritor: Optional[int] = None  # id del hilo que escribe
+        self._escritores_esperando = 0
+        self._local = threading.local()       # lecturas anidadas de cada hilo
+
+    @contextmanager
+    def lectura(self):
+        anidadas = getattr(self._local, "lecturas", 0)
+        if anidadas or self._escritor == threading.get_ident():
+            self._local.lecturas = anidadas + 1
+            try:
+                yield
+            finally:
+                self._local.lecturas = anidadas
+            return
+
+        with self._condicion:
+            while self._escritor is not None or self._escritores_esperando:
+                self._condicion.wait()
+            self._lectores += 1
+        self._local.lecturas = 1
+        try:
+            yield
+        finally:
+            self._local.lecturas = 0
+            with self._condicion:
+                self._lectores -= 1
+                if not self._lectores:
+                    self._condicion.notify_all()
+
+    @contextmanager
+    def escritura(self):
+        propio = threading.get_ident()
+        if self._escritor == propio:
+            yield
+            return
+        if getattr(self._local, "lecturas", 0):
+            raise RuntimeError("No se puede pedir el lock de escritura teniendo el de lectura")
+
+        with self._condicion:
+            self._escritores_esperando += 1
+            while self._escritor is not None or self._lectores:
+                self._condicion.wait()
+            self._escritores_esperando -= 1
+            self._escritor = propio
+        try:
+            yield
+        finally:
+            with self._condicion:
+                self._escritor = None
+                self._condicion.notify_all()
+
+
+def _con_lectura(metodo):
+    @wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with self._lock.lectura():
+            return metodo(self, *args, **kwargs)
+    return envoltura
+
+
+def _con_escritura(metodo):
+    @wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with self._lock.escritura():
+            return metodo(self, *args, **kwargs)
+    return envoltura
+
+
+class TareaStore:
+    """Guarda las tareas por id, con un índice de ids por estado.
+
+    - obtener / reemplazar / eliminar por id: O(1)
+    - filtrar por estado: proporcional a la cantidad de tareas con ese estado
+    - iterar devuelve las tareas en orden de inserción (igual que la lista original)
+    - resumen por estado: O(1), con contadores que se actualizan en cada operación
+    - marcar_todas: O(1), ver más abajo
+    - buscar por texto: índice invertido palabra -> ids, con coincidencia por
+      prefijo; el costo depende de las coincidencias, no del total de tareas
+
+    Las tareas no se deben modificar "por fuera" (ej: tarea.estado = ...):
+    para cambiarlas se usa reemplazar(), así el índice por estado queda al día.
+
+    Se puede usar desde varios hilos (FastAPI corre los endpoints `def` en un
+    threadpool): las lecturas toman el lock de lectura y no se bloquean entre sí,
+    los cambios toman el de escritura. Para operaciones compuestas (leer y después
+    escribir, o asignar un id y agregar) se usa `with store.escritura():`.
+
+    marcar_todas(estado) no recorre las tareas: guarda una "marca" con el número
+    de secuencia del momento y el estado. Toda tarea escrita antes de la marca
+    tiene ese estado (aunque el objeto guardado diga otro), y las escritas después
+    conservan el suyo. Los ids cubiertos quedan en self._base (los conjuntos del
+    índice por estado que había en ese momento) hasta que compactar() reescribe
+    esas tareas con el estado nuevo.
+    """
+
+    def __init__(self, estados: Iterable = ()):
+        self._estados = [_clave(e) for e in estados]  # aparecen en el resumen aunque estén en 0
+        self._tareas: Dict[int, object] = {}     # id -> tarea (el dict conserva el orden de inserción)
+        self._orden: Dict[int, int] = {}         # id -> número de inserción
+        self._version: Dict[int, int] = {}       # id -> número de la última escritura
+        self._por_estado: Dict[str, Set[int]] = {}  # solo tareas no cubiertas por la marca
+        self._contadores: Counter = Counter()    # estado (efectivo) -> cantidad de tareas
+        self._marca = None                       # (secuencia, estado) del último marcar_todas
+        self._base: List[Set[int]] = []          # ids cubiertos por la marca, pendientes de compactar
+        self._indice_palabras: Dict[str, Set[int]] = {}  # palabra normalizada -> ids
+        self._vocabulario = _ListaOrdenada()     # palabras del índice, ordenadas (para buscar prefijos)
+        self._secuencia = count()
+        self.diario = None                       # Diario (persistencia.py) que registra los cambios, si hay
+        self._lock = LockLecturaEscritura()
+
+    def lectura(self):
+        """Lock de lectura, para varias lecturas que tienen que ver el mismo estado"""
+        return self._lock.lectura()
+
+    def escritura(self):
+        """Lock de escritura, para operaciones compuestas que no se deben intercalar"""
+        return self._lock.escritura()
+
+    # --- Compatibilidad con la lista original (tareas_db.clear(), len, for, if) ---
+
+    @_con_escritura
+    def clear(self):
+        self._tareas.clear()
+        self._orden.clear()
+        self._version.clear()
+        self._por_estado.clear()
+        self._contadores.clear()
+        self._marca = None
+        self._base.clear()
+        self._indice_palabras.clear()
+        self._vocabulario.clear()
+        self._secuencia = count()
+        self._registrar("vaciar")
+
+    def __len__(self) -> int:
+        return len(self._tareas)  # len() y `in` de un dict son atómicos: no hace falta el lock
+
+    def __iter__(self) -> Iterator:
+        return iter(self.filtrar())
+
+    def __contains__(self, id: int) -> bool:
+        return id in self._tareas
+
+    # --- Operaciones ---
+
+    @_con_escritura
+    def agregar(self, tarea):
+        if tarea.id in self._tareas:
+            raise ValueError(f"Ya existe una tarea con id {tarea.id}")
+        self._tareas[tarea.id] = tarea
+        self._orden[tarea.id] = next(self._secuencia)
+        self._poner_en_estado(tarea)
+        self._indexar_palabras(tarea)
+        self._registrar("agregar", tarea)
+        return tarea
+
+    @_con_lectura
+    def obtener(self, id: int):
+        tarea = self._tareas.get(id)
+        return None if tarea is None else self._efectiva(tarea)
+
+    @_con_escritura
+    def reemplazar(self, tarea):
+        """Reemplaza la tarea con el mismo id, manteniendo su posición"""
+        if tarea.id not in self._tareas:
+            raise KeyError(tarea.id)
+        anterior = self._tareas[tarea.id]
+        self._sacar_de_estado(tarea.id)
+        if anterior.descripcion != tarea.descripcion:
+            self._desindexar_palabras(anterior)
+            self._indexar_palabras(tarea)
+        self._tareas[tarea.id] = tarea
+        self._poner_en_estado(tarea)
+        self._registrar("reemplazar", tarea)
+        return tarea
+
+    @_con_escritura
+    def eliminar(self, id: int):
+        if id not in self._tareas:
+            return None
+        tarea = self._efectiva(self._tareas[id])
+        self._sacar_de_estado(id)
+        self._desindexar_palabras(self._tareas[id])
+        del self._tareas[id], self._orden[id], self._version[id]
+        self._registrar("eliminar", id)
+        return tarea
+
+    @_con_lectura
+    def filtrar(self, estado: Optional[str] = None) -> List:
+        """Todas las tareas, o solo las de un estado, en orden de inserción"""
+        if estado is None:
+            return [self._efectiva(t) for t in self._tareas.values()]
+        clave = _clave(estado)
+        ids = list(self._por_estado.get(clave, ()))
+        if self._marca is not None and _clave(self._marca[1]) == clave:
+            ids += [i for i in set().union(*self._base) if i in self._tareas and self._cubierta(i)]
+        ids.sort(key=self._orden.__getitem__)
+        return [self._efectiva(self._tareas[i]) for i in ids]
+
+    @_con_lectura
+    def buscar(self, texto: str, estado: Optional[str] = None) -> List:
+        """Tareas cuya descripción tiene todas las palabras de texto (cada una como
+        prefijo de alguna palabra, sin importar mayúsculas ni tildes), opcionalmente
+        de un estado, en orden de inserción"""
+        consulta = palabras(texto)
+        if not consulta:
+            return self.buscar_subcadena(texto, estado)
+        ids: Optional[Set[int]] = None
+        # Primero las palabras más largas: suelen tener menos coincidencias
+        for palabra in sorted(set(consulta), key=len, reverse=True):
+            coincidencias = self._ids_con_prefijo(palabra)
+            ids = coincidencias if ids is None else ids & coincidencias
+            if not ids:
+                return []
+        tareas = [self._efectiva(self._tareas[i]) for i in sorted(ids, key=self._orden.__getitem__)]
+        if estado is not None:
+            tareas = [t for t in tareas if _clave(t.estado) == _clave(estado)]
+        return tareas
+
+    @_con_lectura
+    def buscar_subcadena(self, texto: str, estado: Optional[str] = None) -> List:
+        """Búsqueda original: texto como subcadena de la descripción (recorre las tareas)"""
+        texto = texto.lower()
+        return [t for t in self.filtrar(estado) if texto in t.descripcion.lower()]
+
+    @_con_escritura
+    def marcar_todas(self, estado) -> int:
+        """Pasa todas las tareas al estado indicado, en O(1). Devuelve cuántas cambiaron"""
+        clave = _clave(estado)
+        cambiadas = len(self._tareas) - self._contadores[clave]
+        # Lo que estaba indexado pasa a estar cubierto por la marca (se mueven los
+        # conjuntos enteros, sin recorrerlos)
+        self._base.extend(self._por_estado.values())
+        self._por_estado = {}
+        self._marca = (next(self._secuencia), estado)
+        self._contadores = Counter({clave: len(self._tareas)})
+        self._registrar("marcar_todas", estado)
+        return cambiadas
+
+    @_con_escritura
+    def compactar(self, limite: Optional[int] = None) -> int:
+        """Reescribe las tareas cubiertas por la marca con su estado efectivo.
+        Se puede llamar de a partes con limite. Devuelve cuántas tareas reescribió"""
+        hechas = 0
+        while self._base:
+            ids = self._base[-1]
+            while ids:
+                if limite is not None and hechas >= limite:
+                    return hechas
+                id = ids.pop()
+                if id in self._tareas and self._cubierta(id):
+                    tarea = self._efectiva(self._tareas[id])
+                    self._tareas[id] = tarea
+                    self._version[id] = next(self._secuencia)
+                    self._por_estado.setdefault(_clave(tarea.estado), set()).add(id)
+                    hechas += 1
+            self._base.pop()
+        self._marca = None
+        return hechas
+
+    def compactar_por_partes(self, lote: int = 1000):
+        """compactar() de a `lote` tareas, soltando el lock entre partes para que
+        los requests no esperen a que termine toda la compactación"""
+        while True:
+            with self._lock.escritura():
+                self.compactar(lote)
+                if not self._base:
+                    return
+
+    @_con_lectura
+    def resumen(self) -> Dict[str, int]:
+        """Cantidad de tareas por estado, leída de los contadores (no recorre las tareas)"""
+        resumen = dict.fromkeys(self._estados, 0)
+        resumen.update((e, n) for e, n in self._contadores.items() if n)
+        return resumen
+
+    @_con_lectura
+    def verificar_consistencia(self):
+        """Recalcula índices y contadores recorriendo todas las tareas y los compara
+        con los mantenidos. Lanza AssertionError si no coinciden (pensado para tests)"""
+        por_estado: Dict[str, Set[int]] = {}
+        contadores: Counter = Counter()
+        indice_palabras: Dict[str, Set[int]] = {}
+        base = set().union(*self._base)
+        for id, tarea in self._tareas.items():
+            if id != tarea.id:
+                raise AssertionError(f"La tarea {tarea.id} está guardada con el id {id}")
+            for palabra in palabras(tarea.descripcion):
+                indice_palabras.setdefault(palabra, set()).add(id)
+            contadores[_clave(self._efectiva(tarea).estado)] += 1
+            if not self._cubierta(id):
+                por_estado.setdefault(_clave(tarea.estado), set()).add(id)
+            elif id not in base:
+                raise AssertionError(f"La tarea {id} está cubierta por la marca pero no figura en la base")
+
+        if por_estado != self._por_estado:
+            raise AssertionError(f"Índice por estado desactualizado: {self._por_estado} != {por_estado}")
+        if +contadores != +self._contadores:
+            raise AssertionError(f"Contadores desactualizados: {dict(self._contadores)} != {dict(contadores)}")
+        if indice_palabras != self._indice_palabras or list(self._vocabulario) != sorted(indice_palabras):
+            raise AssertionError("Índice de palabras desactualizado")
+        if not (self._orden.keys() == self._version.keys() == self._tareas.keys()):
+            raise AssertionError("El orden de inserción no coincide con las tareas guardadas")
+
+    def _ids_con_prefijo(self, prefijo: str) -> Set[int]:
+        ids: Set[int] = set()
+        # Las palabras con ese prefijo están contiguas en el vocabulario ordenado
+        for palabra in self._vocabulario.desde(prefijo):
+            if not palabra.startswith(prefijo):
+                break
+            ids |= self._indice_palabras[palabra]
+        return ids
+
+    def _indexar_palabras(self, tarea):
+        for palabra in set(palabras(tarea.descripcion)):
+            ids = self._indice_palabras.get(palabra)
+            if ids is None:
+                ids = self._indice_palabras[palabra] = set()
+                self._vocabulario.agregar(palabra)
+            ids.add(tarea.id)
+
+    def _desindexar_palabras(self, tarea):
+        for palabra in set(palabras(tarea.descripcion)):
+            ids = self._indice_palabras.get(palabra)
+            if ids is None:
+                continue
+            ids.discard(tarea.id)
+            if not ids:
+                del self._indice_palabras[palabra]
+                self._vocabulario.quitar(palabra)
+
+    def _registrar(self, operacion: str, valor=None):
+        if self.diario is not None:
+            self.diario.registrar(operacion, valor)
+
+    def _cubierta(self, id: int) -> bool:
+        """True si la tarea se escribió antes del último marcar_todas"""
+        return self._marca is not None and self._version[id] < self._marca[0]
+
+    def _efectiva(self, tarea):
+        """La tarea con el estado que le corresponde según la marca"""
+        if self._cubierta(tarea.id) and _clave(tarea.estado) != _clave(self._marca[1]):
+            return tarea.model_copy(update={"estado": self._marca[1]})
+        return tarea
+
+    def _poner_en_estado(self, tarea):
+        clave = _clave(tarea.estado)
+        self._version[tarea.id] = next(self._secuencia)
+        self._por_estado.setdefault(clave, set()).add(tarea.id)
+        self._contadores[clave] += 1
+
+    def _sacar_de_estado(self, id: int):
+        if self._cubierta(id):
+            # Queda (vieja) en self._base; como su versión va a ser posterior a la marca, se ignora
+            self._contadores[_clave(self._marca[1])] -= 1
+            return
+        clave = _clave(self._tareas[id].estado)
+        ids = self._por_estado.get(clave)
+        if ids is not None and id in ids:
+            ids.discard(id)
+            self._contadores[clave] -= 1
+            if not ids:
+                del self._por_estado[clave]
@@ -0,0 +1,343 @@
+# Almacenamiento columnar de las tareas del TP2, para conjuntos muy grandes.
+#
+# En vez de un objeto Tarea (Pydantic) por tarea, cada campo se guarda en una
+# columna compacta:
+#   - ids:          array('q'), en orden creciente (= orden de inserción)
+#   - estados:      bytearray, un byte por tarea con el código del estado
+#   - fechas:       array('d'), segundos desde epoch
+#   - descripción:  todas juntas en un bytearray (UTF-8) + inicio y largo de cada una
+# Las Tarea se arman recién al responder (obtener, filtrar, buscar).
+#
+# Comparado con TareaStore (almacen.py) ocupa mucha menos memoria por tarea,
+# a cambio de algunas operaciones más lentas:
+#   - filtrar por estado recorre la columna de estados (en C, con bytearray.find)
+#   - buscar por texto recorre el texto normalizado con una regex en vez de usar
+#     un índice invertido (también en C; no crea objetos por tarea)
+#   - marcar_todas reescribe la columna de estados de una vez (bytearray.translate)
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set
+
+from almacen import LockLecturaEscritura, _clave, _con_escritura, _con_lectura, normalizar_texto, palabras
+
+_BORRADA = 255  # código de estado de una fila eliminada (se limpia al reconstruir)
+_NO_PALABRA = rb"(?<![0-9a-z_\x80-\xff])"  # inicio de palabra (los bytes no ASCII cuentan como letra)
+
+
+class TareaStoreColumnar:
+    """Misma interfaz que TareaStore, con las tareas guardadas por columnas.
+
+    Args:
+        fabrica: Modelo de las tareas (ej: Tarea), para armarlas al responder
+        tipo_estado: Enum de estados (ej: EstadoTarea); el código de cada estado es su posición
+
+    Los ids se tienen que agregar en orden creciente (como los asigna contador_id).
+    """
+
+    def __init__(self, fabrica, tipo_estado):
+        self._fabrica = fabrica
+        self._estados = list(tipo_estado)
+        self._codigos = {_clave(e): i for i, e in enumerate(self._estados)}
+        self._lock = LockLecturaEscritura()
+        self.diario = None  # Diario (persistencia.py) que registra los cambios, si hay
+        self._iniciar()
+
+    def _iniciar(self):
+        self._ids = array("q")
+        self._estado = bytearray()
+        self._fecha = array("d")
+        self._fechas_texto: Dict[int, str] = {}  # id -> fecha que no se puede guardar como número
+        self._texto = bytearray()                # descripciones en UTF-8, una detrás de otra
+        self._inicio = array("q")
+        self._largo = array("l")
+        # Descripciones normalizadas (para buscar), separadas por "\n". Cada cambio
+        # agrega una entrada al final; la fila apunta a su entrada actual.
+        self._normalizado = bytearray()
+        self._entrada_inicio = array("q")        # inicio de cada entrada (creciente)
+        self._entrada_fila = array("q")          # fila de cada entrada
+        self._entrada_actual = array("q")        # fila -> entrada vigente
+        self._contadores: Counter = Counter()    # código de estado -> cantidad
+        self._borradas = 0
+        self._basura = 0                         # bytes de texto que ya no usa ninguna fila
+
+    def lectura(self):
+        return self._lock.lectura()
+
+    def escritura(self):
+        return self._lock.escritura()
+
+    # --- Compatibilidad con la lista original (tareas_db.clear(), len, for, if) ---
+
+    @_con_escritura
+    def clear(self):
+        self._iniciar()
+        self._registrar("vaciar")
+
+    def __len__(self) -> int:
+        return len(self._ids) - self._borradas
+
+    def __iter__(self) -> Iterator:
+        return iter(self.filtrar())
+
+    @_con_lectura
+    def __contains__(self, id: int) -> bool:
+        return self._fila(id) is not None
+
+    # --- Operaciones ---
+
+    @_con_escritura
+    def agregar(self, tarea):
+        if self._ids and tarea.id <= self._ids[-1]:
+            if self._fila(tarea.id) is not None:
+                raise ValueError(f"Ya existe una tarea con id {tarea.id}")
+            raise ValueError(f"Los ids se agregan en orden creciente (último: {self._ids[-1]}, nuevo: {tarea.id})")
+        codigo = self._codigos[_clave(tarea.estado)]
+        self._ids.append(tarea.id)
+        self._estado.append(codigo)
+        self._fecha.append(self._fecha_a_numero(tarea.id, tarea.fecha_creacion))
+        self._inicio.append(0)
+        self._largo.append(0)
+        self._entrada_actual.append(0)
+        self._guardar_descripcion(len(self._ids) - 1, tarea.descripcion)
+        self._contadores[codigo] += 1
+        self._registrar("agregar", tarea)
+        return tarea
+
+    @_con_lectura
+    def obtener(self, id: int):
+        fila = self._fila(id)
+        return None if fila is None else self._materializar(fila)
+
+    @_con_escritura
+    def reemplazar(self, tarea):
+        """Reemplaza la tarea con el mismo id, manteniendo su posición"""
+        fila = self._fila(tarea.id)
+        if fila is None:
+            raise KeyError(tarea.id)
+        codigo = self._codigos[_clave(tarea.estado)]
+        self._contadores[self._estado[fila]] -= 1
+        self._contadores[codigo] += 1
+        self._estado[fila] = codigo
+        self._fechas_texto.pop(tarea.id, None)
+        self._fecha[fila] = self._fecha_a_numero(tarea.id, tarea.fecha_creacion)
+        if tarea.descripcion != self._descripcion(fila):
+            self._basura += self._largo[fila] + self._largo_entrada(self._entrada_actual[fila])
+            self._guardar_descripcion(fila, tarea.descripcion)
+            self._reconstruir_si_conviene()
+        self._registrar("reemplazar", tarea)
+        return tarea
+
+    @_con_escritura
+    def eliminar(self, id: int):
+        fila = self._fila(id)
+        if fila is None:
+            return None
+        tarea = self._materializar(fila)
+        self._contadores[self._estado[fila]] -= 1
+        self._estado[fila] = _BORRADA
+        self._fechas_texto.pop(id, None)
+        self._borradas += 1
+        self._basura += self._largo[fila] + self._largo_entrada(self._entrada_actual[fila])
+        self._registrar("eliminar", id)
+        self._reconstruir_si_conviene()
+        return tarea
+
+    @_con_lectura
+    def filtrar(self, estado: Optional[str] = None) -> List:
+        """Todas las tareas, o solo las de un estado, en orden de inserción"""
+        if estado is None:
+            filas = range(len(self._ids)) if not self._borradas else self._filas_con_codigo(None)
+        else:
+            filas = self._filas_con_codigo(self._codigos[_clave(estado)])
+        return self._materializar_filas(filas)
+
+    @_con_lectura
+    def buscar(self, texto: str, estado: Optional[str] = None) -> List:
+        """Igual que TareaStore.buscar: todas las palabras, cada una como prefijo"""
+        consulta = palabras(texto)
+        if not consulta:
+            return self.buscar_subcadena(texto, estado)
+        # Solo la palabra menos frecuente recorre todo el texto (contar apariciones con
+        # bytearray.count es barato); las demás se buscan solo en las filas que ya coinciden
+        primera, *resto = sorted(set(consulta), key=lambda p: self._normalizado.count(p.encode()))
+        filas = self._filas_con_prefijo(primera)
+        for palabra in resto:
+            patron = self._patron(palabra)
+            filas = {f for f in filas if self._coincide_fila(patron, f)}
+        if estado is not None:
+            codigo = self._codigos[_clave(estado)]
+            filas = {f for f in filas if self._estado[f] == codigo}
+        return self._materializar_filas(sorted(filas))
+
+    @_con_lectura
+    def buscar_subcadena(self, texto: str, estado: Optional[str] = None) -> List:
+        """Búsqueda original: texto como subcadena de la descripción"""
+        texto = texto.lower()
+        return [t for t in self.filtrar(estado) if texto in t.descripcion.lower()]
+
+    @_con_escritura
+    def marcar_todas(self, estado) -> int:
+        """Pasa todas las tareas al estado indicado (una sola pasada en C sobre la columna)"""
+        codigo = self._codigos[_clave(estado)]
+        cambiadas = len(self) - self._contadores[codigo]
+        tabla = bytearray(range(256))
+        tabla[:len(self._estados)] = bytes([codigo]) * len(self._estados)
+        self._estado = self._estado.translate(tabla)  # las borradas (255) quedan igual
+        self._contadores = Counter({codigo: len(self)})
+        self._registrar("marcar_todas", estado)
+        return cambiadas
+
+    def compactar(self, limite: Optional[int] = None) -> int:
+        """No hay nada pendiente: marcar_todas ya escribe la columna"""
+        return 0
+
+    def compactar_por_partes(self, lote: int = 1000) -> int:
+        """Lo llama main.py después de completar_todas, como con TareaStore: no hay nada pendiente"""
+        return self.compactar(lote)
+
+    @_con_lectura
+    def resumen(self) -> Dict[str, int]:
+        """Cantidad de tareas por estado, leída de los contadores"""
+        return {_clave(e): self._contadores[i] for i, e in enumerate(self._estados)}
+
+    @_con_lectura
+    def verificar_consistencia(self):
+        """Recalcula contadores y texto normalizado y los compara con los guardados.
+        Lanza AssertionError si no coinciden (pensado para tests)"""
+        columnas = [self._ids, self._estado, self._fecha, self._inicio, self._largo, self._entrada_actual]
+        if len({len(c) for c in columnas}) != 1:
+            raise AssertionError("Las columnas no tienen el mismo largo")
+        if any(a >= b for a, b in zip(self._ids, self._ids[1:])):
+            raise AssertionError("Los ids no están en orden creciente")
+        contadores = Counter(c for c in self._estado if c != _BORRADA)
+        if +contadores != +self._contadores or self._estado.count(_BORRADA) != self._borradas:
+            raise AssertionError(f"Contadores desactualizados: {dict(self._contadores)} != {dict(contadores)}")
+        for fila in self._filas_con_codigo(None):
+            entrada = self._entrada_actual[fila]
+            inicio = self._entrada_inicio[entrada]
+            normalizado = self._normalizado[inicio:inicio + self._largo_entrada(entrada)].decode()
+            if self._entrada_fila[entrada] != fila or normalizado != normalizar_texto(self._descripcion(fila)):
+                raise AssertionError(f"Texto normalizado desactualizado en la tarea {self._ids[fila]}")
+
+    # ==================== INTERNOS ====================
+
+    def _registrar(self, operacion: str, valor=None):
+        if self.diario is not None:
+            self.diario.registrar(operacion, valor)
+
+    def _fila(self, id: int) -> Optional[int]:
+        fila = bisect_left(self._ids, id)
+        if fila < len(self._ids) and self._ids[fila] == id and self._estado[fila] != _BORRADA:
+            return fila
+        return None
+
+    def _filas_con_codigo(self, codigo: Optional[int]) -> List[int]:
+        """Filas con ese código de estado (o todas las no borradas si codigo es None)"""
+        if codigo is None:
+            return [f for f, c in enumerate(self._estado) if c != _BORRADA]
+        filas = []
+        fila = self._estado.find(codigo)
+        while fila != -1:
+            filas.append(fila)
+            fila = self._estado.find(codigo, fila + 1)
+        return filas
+
+    def _descripcion(self, fila: int) -> str:
+        inicio = self._inicio[fila]
+        return self._texto[inicio:inicio + self._largo[fila]].decode()
+
+    def _materializar(self, fila: int):
+        return self._materializar_filas([fila])[0]
+
+    def _materializar_filas(self, filas) -> List:
+        """Arma las Tarea de esas filas (es lo más caro de leer: se hace solo al responder).
+        Validar campos simples es más rápido que model_construct en Pydantic v2"""
+        fabrica, estados, fechas_texto = self._fabrica, self._estados, self._fechas_texto
+        ids, estado, fecha, texto, inicio, largo = (
+            self._ids, self._estado, self._fecha, self._texto, self._inicio, self._largo)
+        desde_numero = datetime.fromtimestamp
+        tareas = []
+        for fila in filas:
+            id = ids[fila]
+            desde = inicio[fila]
+            tareas.append(fabrica(
+                id=id,
+                descripcion=texto[desde:desde + largo[fila]].decode(),
+                estado=estados[estado[fila]],
+                fecha_creacion=fechas_texto.get(id) or desde_numero(fecha[fila]).isoformat(),
+            ))
+        return tareas
+
+    def _fecha_a_numero(self, id: int, fecha: str) -> float:
+        """La fecha como timestamp si se puede reconstruir igual; si no, se guarda el texto"""
+        try:
+            numero = datetime.fromisoformat(fecha).timestamp()
+            if datetime.fromtimestamp(numero).isoformat() == fecha:
+                return numero
+        except ValueError:
+            pass
+        self._fechas_texto[id] = fecha
+        return 0.0
+
+    def _guardar_descripcion(self, fila: int, descripcion: str):
+        codificada = descripcion.encode()
+        self._inicio[fila] = len(self._texto)
+        self._largo[fila] = len(codificada)
+        self._texto += codificada
+
+        self._entrada_actual[fila] = len(self._entrada_inicio)
+        self._entrada_inicio.append(len(self._normalizado))
+        self._entrada_fila.append(fila)
+        self._normalizado += normalizar_texto(descripcion).encode() + b"\n"
+
+    def _largo_entrada(self, entrada: int) -> int:
+        """Largo de una entrada del texto normalizado, sin el "\\n" final"""
+        siguiente = entrada + 1
+        fin = self._entrada_inicio[siguiente] if siguiente < len(self._entrada_inicio) else len(self._normalizado)
+        return fin - self._entrada_inicio[entrada] - 1
+
+    @staticmethod
+    def _patron(prefijo: str):
+        return re.compile(_NO_PALABRA + re.escape(prefijo.encode()))
+
+    def _filas_con_prefijo(self, prefijo: str) -> Set[int]:
+        filas = set()
+        for coincidencia in self._patron(prefijo).finditer(self._normalizado):
+            entrada = bisect_right(self._entrada_inicio, coincidencia.start()) - 1
+            fila = self._entrada_fila[entrada]
+            # Las entradas viejas (descripción cambiada o tarea borrada) se ignoran
+            if self._entrada_actual[fila] == entrada and self._estado[fila] != _BORRADA:
+                filas.add(fila)
+        return filas
+
+    def _coincide_fila(self, patron, fila: int) -> bool:
+        entrada = self._entrada_actual[fila]
+        inicio = self._entrada_inicio[entrada]
+        return patron.search(self._normalizado, inicio, inicio + self._largo_entrada(entrada)) is not None
+
+    def _reconstruir_si_conviene(self):
+        if (self._borradas > max(1024, len(self._ids) // 2)
+                or self._basura > max(1 << 20, len(self._texto) // 2)):
+            self._reconstruir()
+
+    def _reconstruir(self):
+        """Vuelve a armar las columnas sin las filas borradas ni el texto sin usar"""
+        vivas = self._filas_con_codigo(None)
+        ids, estado, fecha = self._ids, self._estado, self._fecha
+        descripciones = [self._descripcion(f) for f in vivas]
+        fechas_texto = self._fechas_texto
+        contadores = self._contadores
+        self._iniciar()
+        self._fechas_texto = fechas_texto
+        self._contadores = contadores
+        for nueva, (fila, descripcion) in enumerate(zip(vivas, descripciones)):
+            self._ids.append(ids[fila])
+            self._estado.append(estado[fila])
+            self._fecha.append(fecha[fila])
+            self._inicio.append(0)
+            self._largo.append(0)
+            self._entrada_actual.append(0)
+            self._guardar_descripcion(nueva, descripcion)
@@ -0,0 +1,80 @@
+"""
+Benchmark de memoria: bytes por tarea según cómo se guardan.
+
+  - lista:    la lista de Tarea original del TP
+  - indexado: TareaStore (almacen.py), con índices por estado y por palabra
+  - columnar: TareaStoreColumnar (almacen_columnar.py)
+
+Cada variante se mide en un proceso aparte (la memoria que libera Python no
+siempre vuelve al sistema), comparando la memoria residente antes y después de
+cargar las tareas. También mide cuánto tarda filtrar por estado y buscar.
+
+Uso (desde esta carpeta):
+    python bench_memoria.py            # 200.000 tareas
+    python bench_memoria.py 1000000
+"""
+
+import gc
+import os
+import subprocess
+import sys
+import time
+
+VARIANTES = ["lista", "indexado", "columnar"]
+
+
+def memoria_residente() -> int:
+    with open("/proc/self/statm") as archivo:
+        return int(archivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def medir(variante: str, cantidad: int):
+    from main import EstadoTarea, Tarea
+    from almacen import TareaStore
+    from almacen_columnar import TareaStoreColumnar
+
+    estados = list(EstadoTarea)
+    gc.collect()
+    antes = memoria_residente()
+    if variante == "lista":
+        store = []
+        agregar = store.append
+    else:
+        store = TareaStore(estados=EstadoTarea) if variante == "indexado" else TareaStoreColumnar(Tarea, EstadoTarea)
+        agregar = store.agregar
+    inicio = time.perf_counter()
+    for i in range(1, cantidad + 1):
+        agregar(Tarea(id=i, descripcion=f"Tarea número {i} del benchmark", estado=estados[i % 3],
+                      fecha_creacion=datetime_iso(i)))
+    carga = time.perf_counter() - inicio
+    gc.collect()
+    bytes_por_tarea = (memoria_residente() - antes) / cantidad
+
+    inicio = time.perf_counter()
+    if variante == "lista":
+        filtradas = [t for t in store if t.estado == EstadoTarea.completada]
+        encontradas = [t for t in store if "número 4242 " in t.descripcion.lower()]
+    else:
+        filtradas = store.filtrar(EstadoTarea.completada)
+        encontradas = store.buscar("número 4242")
+    consulta = time.perf_counter() - inicio
+    assert filtradas and encontradas
+    print(f"{variante:>9}: {bytes_por_tarea:7.0f} bytes por tarea, carga {carga / cantidad * 1e6:5.1f} µs por tarea, "
+          f"filtrar + buscar {consulta * 1e3:7.1f} ms")
+
+
+def datetime_iso(i: int) -> str:
+    return f"2025-01-{i % 28 + 1:02d}T10:{i % 60:02d}:{i * 7 % 60:02d}.{i % 1000000:06d}"
+
+
+def main(cantidad: int):
+    print(f"{cantidad:,} tareas")
+    for variante in VARIANTES:
+        subprocess.run([sys.executable, __file__, "--variante", variante, str(cantidad)], check=True)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--variante"]:
+        medir(sys.argv[2], int(sys.argv[3]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
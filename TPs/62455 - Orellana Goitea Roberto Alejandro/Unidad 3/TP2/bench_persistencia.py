@@ -0,0 +1,70 @@
+"""
+Benchmark de la persistencia con snapshot + diario (persistencia.py).
+
+Carga N tareas, escribe un snapshot, agrega una cola de operaciones al diario y
+mide cuánto tarda recuperar todo en un store nuevo (como al reiniciar la API).
+También mide la latencia de registrar cada operación en el diario.
+
+Uso (desde esta carpeta):
+    python bench_persistencia.py              # 1.000.000 de tareas, cola de 100.000
+    python bench_persistencia.py 200000 20000
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from main import EstadoTarea, Tarea
+from almacen import TareaStore
+from persistencia import Diario
+
+ESTADOS = list(EstadoTarea)
+
+
+def nuevo(directorio):
+    store = TareaStore(estados=EstadoTarea)
+    diario = Diario(directorio, Tarea, tipo_estado=EstadoTarea, snapshot_cada=sys.maxsize)
+    return store, diario
+
+
+def main(cantidad: int, cola: int):
+    with tempfile.TemporaryDirectory() as directorio:
+        store, diario = nuevo(directorio)
+        diario.abrir(store)
+
+        inicio = time.perf_counter()
+        for i in range(1, cantidad + 1):
+            store.agregar(Tarea(id=i, descripcion=f"Tarea número {i} del benchmark",
+                                estado=ESTADOS[i % 3], fecha_creacion="2025-01-01T10:00:00"))
+        carga = time.perf_counter() - inicio
+        print(f"Carga de {cantidad:,} tareas (con diario): {carga:.2f} s "
+              f"({carga / cantidad * 1e6:.1f} µs por tarea)")
+
+        inicio = time.perf_counter()
+        diario.snapshot(esperar=True)
+        print(f"Snapshot: {time.perf_counter() - inicio:.2f} s, "
+              f"{os.path.getsize(os.path.join(directorio, 'snapshot.ndjson')) / 2**20:.1f} MiB")
+
+        inicio = time.perf_counter()
+        for i in range(cola):
+            id = i % cantidad + 1
+            store.reemplazar(store.obtener(id).model_copy(update={"estado": ESTADOS[i % 3]}))
+        escritura = time.perf_counter() - inicio
+        print(f"Cola del diario: {cola:,} operaciones, {escritura / cola * 1e6:.1f} µs por operación")
+        diario.cerrar()
+        esperado = store.resumen()
+        del store
+
+        recuperado, diario = nuevo(directorio)
+        inicio = time.perf_counter()
+        diario.abrir(recuperado)
+        recuperacion = time.perf_counter() - inicio
+        diario.cerrar()
+        assert recuperado.resumen() == esperado
+        print(f"Recuperación (snapshot + cola): {recuperacion:.2f} s")
+
+
+if __name__ == "__main__":
+    argumentos = [int(a) for a in sys.argv[1:]]
+    main(*(argumentos + [1_000_000, 100_000][len(argumentos):]))
@@ -1,9 +1,16 @@
 # Importamos las bibliotecas necesarias
-from fastapi import FastAPI, HTTPException, Query
+import atexit
+import os
+
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query
 from pydantic import BaseModel
 from enum import Enum
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+from almacen import TareaStore
+from almacen_columnar import TareaStoreColumnar
+from persistencia import Diario
 
 # Creamos la app de FastAPI
 app = FastAPI()
@@ -14,6 +21,11 @@ class EstadoTarea(str, Enum):
     en_progreso = "en_progreso"
     completada = "completada"
 
+# Cómo se interpreta el filtro ?texto= en GET /tareas
+class ModoBusqueda(str, Enum):
+    palabras = "palabras"    # cada palabra como prefijo, sin importar tildes (usa el índice)
+    subcadena = "subcadena"  # el texto tal cual como parte de la descripción (recorre todo)
+
 # Modelo para una tarea (usando Pydantic para validación automática)
 class Tarea(BaseModel):
     id: int
@@ -31,21 +43,41 @@ class TareaCreate(BaseModel):
     descripcion: str
     estado: EstadoTarea = EstadoTarea.pendiente  # Estado por defecto
 
-# Almacenamiento en memoria: una lista de tareas
-tareas_db: List[Tarea] = []
+# Almacenamiento en memoria: tareas indexadas por id y por estado (ver almacen.py).
+# Con TAREAS_ALMACEN=columnar se usa el almacenamiento por columnas, que ocupa mucha
+# menos memoria con millones de tareas (ver almacen_columnar.py)
+ALMACEN = os.environ.get("TAREAS_ALMACEN", "indexado")
+if ALMACEN == "columnar":
+    tareas_db = TareaStoreColumnar(Tarea, EstadoTarea)
+else:
+    tareas_db = TareaStore(estados=EstadoTarea)
 
 # Contador para generar IDs automáticos
 contador_id = 1
 
+# Persistencia opcional: si se define la variable de entorno TAREAS_DIR_PERSISTENCIA,
+# las tareas se recuperan de esa carpeta al arrancar y cada cambio se guarda en un
+# diario (ver persistencia.py). Sin la variable, todo queda solo en memoria.
+DIR_PERSISTENCIA = os.environ.get("TAREAS_DIR_PERSISTENCIA")
+diario = None
+if DIR_PERSISTENCIA:
+    diario = Diario(DIR_PERSISTENCIA, Tarea, tipo_estado=EstadoTarea,
+                    obtener_contador=lambda: contador_id)
+    contador_id = diario.abrir(tareas_db)
+    atexit.register(diario.cerrar)
+
 # Ruta GET /tareas: Devuelve todas las tareas, con filtros opcionales
 @app.get("/tareas", response_model=List[Tarea])
-def get_tareas(estado: Optional[EstadoTarea] = Query(None), texto: Optional[str] = Query(None)):
-    resultado = tareas_db
-    if estado:
-        resultado = [t for t in resultado if t.estado == estado]
-    if texto:
-        resultado = [t for t in resultado if texto.lower() in t.descripcion.lower()]
-    return resultado
+def get_tareas(
+    estado: Optional[EstadoTarea] = Query(None),
+    texto: Optional[str] = Query(None),
+    busqueda: ModoBusqueda = Query(ModoBusqueda.palabras),
+):
+    if not texto:
+        return tareas_db.filtrar(estado)
+    if busqueda == ModoBusqueda.subcadena:
+        return tareas_db.buscar_subcadena(texto, estado)
+    return tareas_db.buscar(texto, estado)
 
 # Ruta POST /tareas: Agrega una nueva tarea
 @app.post("/tareas", response_model=Tarea, status_code=201)
@@ -53,21 +85,26 @@ def create_tarea(tarea: TareaCreate):
     if not tarea.descripcion.strip():  # Validamos que la descripción no esté vacía
         raise HTTPException(status_code=422, detail={"error": "La descripción no puede estar vacía"})
     global contador_id
-    nueva_tarea = Tarea(
-        id=contador_id,
-        descripcion=tarea.descripcion,
-        estado=tarea.estado,
-        fecha_creacion=datetime.now().isoformat()
-    )
-    tareas_db.append(nueva_tarea)
-    contador_id += 1
+    # Tomar el id y agregar con el lock de escritura: dos requests simultáneos
+    # no pueden recibir el mismo id
+    with tareas_db.escritura():
+        nueva_tarea = Tarea(
+            id=contador_id,
+            descripcion=tarea.descripcion,
+            estado=tarea.estado,
+            fecha_creacion=datetime.now().isoformat()
+        )
+        tareas_db.agregar(nueva_tarea)
+        contador_id += 1
     return nueva_tarea
+
 # Ruta PUT /tareas/completar_todas: Marca todas como completadas
-@app.put("/tareas/completar_todas")
-def completar_todas():
-    # Actualizar todas las tareas
-    for tarea in tareas_db:
-        tarea.estado = EstadoTarea.completada
+@app.put("/tareas/completar_todas", response_model=Dict[str, str])
+def completar_todas(background_tasks: BackgroundTasks):
+    # Marcar todas como completadas en O(1): el store resuelve el estado al leer
+    # y las reescribe de verdad después de responder
+    tareas_db.marcar_todas(EstadoTarea.completada)
+    background_tasks.add_task(tareas_db.compactar_por_partes)
     
     # Devolver mensaje apropiado
     if not tareas_db:
@@ -77,73 +114,41 @@ def completar_todas():
 # Ruta PUT /tareas/{id}: Modifica una tarea existente
 @app.put("/tareas/{id}", response_model=Tarea)
 def update_tarea(id: int, tarea_update: TareaUpdate):
-    for i, t in enumerate(tareas_db):
-        if t.id == id:
-            # Crear un diccionario con los valores actuales
-            tarea_dict = {
-                "id": id,
-                "descripcion": t.descripcion,
-                "estado": t.estado,
-                "fecha_creacion": t.fecha_creacion
-            }
-            
-            # Actualizar solo los campos proporcionados
-            if tarea_update.descripcion is not None:
-                if not tarea_update.descripcion.strip():
-                    raise HTTPException(status_code=422, detail={"error": "La descripción no puede estar vacía"})
-                tarea_dict["descripcion"] = tarea_update.descripcion
-            if tarea_update.estado is not None:
-                tarea_dict["estado"] = tarea_update.estado
-            
-            # Crear la tarea actualizada
-            tareas_db[i] = Tarea(**tarea_dict)
-            return tareas_db[i]
-    raise HTTPException(status_code=404, detail={"error": "La tarea no existe"})
+    if tarea_update.descripcion is not None and not tarea_update.descripcion.strip():
+        raise HTTPException(status_code=422, detail={"error": "La descripción no puede estar vacía"})
 
-# Ruta PUT /tareas/completar_todas: Marca todas como completadas
-@app.put("/tareas/completar_todas")
-def completar_todas():
-    # Actualizar todas las tareas
-    for tarea in tareas_db:
-        tarea.estado = EstadoTarea.completada
-    
-    # Devolver mensaje apropiado
-    if not tareas_db:
-        return {"mensaje": "No hay tareas"}
-    return {"mensaje": "Todas las tareas han sido marcadas como completadas"}
+    # Leer y reemplazar con el lock de escritura, para no pisar un cambio simultáneo
+    with tareas_db.escritura():
+        t = tareas_db.obtener(id)
+        if t is None:
+            raise HTTPException(status_code=404, detail={"error": "La tarea no existe"})
+
+        # Crear un diccionario con los valores actuales
+        tarea_dict = {
+            "id": id,
+            "descripcion": t.descripcion,
+            "estado": t.estado,
+            "fecha_creacion": t.fecha_creacion
+        }
+
+        # Actualizar solo los campos proporcionados
+        if tarea_update.descripcion is not None:
+            tarea_dict["descripcion"] = tarea_update.descripcion
+        if tarea_update.estado is not None:
+            tarea_dict["estado"] = tarea_update.estado
+
+        # Crear la tarea actualizada (mantiene su posición en el listado)
+        return tareas_db.reemplazar(Tarea(**tarea_dict))
 
 # Ruta DELETE /tareas/{id}: Elimina una tarea
 @app.delete("/tareas/{id}")
 def delete_tarea(id: int):
-    for i, t in enumerate(tareas_db):
-        if t.id == id:
-            del tareas_db[i]
-            return {"mensaje": "Tarea eliminada"}
+    if tareas_db.eliminar(id) is not None:
+        return {"mensaje": "Tarea eliminada"}
     raise HTTPException(status_code=404, detail={"error": "La tarea no existe"})
 
 # Ruta GET /tareas/resumen: Contador de tareas por estado
 @app.get("/tareas/resumen")
 def get_resumen():
-    resumen = {
-        "pendiente": 0,
-        "en_progreso": 0,
-        "completada": 0
-    }
-    for t in tareas_db:
-        resumen[t.estado.value] += 1
-    return resumen
-
-# Respuesta para el endpoint completar_todas
-from typing import Dict
-
-# Ruta PUT /tareas/completar_todas: Marca todas como completadas
-@app.put("/tareas/completar_todas", response_model=Dict[str, str])
-def completar_todas():
-    # Actualizar todas las tareas
-    for tarea in tareas_db:
-        tarea.estado = EstadoTarea.completada
-    
-    # Devolver mensaje apropiado
-    if not tareas_db:
-        return {"mensaje": "No hay tareas"}
-    return {"mensaje": "Todas las tareas han sido marcadas como completadas"}
\ No newline at end of file
+    # Los contadores se mantienen en cada alta/cambio/baja: no hace falta recorrer las tareas
+    return tareas_db.resumen()
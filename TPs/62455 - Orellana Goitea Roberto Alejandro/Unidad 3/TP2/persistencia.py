@@ -0,0 +1,276 @@
+# Persistencia opcional del TP2: snapshot + diario (journal) de operaciones.
+#
+# Cada cambio del TareaStore se agrega como una línea JSON al final del diario
+# (diario-<generacion>.ndjson). Un hilo hace flush + fsync cada `intervalo`
+# segundos, juntando todas las escrituras de ese lapso en un solo fsync
+# (group commit), así los requests no esperan al disco.
+#
+# Cada `snapshot_cada` operaciones se pasa a una generación nueva del diario y
+# se escribe snapshot.ndjson con todas las tareas (compactado: una línea por
+# tarea). Al arrancar se carga el snapshot y se reaplican solo los diarios de
+# esa generación en adelante, así que recuperar tarda lo que leer el snapshot
+# más la cola del diario.
+import gc
+import json
+import os
+import re
+import threading
+from typing import Callable, List, Optional, Tuple
+
+ARCHIVO_SNAPSHOT = "snapshot.ndjson"
+_PATRON_DIARIO = re.compile(r"^diario-(\d+)\.ndjson$")
+
+
+class DiarioCorruptoError(Exception):
+    pass
+
+
+class Diario:
+    """
+    Diario de operaciones de un TareaStore.
+
+    Args:
+        directorio: Carpeta donde se guardan snapshot y diarios (se crea si no existe)
+        fabrica: Modelo de las tareas (ej: Tarea), para reconstruirlas al recuperar
+        tipo_estado: Tipo de los estados (ej: EstadoTarea), para marcar_todas al recuperar
+        obtener_contador: Devuelve el próximo id a asignar (se guarda en el snapshot)
+        intervalo: Segundos entre fsyncs del diario
+        esperar_fsync: Si es True, registrar() espera al fsync que cubre su escritura
+            (más lento, pero un cambio respondido nunca se pierde)
+        snapshot_cada: Cantidad de operaciones del diario que disparan un snapshot nuevo
+    """
+
+    def __init__(self, directorio: str, fabrica, tipo_estado=str,
+                 obtener_contador: Callable[[], int] = lambda: 1,
+                 intervalo: float = 0.05, esperar_fsync: bool = False,
+                 snapshot_cada: int = 100_000):
+        self.directorio = directorio
+        self._fabrica = fabrica
+        self._tipo_estado = tipo_estado
+        self._obtener_contador = obtener_contador
+        self._intervalo = intervalo
+        self._esperar_fsync = esperar_fsync
+        self._snapshot_cada = snapshot_cada
+
+        self._store = None
+        self._archivo = None
+        self._generacion = 0
+        self._escritas = 0           # operaciones escritas (en el buffer) desde que se abrió
+        self._sincronizadas = 0      # operaciones que ya pasaron por fsync
+        self._desde_snapshot = 0
+        self._hilo_snapshot: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._sincronizado = threading.Condition(self._lock)
+        self._cerrando = threading.Event()
+        self._hilo_fsync: Optional[threading.Thread] = None
+
+    # ==================== ARRANQUE Y CIERRE ====================
+
+    def abrir(self, store) -> int:
+        """
+        Recupera el estado guardado en store (que debe estar vacío) y empieza a
+        registrar sus cambios.
+
+        Returns:
+            El próximo id a asignar
+        """
+        os.makedirs(self.directorio, exist_ok=True)
+        # Durante la carga solo se crean objetos que van a quedar: el recolector de
+        # basura no encontraría nada y recorrerlos una y otra vez hace todo más lento
+        gc_activo = gc.isenabled()
+        gc.disable()
+        try:
+            contador, generacion = self._cargar_snapshot(store)
+            for gen in self._generaciones():
+                if gen >= generacion:
+                    contador = max(contador, self._reaplicar(store, gen))
+                    generacion = gen
+        finally:
+            if gc_activo:
+                gc.enable()
+        gc.freeze()  # lo recuperado no se vuelve a revisar en cada recolección
+
+        self._store = store
+        self._generacion = generacion
+        self._archivo = open(self._ruta_diario(generacion), "a", encoding="utf-8")
+        store.diario = self
+        self._hilo_fsync = threading.Thread(target=self._bucle_fsync, name="diario-fsync", daemon=True)
+        self._hilo_fsync.start()
+        return contador
+
+    def cerrar(self):
+        """Sincroniza lo pendiente, espera al snapshot en curso y cierra el diario"""
+        if self._archivo is None:
+            return
+        self._cerrando.set()
+        self._hilo_fsync.join()
+        if self._hilo_snapshot is not None:
+            self._hilo_snapshot.join()
+        with self._lock:
+            self._sincronizar()
+            self._archivo.close()
+            self._archivo = None
+        if self._store is not None:
+            self._store.diario = None
+
+    # ==================== REGISTRO ====================
+
+    def registrar(self, operacion: str, valor=None):
+        """Agrega una operación del store al diario (la llama el TareaStore)"""
+        if operacion in ("agregar", "reemplazar"):
+            # model_dump_json es bastante más rápido que pasar por dict + json.dumps
+            linea = f'["{operacion}",{valor.model_dump_json()}]\n'
+        else:
+            valor = getattr(valor, "value", valor)
+            linea = json.dumps([operacion, valor], ensure_ascii=False, separators=(",", ":")) + "\n"
+
+        with self._lock:
+            self._archivo.write(linea)
+            self._escritas += 1
+            numero = self._escritas
+            self._desde_snapshot += 1
+            snapshot = self._desde_snapshot >= self._snapshot_cada
+            if self._esperar_fsync:
+                while self._sincronizadas < numero and self._archivo is not None:
+                    self._sincronizado.wait()
+        if snapshot:
+            self.snapshot()
+
+    def snapshot(self, esperar: bool = False) -> bool:
+        """
+        Pasa a una generación nueva del diario y escribe un snapshot del store en
+        segundo plano. Devuelve False si ya había un snapshot en curso.
+        """
+        # Primero el lock del store y después el del diario (el mismo orden que
+        # al registrar un cambio): así nadie cambia el store entre la copia de las
+        # tareas y el cambio de generación
+        with self._store.lectura(), self._lock:
+            if self._hilo_snapshot is not None and self._hilo_snapshot.is_alive():
+                return False
+            # Lo anterior queda completo en el diario viejo; lo que venga va al nuevo
+            self._sincronizar()
+            self._archivo.close()
+            self._generacion += 1
+            self._archivo = open(self._ruta_diario(self._generacion), "a", encoding="utf-8")
+            self._desde_snapshot = 0
+            tareas = self._store.filtrar()
+            contador = self._obtener_contador()
+            self._hilo_snapshot = threading.Thread(
+                target=self._escribir_snapshot, args=(self._generacion, contador, tareas),
+                name="diario-snapshot", daemon=True,
+            )
+            self._hilo_snapshot.start()
+        if esperar:
+            self._hilo_snapshot.join()
+        return True
+
+    # ==================== INTERNOS ====================
+
+    def _ruta(self, nombre: str) -> str:
+        return os.path.join(self.directorio, nombre)
+
+    def _ruta_diario(self, generacion: int) -> str:
+        return self._ruta(f"diario-{generacion}.ndjson")
+
+    def _generaciones(self) -> List[int]:
+        generaciones = []
+        for nombre in os.listdir(self.directorio):
+            coincidencia = _PATRON_DIARIO.match(nombre)
+            if coincidencia:
+                generaciones.append(int(coincidencia.group(1)))
+        return sorted(generaciones)
+
+    def _sincronizar(self):
+        """flush + fsync del diario actual (con el lock tomado)"""
+        if self._sincronizadas == self._escritas:
+            return
+        self._archivo.flush()
+        os.fsync(self._archivo.fileno())
+        self._sincronizadas = self._escritas
+        self._sincronizado.notify_all()
+
+    def _bucle_fsync(self):
+        while not self._cerrando.wait(self._intervalo):
+            with self._lock:
+                if self._sincronizadas == self._escritas:
+                    continue
+                self._archivo.flush()
+                numero = self._escritas
+                # Copia del descriptor: sigue siendo válida aunque un snapshot cierre el archivo
+                descriptor = os.dup(self._archivo.fileno())
+            try:
+                os.fsync(descriptor)  # fuera del lock: los requests siguen escribiendo mientras tanto
+            finally:
+                os.close(descriptor)
+            with self._lock:
+                self._sincronizadas = max(self._sincronizadas, numero)
+                self._sincronizado.notify_all()
+
+    def _escribir_snapshot(self, generacion: int, contador: int, tareas: list):
+        temporal = self._ruta(ARCHIVO_SNAPSHOT + ".tmp")
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            archivo.write(json.dumps({"generacion": generacion, "contador_id": contador}) + "\n")
+            for tarea in tareas:
+                archivo.write(tarea.model_dump_json() + "\n")
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        # El reemplazo es atómico: si se corta antes, queda el snapshot anterior
+        os.replace(temporal, self._ruta(ARCHIVO_SNAPSHOT))
+        for gen in self._generaciones():
+            if gen < generacion:
+                os.remove(self._ruta_diario(gen))
+
+    def _cargar_snapshot(self, store) -> Tuple[int, int]:
+        ruta = self._ruta(ARCHIVO_SNAPSHOT)
+        if not os.path.exists(ruta):
+            return 1, 0
+        validar = self._fabrica.model_validate_json
+        siguiente = 1
+        with open(ruta, encoding="utf-8") as archivo:
+            cabecera = json.loads(archivo.readline())
+            for linea in archivo:
+                tarea = validar(linea)
+                siguiente = max(siguiente, tarea.id + 1)
+                store.agregar(tarea)
+        # El snapshot puede dispararse dentro de un agregar, antes de que la app
+        # avance su contador: el guardado puede ser el id de la última tarea
+        return max(cabecera["contador_id"], siguiente), cabecera["generacion"]
+
+    def _reaplicar(self, store, generacion: int) -> int:
+        """Reaplica un diario sobre store. Devuelve el próximo id según lo visto"""
+        ruta = self._ruta_diario(generacion)
+        contador = 1
+        with open(ruta, "rb") as archivo:
+            lineas = archivo.readlines()
+        valido = 0
+        for numero, linea in enumerate(lineas):
+            try:
+                if not linea.endswith(b"\n"):
+                    raise ValueError("línea incompleta")
+                operacion, valor = json.loads(linea)
+            except ValueError:
+                if numero == len(lineas) - 1:
+                    # Última línea a medio escribir (corte durante la escritura): se descarta
+                    with open(ruta, "r+b") as archivo:
+                        archivo.truncate(valido)
+                    break
+                raise DiarioCorruptoError(f"{ruta}: línea {numero + 1} inválida")
+            valido += len(linea)
+
+            if operacion in ("agregar", "reemplazar"):
+                tarea = self._fabrica.model_validate(valor)
+                contador = max(contador, tarea.id + 1)
+                # Idempotente: si la tarea ya estaba (por ej. en el snapshot) se reemplaza
+                if tarea.id in store:
+                    store.reemplazar(tarea)
+                else:
+                    store.agregar(tarea)
+            elif operacion == "eliminar":
+                store.eliminar(valor)
+            elif operacion == "marcar_todas":
+                store.marcar_todas(self._tipo_estado(valor))
+            elif operacion == "vaciar":
+                store.clear()
+            else:
+                raise DiarioCorruptoError(f"{ruta}: operación desconocida '{operacion}'")
+        return contador
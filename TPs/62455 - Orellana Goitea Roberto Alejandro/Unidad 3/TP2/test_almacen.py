@@ -0,0 +1,124 @@
+"""
+Tests del almacenamiento indexado de tareas (almacen.py).
+Ejecutar desde esta carpeta con: python -m pytest test_almacen.py -v
+"""
+
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from almacen import TareaStore
+
+client = TestClient(main.app)
+
+
+@pytest.fixture(autouse=True)
+def limpiar_db():
+    main.tareas_db.clear()
+    main.contador_id = 1
+    yield
+    main.tareas_db.clear()
+
+
+def test_store_coincide_con_lista():
+    """Operaciones al azar: el store se comporta igual que la lista original"""
+    rnd = random.Random(7)
+    store, lista = TareaStore(estados=main.EstadoTarea), []
+    for i in range(1500):
+        op = rnd.random()
+        if op < 0.02:
+            store.marcar_todas(main.EstadoTarea.completada)
+            lista = [t.model_copy(update={"estado": main.EstadoTarea.completada}) for t in lista]
+        elif op < 0.06:
+            store.compactar(limite=rnd.randrange(20))  # compactación parcial, como en segundo plano
+        elif op < 0.5 or not lista:
+            tarea = main.Tarea(id=i, descripcion=f"T{i}", estado=rnd.choice(list(main.EstadoTarea)),
+                               fecha_creacion="2025-01-01")
+            store.agregar(tarea)
+            lista.append(tarea)
+        elif op < 0.8:
+            pos = rnd.randrange(len(lista))
+            lista[pos] = lista[pos].model_copy(update={"estado": rnd.choice(list(main.EstadoTarea))})
+            store.reemplazar(lista[pos])
+        else:
+            tarea = lista.pop(rnd.randrange(len(lista)))
+            assert store.eliminar(tarea.id) == tarea
+        store.verificar_consistencia()
+
+    assert list(store) == lista
+    for estado in main.EstadoTarea:
+        assert store.filtrar(estado) == [t for t in lista if t.estado == estado]
+        assert store.filtrar(estado.value) == store.filtrar(estado)
+        assert store.resumen()[estado.value] == sum(t.estado == estado for t in lista)
+
+
+def test_actualizar_mantiene_orden_y_filtro():
+    """Cambiar el estado mueve la tarea de filtro pero no de posición"""
+    for i in range(3):
+        client.post("/tareas", json={"descripcion": f"Tarea {i}"})
+    client.put("/tareas/1", json={"estado": "completada"})
+
+    assert [t["id"] for t in client.get("/tareas").json()] == [1, 2, 3]
+    assert [t["id"] for t in client.get("/tareas?estado=pendiente").json()] == [2, 3]
+    assert [t["id"] for t in client.get("/tareas?estado=completada").json()] == [1]
+
+    client.delete("/tareas/2")
+    client.put("/tareas/completar_todas")
+    assert [t["id"] for t in client.get("/tareas?estado=completada").json()] == [1, 3]
+    assert client.get("/tareas?estado=pendiente").json() == []
+
+
+def test_verificar_consistencia_detecta_cambios_por_fuera():
+    """Modificar una tarea sin pasar por el store desincroniza los contadores"""
+    client.post("/tareas", json={"descripcion": "Tarea"})
+    main.tareas_db.verificar_consistencia()
+    main.tareas_db.obtener(1).estado = main.EstadoTarea.completada
+    with pytest.raises(AssertionError):
+        main.tareas_db.verificar_consistencia()
+
+
+def test_completar_todas_es_perezoso_y_exacto():
+    """marcar_todas no reescribe las tareas, pero lecturas, filtros y resumen ya lo reflejan"""
+    store = TareaStore(estados=main.EstadoTarea)
+    for i in range(1, 6):
+        store.agregar(main.Tarea(id=i, descripcion=f"T{i}", estado="pendiente", fecha_creacion="2025-01-01"))
+    assert store.marcar_todas(main.EstadoTarea.completada) == 5
+    assert store._tareas[1].estado == main.EstadoTarea.pendiente  # todavía sin compactar
+
+    store.reemplazar(store.obtener(2).model_copy(update={"estado": main.EstadoTarea.en_progreso}))
+    store.agregar(main.Tarea(id=6, descripcion="T6", estado="pendiente", fecha_creacion="2025-01-01"))
+    store.eliminar(3)
+
+    esperado = {"pendiente": [6], "en_progreso": [2], "completada": [1, 4, 5]}
+    for _ in range(2):  # antes y después de compactar
+        for estado, ids in esperado.items():
+            assert [t.id for t in store.filtrar(estado)] == ids
+            assert store.resumen()[estado] == len(ids)
+        assert store.obtener(1).estado == main.EstadoTarea.completada
+        store.verificar_consistencia()
+        store.compactar()
+    assert store._tareas[1].estado == main.EstadoTarea.completada
+
+
+def test_busqueda_por_palabras_y_subcadena():
+    """?texto= usa el índice de palabras (prefijos, AND, sin tildes) o la subcadena original"""
+    for descripcion in ["Estudiar Matemáticas", "Comprar leche y pan", "Leer el diseño", "Pan dulce"]:
+        client.post("/tareas", json={"descripcion": descripcion})
+    client.put("/tareas/4", json={"descripcion": "Torta", "estado": "completada"})
+
+    ids = lambda **params: [t["id"] for t in client.get("/tareas", params=params).json()]
+    assert ids(texto="matematicas") == [1]
+    assert ids(texto="LE") == [2, 3]
+    assert ids(texto="pan compr") == [2]
+    assert ids(texto="pan dulce") == []
+    assert ids(texto="diseño") == [3] and ids(texto="diseno") == []
+    assert ids(texto="tor", estado="completada") == [4]
+    assert ids(texto="tor", estado="pendiente") == []
+    assert ids(texto="eche") == []
+    assert ids(texto="eche", busqueda="subcadena") == [2]
+
+    client.delete("/tareas/2")
+    assert ids(texto="leche") == []
+    main.tareas_db.verificar_consistencia()
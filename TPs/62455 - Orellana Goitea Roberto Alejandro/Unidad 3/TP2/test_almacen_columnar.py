@@ -0,0 +1,87 @@
+"""
+Tests del almacenamiento por columnas (almacen_columnar.py): tiene que responder
+igual que el TareaStore indexado.
+Ejecutar desde esta carpeta con: python -m pytest test_almacen_columnar.py -v
+"""
+
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from almacen import TareaStore
+from almacen_columnar import TareaStoreColumnar
+
+client = TestClient(main.app)
+PALABRAS = ["Estudiar", "matemáticas", "comprar", "leche", "Ñandú", "diseño", "pan", "torta", "leer"]
+
+
+@pytest.fixture
+def columnar(monkeypatch):
+    store = TareaStoreColumnar(main.Tarea, main.EstadoTarea)
+    monkeypatch.setattr(main, "tareas_db", store)
+    monkeypatch.setattr(main, "contador_id", 1)
+    return store
+
+
+def test_columnar_coincide_con_indexado():
+    """Operaciones al azar: mismas respuestas que TareaStore"""
+    rnd = random.Random(11)
+    indexado, columnar = TareaStore(estados=main.EstadoTarea), TareaStoreColumnar(main.Tarea, main.EstadoTarea)
+    ids = []
+    for i in range(1, 4000):
+        op = rnd.random()
+        if op < 0.01:
+            estado = rnd.choice(list(main.EstadoTarea))
+            assert columnar.marcar_todas(estado) == indexado.marcar_todas(estado)
+            if rnd.random() < 0.5:  # como el background task de PUT /tareas/completar_todas
+                indexado.compactar_por_partes()
+                assert columnar.compactar_por_partes() == 0
+        elif op < 0.5 or not ids:
+            fecha = rnd.choice(["2025-01-01T10:00:00", "2025-03-30T02:30:00.123456", "hoy"])
+            tarea = main.Tarea(id=i, descripcion=" ".join(rnd.sample(PALABRAS, 2)),
+                               estado=rnd.choice(list(main.EstadoTarea)), fecha_creacion=fecha)
+            indexado.agregar(tarea)
+            columnar.agregar(tarea)
+            ids.append(i)
+        elif op < 0.75:
+            tarea = indexado.obtener(rnd.choice(ids)).model_copy(update={
+                "estado": rnd.choice(list(main.EstadoTarea)), "descripcion": rnd.choice(PALABRAS)})
+            indexado.reemplazar(tarea)
+            columnar.reemplazar(tarea)
+        else:
+            id = ids.pop(rnd.randrange(len(ids)))
+            assert columnar.eliminar(id) == indexado.eliminar(id)
+        if i % 100 == 0:
+            columnar.verificar_consistencia()
+        if i % 1000 == 0:
+            columnar._reconstruir()  # como cuando se acumulan muchos borrados
+
+    columnar.verificar_consistencia()
+    assert len(columnar) == len(indexado)
+    assert list(columnar) == list(indexado)
+    assert columnar.resumen() == indexado.resumen()
+    for estado in [None, *main.EstadoTarea]:
+        assert columnar.filtrar(estado) == indexado.filtrar(estado)
+        for texto in ["le", "pan", "NANDU", "ñandú", "diseño le", "xyz", "eche", "  "]:
+            assert columnar.buscar(texto, estado) == indexado.buscar(texto, estado)
+    with pytest.raises(ValueError):
+        columnar.agregar(main.Tarea(id=1, descripcion="Vieja", estado="pendiente", fecha_creacion="2025-01-01"))
+
+
+def test_api_con_almacen_columnar(columnar):
+    """Los endpoints funcionan igual usando el almacenamiento por columnas"""
+    for descripcion in ["Comprar leche", "Leer el diseño", "Pan dulce"]:
+        client.post("/tareas", json={"descripcion": descripcion})
+    assert client.put("/tareas/2", json={"estado": "completada"}).json()["estado"] == "completada"
+    client.delete("/tareas/3")
+
+    assert [t["id"] for t in client.get("/tareas").json()] == [1, 2]
+    assert [t["id"] for t in client.get("/tareas", params={"texto": "le"}).json()] == [1, 2]
+    assert client.get("/tareas/resumen").json() == {"pendiente": 1, "en_progreso": 0, "completada": 1}
+
+    client.put("/tareas/completar_todas")
+    assert [t["id"] for t in client.get("/tareas?estado=completada").json()] == [1, 2]
+    assert len(columnar) == 2
+    columnar.verificar_consistencia()
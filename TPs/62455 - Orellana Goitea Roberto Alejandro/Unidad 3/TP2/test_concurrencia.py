@@ -0,0 +1,122 @@
+"""
+Tests de concurrencia del TareaStore: muchos hilos usando los endpoints a la vez,
+como hace el threadpool de FastAPI con los endpoints `def`.
+Ejecutar desde esta carpeta con: python -m pytest test_concurrencia.py -v
+"""
+
+import random
+import sys
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+import main
+
+HILOS = 16
+OPERACIONES_POR_HILO = 300
+
+
+@pytest.fixture(autouse=True)
+def limpiar_db():
+    main.tareas_db.clear()
+    main.contador_id = 1
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # cambios de hilo muy seguidos: más intercalado
+    yield
+    sys.setswitchinterval(intervalo)
+    main.tareas_db.clear()
+
+
+def ejecutar_en_hilos(funcion, cantidad=HILOS):
+    errores = []
+
+    def envoltura(numero):
+        try:
+            funcion(numero)
+        except Exception as e:  # se re-lanza en el hilo principal
+            errores.append(e)
+
+    hilos = [threading.Thread(target=envoltura, args=(n,)) for n in range(cantidad)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    if errores:
+        raise errores[0]
+
+
+def test_estres_endpoints_concurrentes():
+    """Altas, cambios, bajas, lecturas y completar_todas a la vez mantienen los invariantes"""
+    creadas = [[] for _ in range(HILOS)]
+    eliminadas = [[] for _ in range(HILOS)]
+
+    def trabajar(numero):
+        rnd = random.Random(numero)
+        for _ in range(OPERACIONES_POR_HILO):
+            op = rnd.random()
+            if op < 0.4:
+                tarea = main.create_tarea(main.TareaCreate(descripcion=f"Tarea del hilo{numero:02d}"))
+                creadas[numero].append(tarea.id)
+            elif op < 0.6 and creadas[numero]:
+                main.update_tarea(rnd.choice(creadas[numero]), main.TareaUpdate(estado=rnd.choice(list(main.EstadoTarea))))
+            elif op < 0.7 and creadas[numero]:
+                id = creadas[numero].pop()
+                main.delete_tarea(id)
+                eliminadas[numero].append(id)
+            elif op < 0.72:
+                main.tareas_db.marcar_todas(main.EstadoTarea.completada)
+                main.tareas_db.compactar_por_partes(lote=50)
+            else:
+                tareas = main.get_tareas(estado=rnd.choice(list(main.EstadoTarea)), texto=None,
+                                         busqueda=main.ModoBusqueda.palabras)
+                assert len({t.id for t in tareas}) == len(tareas)
+                main.get_tareas(estado=None, texto=f"hilo{numero:02d}", busqueda=main.ModoBusqueda.palabras)
+                assert sum(main.get_resumen().values()) >= 0
+
+    ejecutar_en_hilos(trabajar)
+
+    todas_creadas = [id for ids in creadas + eliminadas for id in ids]
+    # Ningún id repetido ni salteado: el contador se incrementa de forma atómica
+    assert sorted(todas_creadas) == list(range(1, len(todas_creadas) + 1))
+    assert main.contador_id == len(todas_creadas) + 1
+
+    vivas = sorted(id for ids in creadas for id in ids)
+    assert [t.id for t in main.tareas_db] == vivas
+    assert sum(main.get_resumen().values()) == len(vivas)
+    for numero in range(HILOS):
+        encontradas = main.get_tareas(estado=None, texto=f"hilo{numero:02d}", busqueda=main.ModoBusqueda.palabras)
+        assert [t.id for t in encontradas] == sorted(creadas[numero])
+    main.tareas_db.verificar_consistencia()
+
+
+def test_lecturas_no_se_bloquean_entre_si():
+    """Con una lectura en curso, otras lecturas siguen y las escrituras esperan"""
+    main.create_tarea(main.TareaCreate(descripcion="Tarea"))
+    dentro, soltar = threading.Event(), threading.Event()
+
+    def lectura_larga():
+        with main.tareas_db.lectura():
+            dentro.set()
+            soltar.wait(5)
+
+    larga = threading.Thread(target=lectura_larga)
+    larga.start()
+    dentro.wait(5)
+
+    lector = threading.Thread(target=lambda: main.get_tareas(estado=None, texto=None,
+                                                             busqueda=main.ModoBusqueda.palabras))
+    escritor = threading.Thread(target=lambda: main.delete_tarea(1))
+    lector.start()
+    lector.join(2)
+    assert not lector.is_alive()
+    escritor.start()
+    escritor.join(0.2)
+    assert escritor.is_alive()  # espera a que termine la lectura larga
+
+    soltar.set()
+    escritor.join(5)
+    larga.join(5)
+    assert not escritor.is_alive()
+    with pytest.raises(HTTPException):
+        main.delete_tarea(1)
@@ -0,0 +1,78 @@
+"""
+Tests de la persistencia con snapshot + diario (persistencia.py).
+Ejecutar desde esta carpeta con: python -m pytest test_persistencia.py -v
+"""
+
+import os
+
+import main
+from almacen import TareaStore
+from persistencia import Diario
+
+
+def abrir(directorio, **opciones):
+    store = TareaStore(estados=main.EstadoTarea)
+    diario = Diario(str(directorio), main.Tarea, tipo_estado=main.EstadoTarea, intervalo=0.01, **opciones)
+    return store, diario, diario.abrir(store)
+
+
+def tarea(id, estado="pendiente"):
+    return main.Tarea(id=id, descripcion=f"Tarea {id}", estado=estado, fecha_creacion="2025-01-01")
+
+
+def test_recupera_snapshot_y_cola_del_diario(tmp_path):
+    """Tras reiniciar se recupera lo del snapshot más lo escrito después en el diario"""
+    store, diario, contador = abrir(tmp_path, snapshot_cada=25)
+    assert contador == 1
+    for i in range(1, 61):
+        store.agregar(tarea(i))
+    store.reemplazar(tarea(3, "en_progreso"))
+    store.eliminar(4)
+    store.marcar_todas(main.EstadoTarea.completada)
+    store.agregar(tarea(61))
+    store.eliminar(61)
+    esperado = store.filtrar()
+    diario.cerrar()
+
+    assert os.path.exists(tmp_path / "snapshot.ndjson")
+    assert len([n for n in os.listdir(tmp_path) if n.startswith("diario-")]) == 1  # los viejos se borran
+
+    recuperado, diario, contador = abrir(tmp_path)
+    assert recuperado.filtrar() == esperado
+    assert recuperado.resumen() == store.resumen()
+    assert contador == 62
+    recuperado.verificar_consistencia()
+    diario.cerrar()
+
+
+def test_descarta_linea_incompleta_al_final(tmp_path):
+    """Un corte a mitad de una escritura no impide recuperar lo anterior"""
+    store, diario, _ = abrir(tmp_path, esperar_fsync=True)
+    store.agregar(tarea(1))
+    store.agregar(tarea(2))
+    diario.cerrar()
+    with open(tmp_path / "diario-0.ndjson", "a", encoding="utf-8") as archivo:
+        archivo.write('["agregar",{"id":3,"desc')
+
+    recuperado, diario, contador = abrir(tmp_path)
+    assert [t.id for t in recuperado] == [1, 2] and contador == 3
+    recuperado.agregar(tarea(3))
+    diario.cerrar()
+    recuperado, diario, _ = abrir(tmp_path)
+    assert [t.id for t in recuperado] == [1, 2, 3]
+    diario.cerrar()
+
+
+def test_reinicio_justo_despues_de_un_snapshot(tmp_path):
+    """Como en main.py el contador avanza después de agregar: el snapshot que dispara
+    ese agregar guarda un contador atrasado, pero al reiniciar no se repiten ids"""
+    contador = {"id": 1}
+    store, diario, _ = abrir(tmp_path, snapshot_cada=3, obtener_contador=lambda: contador["id"])
+    for _ in range(3):
+        store.agregar(tarea(contador["id"]))
+        contador["id"] += 1
+    diario.cerrar()
+
+    recuperado, diario, siguiente = abrir(tmp_path)
+    assert [t.id for t in recuperado] == [1, 2, 3] and siguiente == 4
+    diario.cerrar()
@@ -53,9 +53,111 @@ def get_db():
     finally:
         conn.close()
 
+# ==================== BÚSQUEDA DE TEXTO (FTS5) ====================
+
+# Normalización para búsquedas en español: minúsculas y sin tildes/diéresis.
+# La misma tabla se aplica en Python (al texto buscado) y en SQL (en los
+# triggers que cargan el índice), así ambos lados quedan idénticos.
+_MAPA_ACENTOS = {
+    "á": "a", "é": "e", "í": "i", "ó": "o", "ú": "u", "ü": "u",
+    "Á": "a", "É": "e", "Í": "i", "Ó": "o", "Ú": "u", "Ü": "u", "Ñ": "ñ",
+}
+_TABLA_NORMALIZACION = str.maketrans({
+    **{chr(c): chr(c + 32) for c in range(ord("A"), ord("Z") + 1)},
+    **_MAPA_ACENTOS,
+})
+
+def normalizar_texto(texto: str) -> str:
+    """Pasa a minúsculas y quita tildes (igual que sql_normalizar)"""
+    return texto.translate(_TABLA_NORMALIZACION)
+
+def sql_normalizar(expresion: str) -> str:
+    """Expresión SQL equivalente a normalizar_texto() sobre `expresion`"""
+    for origen, destino in _MAPA_ACENTOS.items():
+        expresion = f"replace({expresion}, '{origen}', '{destino}')"
+    # lower() de SQLite solo convierte ASCII, igual que la tabla de Python
+    return f"lower({expresion})"
+
+def crear_indice_busqueda(cursor) -> Optional[str]:
+    """
+    Crea (si no existe) el índice FTS5 tareas_fts sobre la descripción
+    normalizada, con triggers que lo mantienen sincronizado con tareas.
+    Usa el tokenizer 'trigram' (subcadenas) si la SQLite lo soporta,
+    si no 'unicode61' (prefijos de palabra).
+    
+    Returns:
+        El tokenizer usado, o None si esta SQLite no tiene FTS5
+    """
+    cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'tareas_fts'")
+    row = cursor.fetchone()
+    if row:
+        return "trigram" if "trigram" in row[0] else "unicode61"
+    
+    tokenizer = None
+    for candidato in ("trigram", "unicode61"):
+        try:
+            cursor.execute(f"CREATE VIRTUAL TABLE tareas_fts USING fts5(descripcion, tokenize='{candidato}')")
+            tokenizer = candidato
+            break
+        except sqlite3.OperationalError:
+            continue
+    if tokenizer is None:
+        return None
+    
+    # Cargar las tareas que ya existían y crear los triggers de sincronización
+    cursor.execute(f"""
+        INSERT INTO tareas_fts (rowid, descripcion)
+        SELECT id, {sql_normalizar('descripcion')} FROM tareas
+    """)
+    descripcion_new = sql_normalizar("NEW.descripcion")
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tareas_insert_fts AFTER INSERT ON tareas
+        BEGIN
+            INSERT INTO tareas_fts (rowid, descripcion) VALUES (NEW.id, {descripcion_new});
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_tareas_delete_fts AFTER DELETE ON tareas
+        BEGIN
+            DELETE FROM tareas_fts WHERE rowid = OLD.id;
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tareas_update_fts AFTER UPDATE OF descripcion ON tareas
+        BEGIN
+            UPDATE tareas_fts SET descripcion = {descripcion_new} WHERE rowid = NEW.id;
+        END
+    """)
+    return tokenizer
+
+# Tokenizer del índice de búsqueda (lo fija init_db)
+MODO_BUSQUEDA: Optional[str] = None
+
+def filtro_texto_sql(texto: str):
+    """
+    Condición SQL (y parámetros) para buscar `texto` en la descripción,
+    sin distinguir mayúsculas ni tildes.
+    
+    Returns:
+        Tupla (condicion, params) para agregar al WHERE
+    """
+    texto = normalizar_texto(texto)
+    # Con menos de 3 caracteres no hay trigramas. SQLite solo recorre la tabla si
+    # son menos de 3 *bytes*: "ño" (3 bytes) se buscaría como trigrama y no daría nada
+    if MODO_BUSQUEDA == "trigram" and len(texto) >= 3:
+        return "id IN (SELECT rowid FROM tareas_fts WHERE descripcion LIKE ?)", [f"%{texto}%"]
+    if MODO_BUSQUEDA == "unicode61":
+        terminos = [t.replace('"', "") for t in texto.split()]
+        consulta = " ".join(f'"{t}"*' for t in terminos if t)
+        if consulta:
+            return "id IN (SELECT rowid FROM tareas_fts WHERE tareas_fts MATCH ?)", [consulta]
+    # Sin FTS5: LIKE sobre la descripción normalizada (recorre la tabla)
+    return f"{sql_normalizar('descripcion')} LIKE ?", [f"%{texto}%"]
+
 # Función para inicializar la base de datos
 def init_db():
-    """Crea la tabla tareas si no existe"""
+    """Crea la tabla tareas y su índice de búsqueda si no existen"""
+    global MODO_BUSQUEDA
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute("""
@@ -67,6 +169,7 @@ def init_db():
                 fecha_creacion TEXT NOT NULL
             )
         """)
+        MODO_BUSQUEDA = crear_indice_busqueda(cursor)
         conn.commit()
         print("✓ Base de datos inicializada correctamente")
 
@@ -129,7 +232,7 @@ def get_tareas(
     Obtiene todas las tareas de la base de datos con filtros opcionales.
     
     - **estado**: Filtrar por estado (pendiente, en_progreso, completada)
-    - **texto**: Buscar tareas que contengan este texto en la descripción
+    - **texto**: Buscar tareas que contengan este texto en la descripción (sin distinguir tildes)
     - **prioridad**: Filtrar por prioridad (baja, media, alta)
     - **orden**: Ordenar por fecha de creación (asc = ascendente, desc = descendente)
     """
@@ -145,8 +248,10 @@ def get_tareas(
             params.append(estado.value)
         
         if texto:
-            query += " AND descripcion LIKE ?"
-            params.append(f"%{texto}%")
+            # Búsqueda sin distinguir mayúsculas ni tildes (índice FTS5)
+            condicion, params_texto = filtro_texto_sql(texto)
+            query += f" AND {condicion}"
+            params.extend(params_texto)
         
         if prioridad:
             query += " AND prioridad = ?"
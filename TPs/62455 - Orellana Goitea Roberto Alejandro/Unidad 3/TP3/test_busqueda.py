@@ -0,0 +1,35 @@
+"""
+Tests de la búsqueda de tareas por texto (GET /tareas?texto=).
+Ejecutar desde esta carpeta con: python -m pytest test_busqueda.py -v
+"""
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app, init_db, DB_NAME
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def setup_and_teardown():
+    """Base de datos limpia antes y después de cada test"""
+    if os.path.exists(DB_NAME):
+        os.remove(DB_NAME)
+    init_db()
+    yield
+    if os.path.exists(DB_NAME):
+        os.remove(DB_NAME)
+
+
+def test_busqueda_sin_tildes_ni_mayusculas_y_textos_cortos():
+    for descripcion in ["Diseño del logo", "Comprar pan", "Estudiar Análisis"]:
+        client.post("/tareas", json={"descripcion": descripcion})
+
+    buscar = lambda q: sorted(t["descripcion"] for t in client.get("/tareas", params={"texto": q}).json())
+    assert buscar("DISEÑO") == ["Diseño del logo"]
+    assert buscar("analisis") == ["Estudiar Análisis"]
+    assert buscar("ño") == ["Diseño del logo"]  # 2 caracteres pero 3 bytes: no es un trigrama
+    assert buscar("an") == ["Comprar pan", "Estudiar Análisis"]
@@ -3,69 +3,704 @@ Funciones de acceso a la base de datos SQLite.
 Maneja la conexión, inicialización y operaciones CRUD.
 """
 
+import base64
+import json
+import os
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
+from queue import Empty, Full, LifoQueue
 from typing import Optional
 
 # Nombre de la base de datos
 DB_NAME = "tareas.db"
 
+# Configuración por defecto del pool de conexiones
+POOL_TAMANIO = 8          # Máximo de conexiones abiertas a la vez
+POOL_TIMEOUT = 5.0        # Segundos que se espera una conexión libre
 
-# ==================== CONTEXT MANAGER ====================
 
-@contextmanager
-def get_db():
+# ==================== PERFILES DE PRAGMAS ====================
+
+# journal_mode se guarda en el archivo (se aplica una vez en init_db);
+# el resto son por conexión y se aplican en crear_conexion().
+# - durable: WAL con fsync en cada commit (no se pierde nada ante un corte de luz)
+# - equilibrado: WAL con synchronous=NORMAL; ante un corte se pueden perder los
+#   últimos commits pero la BD nunca se corrompe. Lectores y escritor no se bloquean
+# - rapido: sin fsync y con más caché/mmap; solo para datos descartables
+PERFILES_DB = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+        "cache_size": -2000,       # KiB (negativo = tamaño, no páginas)
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+    },
+    "equilibrado": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    "rapido": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "busy_timeout": 5000,
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+
+# Perfil activo; se puede elegir con la variable de entorno TAREAS_PERFIL_DB
+PERFIL_DB = os.environ.get("TAREAS_PERFIL_DB", "equilibrado")
+
+
+def obtener_perfil(nombre: Optional[str] = None) -> dict:
+    """
+    Devuelve los PRAGMAs del perfil indicado (o del activo).
+    
+    Raises:
+        ValueError: si el perfil no existe
+    """
+    nombre = nombre or PERFIL_DB
+    if nombre not in PERFILES_DB:
+        raise ValueError(
+            f"Perfil de BD desconocido: '{nombre}' (opciones: {', '.join(PERFILES_DB)})"
+        )
+    return PERFILES_DB[nombre]
+
+
+def aplicar_pragmas_conexion(conn: sqlite3.Connection, perfil: Optional[str] = None):
+    """Aplica los PRAGMAs por conexión del perfil (todo menos journal_mode)"""
+    pragmas = obtener_perfil(perfil)
+    conn.execute(f"PRAGMA synchronous = {pragmas['synchronous']}")
+    conn.execute(f"PRAGMA busy_timeout = {int(pragmas['busy_timeout'])}")
+    conn.execute(f"PRAGMA cache_size = {int(pragmas['cache_size'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(pragmas['mmap_size'])}")
+    conn.execute(f"PRAGMA temp_store = {pragmas['temp_store']}")
+
+
+# ==================== POOL DE CONEXIONES ====================
+
+class PoolAgotadoError(Exception):
+    """Se lanza cuando no se obtiene una conexión libre dentro del timeout"""
+
+
+def crear_conexion(db_name: Optional[str] = None) -> sqlite3.Connection:
     """
-    Context manager para obtener y cerrar conexiones a la BD.
-    Garantiza que la conexión se cierre correctamente incluso si ocurre un error.
+    Abre una conexión nueva ya configurada (row_factory, claves foráneas
+    y PRAGMAs del perfil activo).
+    
+    Args:
+        db_name: Ruta de la base de datos (por defecto DB_NAME)
+    
+    Returns:
+        Conexión lista para usar
     """
-    conn = sqlite3.connect(DB_NAME)
+    # check_same_thread=False: el pool entrega la conexión a distintos
+    # hilos del threadpool de FastAPI, pero nunca a dos a la vez
+    conn = sqlite3.connect(db_name or DB_NAME, check_same_thread=False)
     conn.row_factory = sqlite3.Row  # Para acceder a columnas por nombre
     # Activar claves foráneas (necesario en SQLite)
     conn.execute("PRAGMA foreign_keys = ON")
+    aplicar_pragmas_conexion(conn)
+    return conn
+
+
+class PoolConexiones:
+    """
+    Pool acotado de conexiones SQLite reutilizables y thread-safe.
+    
+    Las conexiones se crean a demanda hasta `tamanio` y luego se reciclan,
+    así cada request evita el costo de connect() + PRAGMA.
+    
+    Estadísticas:
+        - hits: se entregó una conexión libre ya abierta
+        - misses: no había libres y se abrió una nueva
+        - esperas: hubo que esperar a que otro hilo liberara una
+        - timeouts: la espera superó el timeout
+    """
+
+    def __init__(self, db_name: str, tamanio: int = POOL_TAMANIO, timeout: float = POOL_TIMEOUT):
+        if tamanio < 1:
+            raise ValueError("El tamaño del pool debe ser al menos 1")
+        self.db_name = db_name
+        self.tamanio = tamanio
+        self.timeout = timeout
+        self._libres = LifoQueue(maxsize=tamanio)
+        self._lock = threading.Lock()
+        self._creadas = 0
+        self._cerrado = False
+        self._stats = {"hits": 0, "misses": 0, "esperas": 0, "timeouts": 0, "tiempo_espera": 0.0}
+
+    def adquirir(self, timeout: Optional[float] = None) -> sqlite3.Connection:
+        """Obtiene una conexión del pool (o abre una nueva si hay lugar)"""
+        if self._cerrado:
+            raise PoolAgotadoError("El pool de conexiones está cerrado")
+        
+        # 1) Conexión libre disponible
+        try:
+            conn = self._libres.get_nowait()
+            with self._lock:
+                self._stats["hits"] += 1
+            return conn
+        except Empty:
+            pass
+        
+        # 2) Todavía hay lugar para abrir una nueva
+        with self._lock:
+            crear = self._creadas < self.tamanio
+            if crear:
+                self._creadas += 1
+                self._stats["misses"] += 1
+        if crear:
+            try:
+                return crear_conexion(self.db_name)
+            except Exception:
+                with self._lock:
+                    self._creadas -= 1
+                raise
+        
+        # 3) Pool lleno: esperar a que se libere una
+        espera = self.timeout if timeout is None else timeout
+        inicio = time.perf_counter()
+        try:
+            conn = self._libres.get(timeout=espera)
+        except Empty:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise PoolAgotadoError(
+                f"No hay conexiones libres (tamaño {self.tamanio}, espera {espera}s)"
+            )
+        with self._lock:
+            self._stats["esperas"] += 1
+            self._stats["tiempo_espera"] += time.perf_counter() - inicio
+        return conn
+
+    def liberar(self, conn: sqlite3.Connection):
+        """Devuelve una conexión al pool, descartando transacciones abiertas"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Conexión en estado dudoso: no vuelve al pool
+            self._descartar(conn)
+            return
+        if self._cerrado:
+            self._descartar(conn)
+            return
+        try:
+            self._libres.put_nowait(conn)
+        except Full:
+            self._descartar(conn)
+
+    def _descartar(self, conn: sqlite3.Connection):
+        conn.close()
+        with self._lock:
+            self._creadas -= 1
+
+    @contextmanager
+    def conexion(self):
+        """Context manager: adquiere una conexión y la devuelve al salir"""
+        conn = self.adquirir()
+        try:
+            yield conn
+        finally:
+            self.liberar(conn)
+
+    def cerrar(self):
+        """Cierra todas las conexiones libres; las prestadas se cierran al devolverse"""
+        self._cerrado = True
+        while True:
+            try:
+                conn = self._libres.get_nowait()
+            except Empty:
+                break
+            self._descartar(conn)
+
+    def estadisticas(self) -> dict:
+        """Devuelve una copia de las estadísticas del pool"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["abiertas"] = self._creadas
+        stats["libres"] = self._libres.qsize()
+        stats["tamanio"] = self.tamanio
+        stats["tiempo_espera"] = round(stats["tiempo_espera"], 6)
+        return stats
+
+
+# Pool global: lo abre y cierra el lifespan de la aplicación
+_pool: Optional[PoolConexiones] = None
+
+
+def abrir_pool(tamanio: int = POOL_TAMANIO, timeout: float = POOL_TIMEOUT) -> PoolConexiones:
+    """Crea el pool global de conexiones (se llama al iniciar la app)"""
+    global _pool
+    if _pool is not None:
+        _pool.cerrar()
+    _pool = PoolConexiones(DB_NAME, tamanio=tamanio, timeout=timeout)
+    return _pool
+
+
+def cerrar_pool():
+    """Cierra el pool global de conexiones (se llama al detener la app)"""
+    global _pool
+    if _pool is not None:
+        _pool.cerrar()
+        _pool = None
+
+
+def estadisticas_pool() -> Optional[dict]:
+    """Estadísticas del pool global, o None si no está abierto"""
+    return _pool.estadisticas() if _pool is not None else None
+
+
+# ==================== CONTEXT MANAGER ====================
+
+@contextmanager
+def get_db():
+    """
+    Context manager para obtener conexiones a la BD.
+    Si el pool está abierto toma una conexión de él y la devuelve al salir;
+    si no (por ejemplo en scripts o tests sin lifespan), abre y cierra una
+    conexión propia. En ambos casos la conexión se libera aunque ocurra un error.
+    """
+    if _pool is not None:
+        with _pool.conexion() as conn:
+            yield conn
+        return
+    
+    conn = crear_conexion()
     try:
         yield conn
     finally:
         conn.close()
 
 
+# ==================== VERSIÓN DE LOS DATOS ====================
+
+def version_datos(conn: sqlite3.Connection) -> int:
+    """
+    Versión actual de los datos, para los ETag de los GET. Está en la tabla
+    version_datos (no en memoria) para que la vean todos los workers.
+    """
+    return conn.execute("SELECT valor FROM version_datos WHERE id = 1").fetchone()[0]
+
+
+# Siempre crece: el siguiente entero, o los milisegundos actuales si son más.
+# Así, después de restaurar una copia vieja de la BD, la próxima escritura no
+# repite una versión que ya se entregó con otros datos
+SQL_AVANZAR_VERSION = """
+    UPDATE version_datos
+    SET valor = MAX(valor + 1, CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER))
+    WHERE id = 1
+"""
+
+
+def marcar_cambio(conn: sqlite3.Connection):
+    """
+    Avanza la versión de los datos. Se llama una vez por transacción de
+    escritura, antes del commit (no por fila: un lote de 10.000 tareas es un
+    solo UPDATE). Quien escriba por fuera de la API tiene que llamarla también.
+    """
+    conn.execute(SQL_AVANZAR_VERSION)
+
+
+# ==================== MIGRACIONES ====================
+
+def _migracion_1_tablas(cursor):
+    """Tablas proyectos y tareas con la relación 1:N (ON DELETE CASCADE)"""
+    # Tabla proyectos
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS proyectos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL UNIQUE,
+            descripcion TEXT,
+            fecha_creacion TEXT NOT NULL
+        )
+    """)
+    
+    # Tabla tareas (con clave foránea a proyectos)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS tareas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            descripcion TEXT NOT NULL,
+            estado TEXT NOT NULL,
+            prioridad TEXT NOT NULL DEFAULT 'media',
+            proyecto_id INTEGER NOT NULL,
+            fecha_creacion TEXT NOT NULL,
+            FOREIGN KEY (proyecto_id) REFERENCES proyectos(id) ON DELETE CASCADE
+        )
+    """)
+
+
+def _migracion_2_indices(cursor):
+    """
+    Índices para las consultas que realmente hacen los endpoints:
+    - GET /proyectos/{id}/tareas, GET /tareas?proyecto_id=... y los
+      COUNT / GROUP BY estado de los resúmenes por proyecto
+    - GROUP BY prioridad del resumen por proyecto
+    - GET /tareas?estado=...&prioridad=...&orden=... y GROUP BY estado global
+    - GET /tareas?prioridad=...&orden=... y GET /tareas?orden=...
+    - Nombre duplicado (LOWER(nombre) = LOWER(?)) y listado de proyectos
+    """
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tareas_proyecto_estado_prioridad_fecha
+        ON tareas (proyecto_id, estado, prioridad, fecha_creacion)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tareas_proyecto_prioridad
+        ON tareas (proyecto_id, prioridad)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tareas_estado_prioridad_fecha
+        ON tareas (estado, prioridad, fecha_creacion)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tareas_prioridad_fecha
+        ON tareas (prioridad, fecha_creacion)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tareas_fecha
+        ON tareas (fecha_creacion)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_proyectos_nombre_lower
+        ON proyectos (LOWER(nombre))
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_proyectos_fecha
+        ON proyectos (fecha_creacion)
+    """)
+
+
+# Columnas de contadores por estado y por prioridad
+ESTADOS = ("pendiente", "en_progreso", "completada")
+PRIORIDADES = ("baja", "media", "alta")
+
+# Fila de contadores globales (los proyectos reales tienen id >= 1)
+CONTADOR_GLOBAL = 0
+
+
+def _sql_delta_contadores(fila: str, signo: str) -> str:
+    """
+    Arma el SET de un UPDATE de contadores para la fila NEW u OLD de tareas.
+    Ej: total = total + 1, pendiente = pendiente + (NEW.estado = 'pendiente'), ...
+    """
+    partes = [f"total = total {signo} 1"]
+    partes += [f"{e} = {e} {signo} ({fila}.estado = '{e}')" for e in ESTADOS]
+    partes += [f"{p} = {p} {signo} ({fila}.prioridad = '{p}')" for p in PRIORIDADES]
+    return ", ".join(partes)
+
+
+def recalcular_contadores(cursor):
+    """
+    Reconstruye la tabla contadores a partir de proyectos y tareas.
+    Se usa al crear la tabla en una BD existente y sirve para repararla.
+    """
+    columnas = ["total"] + list(ESTADOS) + list(PRIORIDADES)
+    sumas = ", ".join(
+        ["COUNT(t.id)"]
+        + [f"COALESCE(SUM(t.estado = '{e}'), 0)" for e in ESTADOS]
+        + [f"COALESCE(SUM(t.prioridad = '{p}'), 0)" for p in PRIORIDADES]
+    )
+    cursor.execute("DELETE FROM contadores")
+    cursor.execute(f"""
+        INSERT INTO contadores (proyecto_id, {', '.join(columnas)})
+        SELECT p.id, {sumas}
+        FROM proyectos p
+        LEFT JOIN tareas t ON t.proyecto_id = p.id
+        GROUP BY p.id
+    """)
+    cursor.execute(f"""
+        INSERT INTO contadores (proyecto_id, proyectos, {', '.join(columnas)})
+        SELECT {CONTADOR_GLOBAL}, (SELECT COUNT(*) FROM proyectos), {sumas}
+        FROM tareas t
+    """)
+
+
+def _migracion_3_contadores(cursor):
+    """
+    Tabla contadores mantenida por triggers, para que los resúmenes sean
+    lecturas O(1) en lugar de COUNT / GROUP BY sobre todas las tareas.
+    Una fila por proyecto más la fila global (proyecto_id = 0).
+    """
+    columnas = ", ".join(
+        f"{c} INTEGER NOT NULL DEFAULT 0"
+        for c in ("proyectos", "total") + ESTADOS + PRIORIDADES
+    )
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS contadores (
+            proyecto_id INTEGER PRIMARY KEY,
+            {columnas}
+        )
+    """)
+    # Para "proyecto con más tareas" (desempate: menor id)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_contadores_total
+        ON contadores (total DESC, proyecto_id)
+    """)
+    recalcular_contadores(cursor)
+    
+    global_ = f"proyecto_id = {CONTADOR_GLOBAL}"
+    
+    # ---- Proyectos ----
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_proyectos_insert_contadores
+        AFTER INSERT ON proyectos
+        BEGIN
+            INSERT INTO contadores (proyecto_id) VALUES (NEW.id);
+            UPDATE contadores SET proyectos = proyectos + 1 WHERE {global_};
+        END
+    """)
+    # Las tareas del proyecto se borran por CASCADE y disparan sus propios triggers
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_proyectos_delete_contadores
+        AFTER DELETE ON proyectos
+        BEGIN
+            DELETE FROM contadores WHERE proyecto_id = OLD.id;
+            UPDATE contadores SET proyectos = proyectos - 1 WHERE {global_};
+        END
+    """)
+    
+    # ---- Tareas ----
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tareas_insert_contadores
+        AFTER INSERT ON tareas
+        BEGIN
+            UPDATE contadores SET {_sql_delta_contadores('NEW', '+')}
+            WHERE proyecto_id IN (NEW.proyecto_id, {CONTADOR_GLOBAL});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tareas_delete_contadores
+        AFTER DELETE ON tareas
+        BEGIN
+            UPDATE contadores SET {_sql_delta_contadores('OLD', '-')}
+            WHERE proyecto_id IN (OLD.proyecto_id, {CONTADOR_GLOBAL});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_tareas_update_contadores
+        AFTER UPDATE OF estado, prioridad, proyecto_id ON tareas
+        BEGIN
+            UPDATE contadores SET {_sql_delta_contadores('OLD', '-')}
+            WHERE proyecto_id IN (OLD.proyecto_id, {CONTADOR_GLOBAL});
+            UPDATE contadores SET {_sql_delta_contadores('NEW', '+')}
+            WHERE proyecto_id IN (NEW.proyecto_id, {CONTADOR_GLOBAL});
+        END
+    """)
+
+
+# ---- Búsqueda de texto (FTS5) ----
+
+# Normalización para búsquedas en español: minúsculas y sin tildes/diéresis.
+# La misma tabla se aplica en Python (al texto buscado) y en SQL (en los
+# triggers que cargan el índice), así ambos lados quedan idénticos.
+_MAPA_ACENTOS = {
+    "á": "a", "é": "e", "í": "i", "ó": "o", "ú": "u", "ü": "u",
+    "Á": "a", "É": "e", "Í": "i", "Ó": "o", "Ú": "u", "Ü": "u", "Ñ": "ñ",
+}
+_TABLA_NORMALIZACION = str.maketrans({
+    **{chr(c): chr(c + 32) for c in range(ord("A"), ord("Z") + 1)},
+    **_MAPA_ACENTOS,
+})
+
+
+def normalizar_texto(texto: str) -> str:
+    """Pasa a minúsculas y quita tildes (igual que sql_normalizar)"""
+    return texto.translate(_TABLA_NORMALIZACION)
+
+
+def sql_normalizar(expresion: str) -> str:
+    """Expresión SQL equivalente a normalizar_texto() sobre `expresion`"""
+    for origen, destino in _MAPA_ACENTOS.items():
+        expresion = f"replace({expresion}, '{origen}', '{destino}')"
+    # lower() de SQLite solo convierte ASCII, igual que la tabla de Python
+    return f"lower({expresion})"
+
+
+def _tokenizer_fts(cursor) -> Optional[str]:
+    """
+    Elige el tokenizer del índice FTS5 según lo que soporte esta SQLite:
+    'trigram' (búsqueda por subcadena, SQLite >= 3.34), 'unicode61'
+    (búsqueda por prefijo de palabra) o None si no hay FTS5.
+    """
+    for tokenizer in ("trigram", "unicode61"):
+        try:
+            cursor.execute(f"CREATE VIRTUAL TABLE temp._prueba_fts USING fts5(x, tokenize='{tokenizer}')")
+            cursor.execute("DROP TABLE temp._prueba_fts")
+            return tokenizer
+        except sqlite3.OperationalError:
+            continue
+    return None
+
+
+def _migracion_4_busqueda_proyectos(cursor):
+    """
+    Índice FTS5 sobre el nombre normalizado de los proyectos, sincronizado
+    por triggers, para que GET /proyectos?nombre= no recorra la tabla.
+    """
+    tokenizer = _tokenizer_fts(cursor)
+    if tokenizer is None:
+        return  # Sin FTS5: buscar_proyectos_sql() usa LIKE sobre la tabla
+    
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS proyectos_fts
+        USING fts5(nombre, tokenize='{tokenizer}')
+    """)
+    nombre_new = sql_normalizar("NEW.nombre")
+    cursor.execute(f"""
+        INSERT INTO proyectos_fts (rowid, nombre)
+        SELECT id, {sql_normalizar('nombre')} FROM proyectos
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_proyectos_insert_fts
+        AFTER INSERT ON proyectos
+        BEGIN
+            INSERT INTO proyectos_fts (rowid, nombre) VALUES (NEW.id, {nombre_new});
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_proyectos_delete_fts
+        AFTER DELETE ON proyectos
+        BEGIN
+            DELETE FROM proyectos_fts WHERE rowid = OLD.id;
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_proyectos_update_fts
+        AFTER UPDATE OF nombre ON proyectos
+        BEGIN
+            UPDATE proyectos_fts SET nombre = {nombre_new} WHERE rowid = NEW.id;
+        END
+    """)
+
+
+def _migracion_5_indices_paginacion(cursor):
+    """
+    Índices para recorrer páginas en orden de fecha (keyset sobre
+    (fecha_creacion, id)) cuando se filtra solo por proyecto o solo por estado.
+    """
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tareas_proyecto_fecha
+        ON tareas (proyecto_id, fecha_creacion)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tareas_estado_fecha
+        ON tareas (estado, fecha_creacion)
+    """)
+
+
+def _migracion_6_quitar_indices_resumen(cursor):
+    """
+    Quita los índices que solo servían a los GROUP BY de los resúmenes, que
+    ahora leen la tabla contadores (migración 3). Cada índice de más es trabajo
+    extra en cada INSERT/UPDATE/DELETE sobre tareas.
+    """
+    cursor.execute("DROP INDEX IF EXISTS idx_tareas_proyecto_prioridad")
+    cursor.execute("DROP INDEX IF EXISTS idx_tareas_estado_prioridad_fecha")
+
+
+def _migracion_7_version_datos(cursor):
+    """Versión de los datos para los ETag (ver version_datos()), cambiada por triggers"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS version_datos (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            valor INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO version_datos (id, valor) VALUES (1, random())")
+    for tabla in ("proyectos", "tareas"):
+        for evento in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{tabla}_{evento.lower()}_version
+                AFTER {evento} ON {tabla}
+                BEGIN
+                    UPDATE version_datos SET valor = random() WHERE id = 1;
+                END
+            """)
+
+
+def _migracion_8_version_por_transaccion(cursor):
+    """
+    Quita los triggers de la migración 7: corrían un UPDATE de version_datos
+    por cada fila escrita. Ahora la versión la avanza marcar_cambio() una vez
+    por transacción y es creciente (arranca en los milisegundos actuales).
+    """
+    for tabla in ("proyectos", "tareas"):
+        for evento in ("insert", "update", "delete"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS trg_{tabla}_{evento}_version")
+    cursor.execute("""
+        UPDATE version_datos
+        SET valor = CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)
+        WHERE id = 1
+    """)
+
+
+# Lista ordenada de migraciones: (versión, descripción, función).
+# Para cambiar el esquema se agrega una nueva entrada al final; nunca se
+# modifican las ya publicadas porque pueden estar aplicadas en bases existentes.
+MIGRACIONES = [
+    (1, "Tablas proyectos y tareas", _migracion_1_tablas),
+    (2, "Índices para filtros y resúmenes", _migracion_2_indices),
+    (3, "Contadores de resumen mantenidos por triggers", _migracion_3_contadores),
+    (4, "Índice de texto completo para nombres de proyectos", _migracion_4_busqueda_proyectos),
+    (5, "Índices para paginación por fecha", _migracion_5_indices_paginacion),
+    (6, "Sin los índices de los resúmenes por GROUP BY", _migracion_6_quitar_indices_resumen),
+    (7, "Versión de los datos para los ETag", _migracion_7_version_datos),
+    (8, "Versión de los datos una vez por transacción", _migracion_8_version_por_transaccion),
+]
+
+VERSION_ESQUEMA = MIGRACIONES[-1][0]
+
+
+def version_esquema(conn) -> int:
+    """Versión de esquema registrada en la BD (PRAGMA user_version)"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
 # ==================== INICIALIZACIÓN ====================
 
 def init_db():
     """
-    Crea las tablas proyectos y tareas si no existen.
-    Configura la relación 1:N con ON DELETE CASCADE.
+    Crea o actualiza el esquema de la base de datos.
+    Aplica, en orden y cada una en su propia transacción, las migraciones
+    cuya versión sea mayor que PRAGMA user_version. Así una tareas.db
+    existente se actualiza en el lugar sin perder datos.
+    También fija el journal_mode del perfil de PRAGMAs activo.
     """
     with get_db() as conn:
         cursor = conn.cursor()
         
-        # Tabla proyectos
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS proyectos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nombre TEXT NOT NULL UNIQUE,
-                descripcion TEXT,
-                fecha_creacion TEXT NOT NULL
-            )
-        """)
+        # journal_mode es persistente: basta con fijarlo una vez por archivo
+        journal_mode = obtener_perfil()["journal_mode"]
+        cursor.execute(f"PRAGMA journal_mode = {journal_mode}")
         
-        # Tabla tareas (con clave foránea a proyectos)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS tareas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                descripcion TEXT NOT NULL,
-                estado TEXT NOT NULL,
-                prioridad TEXT NOT NULL DEFAULT 'media',
-                proyecto_id INTEGER NOT NULL,
-                fecha_creacion TEXT NOT NULL,
-                FOREIGN KEY (proyecto_id) REFERENCES proyectos(id) ON DELETE CASCADE
-            )
-        """)
+        actual = version_esquema(conn)
         
-        conn.commit()
-        print("✓ Base de datos inicializada correctamente")
-        print("  - Tabla 'proyectos' creada/verificada")
-        print("  - Tabla 'tareas' creada/verificada con relación a proyectos")
+        for version, descripcion, migrar in MIGRACIONES:
+            if version <= actual:
+                continue
+            cursor.execute("BEGIN")
+            try:
+                migrar(cursor)
+                # PRAGMA no acepta parámetros; version es un int propio
+                cursor.execute(f"PRAGMA user_version = {int(version)}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            print(f"  - Migración {version} aplicada: {descripcion}")
+        
+        # Actualiza estadísticas del planificador solo si hace falta
+        cursor.execute("PRAGMA optimize")
+        print(f"✓ Base de datos inicializada correctamente (esquema v{VERSION_ESQUEMA}, perfil '{PERFIL_DB}')")
 
 
 # ==================== FUNCIONES AUXILIARES ====================
@@ -122,9 +757,68 @@ def nombre_proyecto_duplicado(conn, nombre: str, excluir_id: Optional[int] = Non
     return cursor.fetchone() is not None
 
 
+def siguiente_id(conn, tabla: str) -> int:
+    """
+    Próximo id AUTOINCREMENT de `tabla`, igual al que asignaría SQLite.
+    Solo es seguro dentro de una transacción de escritura (BEGIN IMMEDIATE),
+    que impide que otra conexión inserte mientras tanto.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (tabla,))
+    row = cursor.fetchone()
+    seq = row[0] if row else 0
+    cursor.execute(f"SELECT MAX(id) FROM {tabla}")
+    maximo = cursor.fetchone()[0] or 0
+    return max(seq, maximo) + 1
+
+
+def ids_existentes(conn, tabla: str, ids) -> set:
+    """
+    Devuelve cuáles de los `ids` existen en `tabla`, consultando en bloques
+    para no superar el límite de parámetros de SQLite.
+    """
+    ids = list(set(ids))
+    encontrados = set()
+    cursor = conn.cursor()
+    for i in range(0, len(ids), 500):
+        bloque = ids[i:i + 500]
+        marcas = ", ".join("?" * len(bloque))
+        cursor.execute(f"SELECT id FROM {tabla} WHERE id IN ({marcas})", bloque)
+        encontrados.update(row[0] for row in cursor.fetchall())
+    return encontrados
+
+
+def obtener_tareas(conn, ids) -> dict:
+    """
+    Lee varias tareas (con el nombre de su proyecto) por id, en bloques.
+    
+    Returns:
+        Diccionario id -> tarea como dict
+    """
+    ids = list(set(ids))
+    tareas = {}
+    cursor = conn.cursor()
+    for i in range(0, len(ids), 500):
+        bloque = ids[i:i + 500]
+        marcas = ", ".join("?" * len(bloque))
+        cursor.execute(
+            f"""
+            SELECT t.*, p.nombre as proyecto_nombre 
+            FROM tareas t 
+            JOIN proyectos p ON t.proyecto_id = p.id 
+            WHERE t.id IN ({marcas})
+            """,
+            bloque
+        )
+        for row in cursor.fetchall():
+            tareas[row["id"]] = row_to_dict(row)
+    return tareas
+
+
 def contar_tareas_proyecto(conn, proyecto_id: int) -> int:
     """
     Cuenta el número de tareas asociadas a un proyecto.
+    Lee la tabla contadores (mantenida por triggers), sin recorrer tareas.
     
     Args:
         conn: Conexión a la base de datos
@@ -135,8 +829,183 @@ def contar_tareas_proyecto(conn, proyecto_id: int) -> int:
     """
     cursor = conn.cursor()
     cursor.execute(
-        "SELECT COUNT(*) as total FROM tareas WHERE proyecto_id = ?",
+        "SELECT total FROM contadores WHERE proyecto_id = ?",
         (proyecto_id,)
     )
     result = cursor.fetchone()
     return result["total"] if result else 0
+
+
+def obtener_contadores(conn, proyecto_id: int = CONTADOR_GLOBAL) -> Optional[dict]:
+    """
+    Devuelve los contadores de un proyecto (o los globales si no se indica).
+    
+    Returns:
+        Diccionario con total, proyectos, por_estado y por_prioridad,
+        o None si el proyecto no tiene fila de contadores (no existe)
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM contadores WHERE proyecto_id = ?", (proyecto_id,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    return {
+        "total": row["total"],
+        "proyectos": row["proyectos"],
+        "por_estado": {e: row[e] for e in ESTADOS},
+        "por_prioridad": {p: row[p] for p in PRIORIDADES},
+    }
+
+
+def proyecto_con_mas_tareas(conn) -> Optional[dict]:
+    """
+    Proyecto con más tareas (a igual cantidad, el de menor id).
+    Usa el índice sobre contadores.total: no agrupa tareas.
+    
+    Returns:
+        {"id", "nombre", "cantidad_tareas"} o None si ningún proyecto tiene tareas
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT p.id, p.nombre, c.total as cantidad_tareas
+        FROM contadores c
+        JOIN proyectos p ON p.id = c.proyecto_id
+        WHERE c.proyecto_id != ? AND c.total > 0
+        ORDER BY c.total DESC, c.proyecto_id
+        LIMIT 1
+        """,
+        (CONTADOR_GLOBAL,)
+    )
+    row = cursor.fetchone()
+    return row_to_dict(row) if row else None
+
+
+# Tokenizer del índice de proyectos ('trigram', 'unicode61' o None).
+# Depende solo de la versión de SQLite, así que se detecta una vez.
+_modo_busqueda: Optional[str] = None
+_modo_busqueda_detectado = False
+
+
+def _modo_busqueda_proyectos(conn) -> Optional[str]:
+    global _modo_busqueda, _modo_busqueda_detectado
+    if not _modo_busqueda_detectado:
+        row = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'proyectos_fts'"
+        ).fetchone()
+        if row is None:
+            _modo_busqueda = None
+        else:
+            _modo_busqueda = "trigram" if "trigram" in row[0] else "unicode61"
+        _modo_busqueda_detectado = True
+    return _modo_busqueda
+
+
+def buscar_proyectos_sql(conn, nombre: str, alias: str = "proyectos"):
+    """
+    Condición SQL (y sus parámetros) para filtrar proyectos por nombre,
+    sin distinguir mayúsculas ni tildes.
+    
+    - trigram: coincidencia por subcadena, resuelta por el índice FTS5
+      (con menos de 3 caracteres, el LIKE de abajo)
+    - unicode61: prefijo de cada palabra buscada (todas deben aparecer)
+    - sin FTS5: LIKE sobre el nombre normalizado (recorre la tabla)
+    
+    Returns:
+        Tupla (condicion, params) para agregar a un WHERE
+    """
+    texto = normalizar_texto(nombre)
+    modo = _modo_busqueda_proyectos(conn)
+    
+    # Con menos de 3 caracteres no hay trigramas. SQLite solo recorre la tabla si
+    # son menos de 3 *bytes*: "ño" (3 bytes) se buscaría como trigrama y no daría nada
+    if modo == "trigram" and len(texto) >= 3:
+        return (
+            f"{alias}.id IN (SELECT rowid FROM proyectos_fts WHERE nombre LIKE ?)",
+            [f"%{texto}%"]
+        )
+    if modo == "unicode61":
+        terminos = [t.replace('"', "") for t in texto.split()]
+        consulta = " ".join(f'"{t}"*' for t in terminos if t)
+        if consulta:
+            return (
+                f"{alias}.id IN (SELECT rowid FROM proyectos_fts WHERE proyectos_fts MATCH ?)",
+                [consulta]
+            )
+    return (f"{sql_normalizar(alias + '.nombre')} LIKE ?", [f"%{texto}%"])
+
+
+# ==================== PAGINACIÓN (KEYSET) ====================
+
+class CursorInvalidoError(ValueError):
+    """El cursor de paginación no se puede decodificar o no corresponde al orden pedido"""
+
+
+def codificar_cursor(fila, orden: Optional[str]) -> str:
+    """
+    Cursor opaco que apunta a la última fila entregada: (fecha_creacion, id)
+    y el orden con el que se pidió la página, en base64 url-safe.
+    """
+    datos = json.dumps([fila["fecha_creacion"], fila["id"], orden], separators=(",", ":"))
+    return base64.urlsafe_b64encode(datos.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, orden: Optional[str]):
+    """
+    Devuelve (fecha_creacion, id) de un cursor generado por codificar_cursor.
+    
+    Raises:
+        CursorInvalidoError: si el cursor está mal formado o es de otro orden
+    """
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        fecha, ultimo_id, orden_cursor = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (ValueError, TypeError):
+        raise CursorInvalidoError("Cursor de paginación inválido")
+    if orden_cursor != orden or not isinstance(ultimo_id, int) or not isinstance(fecha, str):
+        raise CursorInvalidoError("Cursor de paginación inválido para este orden")
+    return fecha, ultimo_id
+
+
+def paginacion_sql(alias: str, orden: Optional[str], cursor: Optional[str] = None):
+    """
+    ORDER BY y condición keyset para listar por (fecha_creacion, id).
+    
+    Con orden 'asc'/'desc' se ordena por fecha y luego id (desempate estable);
+    sin orden, por id ascendente (como hasta ahora). Si se pasa un cursor, la
+    condición salta directamente a las filas posteriores a él, así cada página
+    cuesta lo mismo sin importar cuán lejos esté (no usa OFFSET).
+    
+    Returns:
+        Tupla (condicion o None, params, order_by)
+    """
+    if orden in ("asc", "desc"):
+        direccion = orden.upper()
+        comparador = ">" if orden == "asc" else "<"
+        order_by = f"{alias}.fecha_creacion {direccion}, {alias}.id {direccion}"
+    else:
+        order_by = f"{alias}.id ASC"
+    
+    if not cursor:
+        return None, [], order_by
+    
+    fecha, ultimo_id = decodificar_cursor(cursor, orden)
+    if orden in ("asc", "desc"):
+        return f"({alias}.fecha_creacion, {alias}.id) {comparador} (?, ?)", [fecha, ultimo_id], order_by
+    return f"{alias}.id > ?", [ultimo_id], order_by
+
+
+def leer_pagina(cursor, limit: Optional[int], orden: Optional[str]):
+    """
+    Lee las filas de una consulta ya ejecutada con LIMIT limit + 1.
+    
+    Returns:
+        Tupla (filas, next_cursor); next_cursor es None en la última página
+    """
+    if limit is None:
+        return cursor.fetchall(), None
+    filas = cursor.fetchmany(limit + 1)
+    if len(filas) <= limit:
+        return filas, None
+    filas = filas[:limit]
+    return filas, codificar_cursor(filas[-1], orden)
@@ -3,21 +3,30 @@ API REST para gestión de Proyectos y Tareas con persistencia en SQLite.
 Trabajo Práctico N°4 - Relaciones entre Tablas y Filtros Avanzados.
 """
 
-from fastapi import FastAPI, HTTPException, Query, status
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import List, Optional
 from datetime import datetime
 from contextlib import asynccontextmanager
+import hashlib
+import json
 
 # Importar modelos y funciones de base de datos
 from models import (
     EstadoTarea, PrioridadTarea,
     ProyectoCreate, ProyectoUpdate, Proyecto,
-    TareaCreate, TareaUpdate, Tarea,
+    TareaCreate, TareaUpdate, TareaUpdateLote, Tarea,
+    ResultadoLote,
     ResumenProyecto, ResumenGeneral
 )
 from database import (
     init_db, get_db, row_to_dict,
+    abrir_pool, cerrar_pool, estadisticas_pool, PoolAgotadoError,
     proyecto_exists, nombre_proyecto_duplicado, contar_tareas_proyecto,
+    obtener_contadores, proyecto_con_mas_tareas, buscar_proyectos_sql,
+    paginacion_sql, leer_pagina, CursorInvalidoError,
+    siguiente_id, ids_existentes, obtener_tareas,
+    version_datos, marcar_cambio,
     DB_NAME  # Exportar para tests
 )
 
@@ -25,9 +34,11 @@ from database import (
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Inicializa la base de datos al arrancar la aplicación"""
+    """Inicializa la base de datos y el pool de conexiones de la aplicación"""
     init_db()
+    abrir_pool()
     yield
+    cerrar_pool()
 
 
 app = FastAPI(
@@ -38,6 +49,72 @@ app = FastAPI(
 )
 
 
+@app.exception_handler(PoolAgotadoError)
+def pool_agotado_handler(request: Request, exc: PoolAgotadoError):
+    """Si no hay conexiones libres a tiempo, responder 503 en lugar de 500"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": {"error": str(exc)}}
+    )
+
+
+@app.exception_handler(CursorInvalidoError)
+def cursor_invalido_handler(request: Request, exc: CursorInvalidoError):
+    """Un cursor de paginación alterado o de otro orden es un error del cliente"""
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": {"error": str(exc)}}
+    )
+
+
+# ==================== ETAG / 304 ====================
+
+class NoModificado(Exception):
+    """El cliente ya tiene la versión actual de la respuesta (If-None-Match)"""
+
+    def __init__(self, etag: str):
+        self.etag = etag
+
+
+@app.exception_handler(NoModificado)
+def no_modificado_handler(request: Request, exc: NoModificado):
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": exc.etag})
+
+
+def etag_datos(request: Request, response: Response):
+    """
+    Dependencia de los GET de datos: ETag = versión de los datos + ruta +
+    parámetros de la query (ordenados). Si coincide con If-None-Match se
+    responde 304 leyendo solo la versión, sin hacer la consulta del endpoint.
+    """
+    with get_db() as conn:
+        version = version_datos(conn)
+    parametros = sorted(request.query_params.multi_items())
+    huella = json.dumps([version, request.url.path, parametros])
+    etag = f'"{hashlib.sha256(huella.encode()).hexdigest()[:32]}"'
+    
+    if_none_match = request.headers.get("if-none-match", "")
+    candidatos = [e.strip().removeprefix("W/") for e in if_none_match.split(",")]
+    if etag in candidatos:
+        raise NoModificado(etag)
+    response.headers["ETag"] = etag
+    # Se puede guardar, pero hay que revalidarla (con el ETag) antes de usarla
+    response.headers["Cache-Control"] = "no-cache"
+
+
+# Límite máximo de elementos por página en los listados
+LIMITE_MAXIMO_PAGINA = 1000
+
+# Header con el cursor de la página siguiente (el cuerpo sigue siendo la lista)
+HEADER_SIGUIENTE_CURSOR = "X-Next-Cursor"
+
+
+def agregar_cursor_siguiente(response: Response, next_cursor: Optional[str]):
+    """Publica el cursor de la página siguiente, si la hay"""
+    if next_cursor:
+        response.headers[HEADER_SIGUIENTE_CURSOR] = next_cursor
+
+
 # ==================== ENDPOINT RAÍZ ====================
 
 @app.get("/")
@@ -56,42 +133,64 @@ def root():
                 "DELETE /proyectos/{id}": "Eliminar proyecto y sus tareas",
                 "GET /proyectos/{id}/tareas": "Listar tareas de un proyecto",
                 "POST /proyectos/{id}/tareas": "Crear tarea en un proyecto",
+                "POST /proyectos/{id}/tareas/bulk": "Crear varias tareas en una sola transacción",
                 "GET /proyectos/{id}/resumen": "Resumen de un proyecto"
             },
             "tareas": {
                 "GET /tareas": "Listar todas las tareas (con filtros)",
+                "GET /tareas/export": "Exportar tareas en streaming (ndjson/json)",
                 "PUT /tareas/{id}": "Actualizar tarea",
+                "PATCH /tareas/bulk": "Actualizar varias tareas en una sola transacción",
                 "DELETE /tareas/{id}": "Eliminar tarea"
             },
             "resumen": {
                 "GET /resumen": "Resumen general de la aplicación"
+            },
+            "diagnostico": {
+                "GET /pool": "Estadísticas del pool de conexiones"
             }
         }
     }
 
 # ==================== ENDPOINTS DE PROYECTOS ====================
 
-@app.get("/proyectos", response_model=List[Proyecto])
+@app.get("/proyectos", response_model=List[Proyecto], dependencies=[Depends(etag_datos)])
 def get_proyectos(
-    nombre: Optional[str] = Query(None, description="Buscar proyectos por nombre (parcial)")
+    response: Response,
+    nombre: Optional[str] = Query(None, description="Buscar proyectos por nombre (parcial)"),
+    limit: Optional[int] = Query(None, ge=1, le=LIMITE_MAXIMO_PAGINA, description="Cantidad máxima por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en X-Next-Cursor")
 ):
     """
     Lista todos los proyectos con filtro opcional por nombre.
     Incluye el contador de tareas de cada proyecto.
+    Con `limit` pagina por cursor; el de la página siguiente va en X-Next-Cursor.
     """
     with get_db() as conn:
-        cursor = conn.cursor()
+        db_cursor = conn.cursor()
         
-        if nombre:
-            # Búsqueda parcial insensible a mayúsculas
-            cursor.execute(
-                "SELECT * FROM proyectos WHERE nombre LIKE ? ORDER BY fecha_creacion DESC",
-                (f"%{nombre}%",)
-            )
-        else:
-            cursor.execute("SELECT * FROM proyectos ORDER BY fecha_creacion DESC")
+        query = "SELECT * FROM proyectos p WHERE 1=1"
+        params = []
         
-        rows = cursor.fetchall()
+        if nombre:
+            # Búsqueda parcial insensible a mayúsculas y tildes (índice FTS5)
+            condicion, params_nombre = buscar_proyectos_sql(conn, nombre, alias="p")
+            query += f" AND {condicion}"
+            params.extend(params_nombre)
+        
+        # Más recientes primero; keyset sobre (fecha_creacion, id)
+        condicion, params_cursor, order_by = paginacion_sql("p", "desc", cursor)
+        if condicion:
+            query += f" AND {condicion}"
+            params.extend(params_cursor)
+        query += f" ORDER BY {order_by}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit + 1)
+        
+        db_cursor.execute(query, params)
+        rows, next_cursor = leer_pagina(db_cursor, limit, "desc")
+        agregar_cursor_siguiente(response, next_cursor)
         proyectos = []
         
         for row in rows:
@@ -103,7 +202,7 @@ def get_proyectos(
         return proyectos
 
 
-@app.get("/proyectos/{id}", response_model=Proyecto)
+@app.get("/proyectos/{id}", response_model=Proyecto, dependencies=[Depends(etag_datos)])
 def get_proyecto(id: int):
     """
     Obtiene un proyecto específico por ID.
@@ -158,6 +257,7 @@ def create_proyecto(proyecto: ProyectoCreate):
             """,
             (proyecto.nombre.strip(), proyecto.descripcion, fecha_creacion)
         )
+        marcar_cambio(conn)
         conn.commit()
         
         proyecto_id = cursor.lastrowid
@@ -228,6 +328,7 @@ def update_proyecto(id: int, proyecto_update: ProyectoUpdate):
         query = f"UPDATE proyectos SET {', '.join(updates)} WHERE id = ?"
         
         cursor.execute(query, params)
+        marcar_cambio(conn)
         conn.commit()
         
         # Recuperar proyecto actualizado
@@ -263,6 +364,7 @@ def delete_proyecto(id: int):
         
         # Eliminar proyecto (las tareas se eliminan automáticamente por CASCADE)
         cursor.execute("DELETE FROM proyectos WHERE id = ?", (id,))
+        marcar_cambio(conn)
         conn.commit()
         
         return {
@@ -273,15 +375,19 @@ def delete_proyecto(id: int):
 
 # ==================== ENDPOINTS DE TAREAS POR PROYECTO ====================
 
-@app.get("/proyectos/{id}/tareas", response_model=List[Tarea])
+@app.get("/proyectos/{id}/tareas", response_model=List[Tarea], dependencies=[Depends(etag_datos)])
 def get_tareas_proyecto(
     id: int,
+    response: Response,
     estado: Optional[EstadoTarea] = Query(None, description="Filtrar por estado"),
     prioridad: Optional[PrioridadTarea] = Query(None, description="Filtrar por prioridad"),
-    orden: Optional[str] = Query(None, pattern="^(asc|desc)$", description="Ordenar por fecha (asc/desc)")
+    orden: Optional[str] = Query(None, pattern="^(asc|desc)$", description="Ordenar por fecha (asc/desc)"),
+    limit: Optional[int] = Query(None, ge=1, le=LIMITE_MAXIMO_PAGINA, description="Cantidad máxima por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en X-Next-Cursor")
 ):
     """
     Lista todas las tareas de un proyecto específico con filtros opcionales.
+    Con `limit` pagina por cursor; el de la página siguiente va en X-Next-Cursor.
     """
     with get_db() as conn:
         # Verificar que el proyecto existe
@@ -291,7 +397,7 @@ def get_tareas_proyecto(
                 detail={"error": f"El proyecto con ID {id} no existe"}
             )
         
-        cursor = conn.cursor()
+        db_cursor = conn.cursor()
         
         # Construir query con JOIN para incluir nombre del proyecto
         query = """
@@ -310,14 +416,19 @@ def get_tareas_proyecto(
             query += " AND t.prioridad = ?"
             params.append(prioridad.value)
         
-        # Ordenamiento
-        if orden:
-            query += f" ORDER BY t.fecha_creacion {'ASC' if orden == 'asc' else 'DESC'}"
-        else:
-            query += " ORDER BY t.id ASC"
+        # Ordenamiento y paginación keyset sobre (fecha_creacion, id)
+        condicion, params_cursor, order_by = paginacion_sql("t", orden, cursor)
+        if condicion:
+            query += f" AND {condicion}"
+            params.extend(params_cursor)
+        query += f" ORDER BY {order_by}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit + 1)
         
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+        db_cursor.execute(query, params)
+        rows, next_cursor = leer_pagina(db_cursor, limit, orden)
+        agregar_cursor_siguiente(response, next_cursor)
         
         return [row_to_dict(row) for row in rows]
 
@@ -352,6 +463,7 @@ def create_tarea_en_proyecto(id: int, tarea: TareaCreate):
             """,
             (tarea.descripcion.strip(), tarea.estado.value, tarea.prioridad.value, id, fecha_creacion)
         )
+        marcar_cambio(conn)
         conn.commit()
         
         tarea_id = cursor.lastrowid
@@ -371,61 +483,326 @@ def create_tarea_en_proyecto(id: int, tarea: TareaCreate):
         return row_to_dict(row)
 
 
+# ==================== OPERACIONES EN LOTE ====================
+
+# Máximo de elementos aceptados en un lote
+MAX_LOTE = 10000
+
+
+def validar_tamanio_lote(items: list):
+    """Rechaza lotes vacíos o demasiado grandes"""
+    if not items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": "El lote no puede estar vacío"}
+        )
+    if len(items) > MAX_LOTE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": f"El lote no puede tener más de {MAX_LOTE} elementos"}
+        )
+
+
+def resultado_lote(response: Response, resultados: list, codigo_ok: int) -> dict:
+    """Arma la respuesta del lote; 207 si algún elemento falló"""
+    exitosas = sum(1 for r in resultados if r["ok"])
+    response.status_code = codigo_ok if exitosas == len(resultados) else status.HTTP_207_MULTI_STATUS
+    return {
+        "procesadas": len(resultados),
+        "exitosas": exitosas,
+        "fallidas": len(resultados) - exitosas,
+        "resultados": resultados
+    }
+
+
+@app.post("/proyectos/{id}/tareas/bulk", response_model=ResultadoLote, status_code=status.HTTP_201_CREATED)
+def create_tareas_bulk(id: int, tareas: List[TareaCreate], response: Response):
+    """
+    Crea varias tareas en un proyecto con un único INSERT (executemany)
+    dentro de una sola transacción.
+    Devuelve el resultado de cada elemento: las tareas inválidas se informan
+    y no impiden que se creen las demás. 207 si alguna falló.
+    """
+    validar_tamanio_lote(tareas)
+    
+    # Validar todo el lote en una pasada
+    resultados = [None] * len(tareas)
+    validas = []
+    for indice, tarea in enumerate(tareas):
+        descripcion = tarea.descripcion.strip()
+        if not descripcion:
+            resultados[indice] = {"indice": indice, "ok": False,
+                                  "error": "La descripción de la tarea no puede estar vacía"}
+        else:
+            validas.append((indice, descripcion, tarea))
+    
+    with get_db() as conn:
+        cursor = conn.cursor()
+        # Lock de escritura desde el principio: los ids calculados no cambian
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            cursor.execute("SELECT nombre FROM proyectos WHERE id = ?", (id,))
+            proyecto = cursor.fetchone()
+            if not proyecto:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail={"error": f"El proyecto con ID {id} no existe"}
+                )
+            
+            fecha_creacion = datetime.now().isoformat()
+            primer_id = siguiente_id(conn, "tareas")
+            filas = [
+                (primer_id + n, descripcion, tarea.estado.value, tarea.prioridad.value, id, fecha_creacion)
+                for n, (_, descripcion, tarea) in enumerate(validas)
+            ]
+            cursor.executemany(
+                """
+                INSERT INTO tareas (id, descripcion, estado, prioridad, proyecto_id, fecha_creacion)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                filas
+            )
+            marcar_cambio(conn)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    
+    for (indice, _, _), fila in zip(validas, filas):
+        tarea_id, descripcion, estado, prioridad, proyecto_id, fecha = fila
+        resultados[indice] = {"indice": indice, "ok": True, "tarea": {
+            "id": tarea_id,
+            "descripcion": descripcion,
+            "estado": estado,
+            "prioridad": prioridad,
+            "proyecto_id": proyecto_id,
+            "proyecto_nombre": proyecto["nombre"],
+            "fecha_creacion": fecha
+        }}
+    
+    return resultado_lote(response, resultados, status.HTTP_201_CREATED)
+
+
+@app.patch("/tareas/bulk", response_model=ResultadoLote)
+def update_tareas_bulk(cambios: List[TareaUpdateLote], response: Response):
+    """
+    Actualiza varias tareas en una sola transacción.
+    Los cambios que modifican los mismos campos se aplican juntos con un
+    executemany. Cada elemento informa su resultado (tarea inexistente,
+    proyecto inexistente, id repetido, descripción vacía); 207 si alguno falló.
+    """
+    validar_tamanio_lote(cambios)
+    
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            # Existencia de tareas y proyectos: una consulta por bloque, no por elemento
+            tareas_ok = ids_existentes(conn, "tareas", [c.id for c in cambios])
+            proyectos_ok = ids_existentes(
+                conn, "proyectos", [c.proyecto_id for c in cambios if c.proyecto_id is not None]
+            )
+            
+            resultados = [None] * len(cambios)
+            vistos = set()
+            grupos = {}  # campos actualizados -> [(indice, params)]
+            
+            for indice, cambio in enumerate(cambios):
+                error = None
+                if cambio.id not in tareas_ok:
+                    error = f"La tarea con ID {cambio.id} no existe"
+                elif cambio.id in vistos:
+                    error = f"La tarea con ID {cambio.id} está repetida en el lote"
+                elif cambio.descripcion is not None and not cambio.descripcion.strip():
+                    error = "La descripción de la tarea no puede estar vacía"
+                elif cambio.proyecto_id is not None and cambio.proyecto_id not in proyectos_ok:
+                    error = f"El proyecto con ID {cambio.proyecto_id} no existe"
+                if error:
+                    resultados[indice] = {"indice": indice, "ok": False, "error": error}
+                    continue
+                vistos.add(cambio.id)
+                
+                campos, params = [], []
+                if cambio.descripcion is not None:
+                    campos.append("descripcion")
+                    params.append(cambio.descripcion.strip())
+                if cambio.estado is not None:
+                    campos.append("estado")
+                    params.append(cambio.estado.value)
+                if cambio.prioridad is not None:
+                    campos.append("prioridad")
+                    params.append(cambio.prioridad.value)
+                if cambio.proyecto_id is not None:
+                    campos.append("proyecto_id")
+                    params.append(cambio.proyecto_id)
+                
+                resultados[indice] = {"indice": indice, "ok": True, "id": cambio.id}
+                if campos:
+                    grupos.setdefault(tuple(campos), []).append(params + [cambio.id])
+            
+            for campos, filas in grupos.items():
+                asignaciones = ", ".join(f"{campo} = ?" for campo in campos)
+                cursor.executemany(f"UPDATE tareas SET {asignaciones} WHERE id = ?", filas)
+            marcar_cambio(conn)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        
+        actualizadas = obtener_tareas(conn, vistos)
+    
+    for resultado in resultados:
+        if resultado["ok"]:
+            resultado["tarea"] = actualizadas[resultado.pop("id")]
+    
+    return resultado_lote(response, resultados, status.HTTP_200_OK)
+
+
 # ==================== ENDPOINTS DE TAREAS GENERALES ====================
 
-@app.get("/tareas", response_model=List[Tarea])
+def filtros_tareas_sql(conn, estado, prioridad, proyecto_id):
+    """
+    SELECT de tareas (con el nombre del proyecto) y los filtros de GET /tareas.
+    Lo comparten el listado y la exportación, sin ORDER BY para que cada
+    uno agregue su paginación/orden.
+    
+    Raises:
+        HTTPException 404: si se filtra por un proyecto que no existe
+    """
+    # Query con JOIN para incluir nombre del proyecto
+    query = """
+        SELECT t.*, p.nombre as proyecto_nombre 
+        FROM tareas t 
+        JOIN proyectos p ON t.proyecto_id = p.id 
+        WHERE 1=1
+    """
+    params = []
+    
+    if estado:
+        query += " AND t.estado = ?"
+        params.append(estado.value)
+    
+    if prioridad:
+        query += " AND t.prioridad = ?"
+        params.append(prioridad.value)
+    
+    if proyecto_id:
+        # Verificar que el proyecto existe
+        if not proyecto_exists(conn, proyecto_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={"error": f"El proyecto con ID {proyecto_id} no existe"}
+            )
+        query += " AND t.proyecto_id = ?"
+        params.append(proyecto_id)
+    
+    return query, params
+
+
+@app.get("/tareas", response_model=List[Tarea], dependencies=[Depends(etag_datos)])
 def get_tareas(
+    response: Response,
     estado: Optional[EstadoTarea] = Query(None, description="Filtrar por estado"),
     prioridad: Optional[PrioridadTarea] = Query(None, description="Filtrar por prioridad"),
     proyecto_id: Optional[int] = Query(None, description="Filtrar por proyecto"),
-    orden: Optional[str] = Query(None, pattern="^(asc|desc)$", description="Ordenar por fecha (asc/desc)")
+    orden: Optional[str] = Query(None, pattern="^(asc|desc)$", description="Ordenar por fecha (asc/desc)"),
+    limit: Optional[int] = Query(None, ge=1, le=LIMITE_MAXIMO_PAGINA, description="Cantidad máxima por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en X-Next-Cursor")
 ):
     """
     Lista todas las tareas de todos los proyectos con filtros opcionales.
     Permite combinar múltiples filtros simultáneamente.
+    Con `limit` pagina por cursor; el de la página siguiente va en X-Next-Cursor.
     """
     with get_db() as conn:
-        cursor = conn.cursor()
-        
-        # Query con JOIN para incluir nombre del proyecto
-        query = """
-            SELECT t.*, p.nombre as proyecto_nombre 
-            FROM tareas t 
-            JOIN proyectos p ON t.proyecto_id = p.id 
-            WHERE 1=1
-        """
-        params = []
-        
-        if estado:
-            query += " AND t.estado = ?"
-            params.append(estado.value)
-        
-        if prioridad:
-            query += " AND t.prioridad = ?"
-            params.append(prioridad.value)
-        
-        if proyecto_id:
-            # Verificar que el proyecto existe
-            if not proyecto_exists(conn, proyecto_id):
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail={"error": f"El proyecto con ID {proyecto_id} no existe"}
-                )
-            query += " AND t.proyecto_id = ?"
-            params.append(proyecto_id)
-        
-        # Ordenamiento
-        if orden:
-            query += f" ORDER BY t.fecha_creacion {'ASC' if orden == 'asc' else 'DESC'}"
-        else:
-            query += " ORDER BY t.id ASC"
-        
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+        db_cursor = conn.cursor()
+        query, params = filtros_tareas_sql(conn, estado, prioridad, proyecto_id)
+        
+        # Ordenamiento y paginación keyset sobre (fecha_creacion, id)
+        condicion, params_cursor, order_by = paginacion_sql("t", orden, cursor)
+        if condicion:
+            query += f" AND {condicion}"
+            params.extend(params_cursor)
+        query += f" ORDER BY {order_by}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit + 1)
+        
+        db_cursor.execute(query, params)
+        rows, next_cursor = leer_pagina(db_cursor, limit, orden)
+        agregar_cursor_siguiente(response, next_cursor)
         
         return [row_to_dict(row) for row in rows]
 
 
+# Filas que se leen de SQLite por cada bloque de la exportación
+TAMANIO_LOTE_EXPORTACION = 500
+
+FORMATOS_EXPORTACION = {
+    "ndjson": ("application/x-ndjson", "tareas.ndjson"),
+    "json": ("application/json", "tareas.json"),
+}
+
+
+def exportar_filas(query: str, params: list, formato: str):
+    """
+    Generador que recorre la consulta en lotes de fetchmany() y produce los
+    bytes ya codificados: la memoria usada no depende del total de filas.
+    Toma su propia conexión, que se libera al terminar (o si el cliente corta).
+    """
+    with get_db() as conn:
+        db_cursor = conn.cursor()
+        db_cursor.execute(query, params)
+        columnas = [c[0] for c in db_cursor.description]
+        primero = True
+        
+        if formato == "json":
+            yield b"["
+        while True:
+            filas = db_cursor.fetchmany(TAMANIO_LOTE_EXPORTACION)
+            if not filas:
+                break
+            items = [
+                json.dumps(dict(zip(columnas, fila)), ensure_ascii=False, separators=(",", ":"))
+                for fila in filas
+            ]
+            if formato == "ndjson":
+                yield ("\n".join(items) + "\n").encode("utf-8")
+            else:
+                yield (("" if primero else ",") + ",".join(items)).encode("utf-8")
+            primero = False
+        if formato == "json":
+            yield b"]"
+
+
+@app.get("/tareas/export")
+def export_tareas(
+    format: str = Query("ndjson", pattern="^(ndjson|json)$", description="Formato: ndjson o json"),
+    estado: Optional[EstadoTarea] = Query(None, description="Filtrar por estado"),
+    prioridad: Optional[PrioridadTarea] = Query(None, description="Filtrar por prioridad"),
+    proyecto_id: Optional[int] = Query(None, description="Filtrar por proyecto"),
+    orden: Optional[str] = Query(None, pattern="^(asc|desc)$", description="Ordenar por fecha (asc/desc)")
+):
+    """
+    Exporta las tareas (con los mismos filtros que GET /tareas) como un
+    stream: una tarea por línea (ndjson) o un único arreglo JSON.
+    Las filas se envían a medida que se leen, sin armar la lista en memoria.
+    """
+    # Validar los filtros antes de empezar a enviar (para poder responder 404)
+    with get_db() as conn:
+        query, params = filtros_tareas_sql(conn, estado, prioridad, proyecto_id)
+    
+    _, _, order_by = paginacion_sql("t", orden)
+    query += f" ORDER BY {order_by}"
+    
+    media_type, archivo = FORMATOS_EXPORTACION[format]
+    return StreamingResponse(
+        exportar_filas(query, params, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{archivo}"'}
+    )
+
+
 @app.put("/tareas/{id}", response_model=Tarea)
 def update_tarea(id: int, tarea_update: TareaUpdate):
     """
@@ -495,6 +872,7 @@ def update_tarea(id: int, tarea_update: TareaUpdate):
         query = f"UPDATE tareas SET {', '.join(updates)} WHERE id = ?"
         
         cursor.execute(query, params)
+        marcar_cambio(conn)
         conn.commit()
         
         # Recuperar tarea actualizada con JOIN
@@ -531,6 +909,7 @@ def delete_tarea(id: int):
             )
         
         cursor.execute("DELETE FROM tareas WHERE id = ?", (id,))
+        marcar_cambio(conn)
         conn.commit()
         
         return {"mensaje": "Tarea eliminada exitosamente"}
@@ -538,13 +917,14 @@ def delete_tarea(id: int):
 
 # ==================== ENDPOINTS DE RESUMEN ====================
 
-@app.get("/proyectos/{id}/resumen", response_model=ResumenProyecto)
+@app.get("/proyectos/{id}/resumen", response_model=ResumenProyecto, dependencies=[Depends(etag_datos)])
 def get_resumen_proyecto(id: int):
     """
     Devuelve un resumen completo de un proyecto:
     - Total de tareas
     - Distribución por estado
     - Distribución por prioridad
+    Los valores salen de la tabla contadores (mantenida por triggers).
     """
     with get_db() as conn:
         cursor = conn.cursor()
@@ -559,45 +939,18 @@ def get_resumen_proyecto(id: int):
                 detail={"error": f"El proyecto con ID {id} no existe"}
             )
         
-        # Total de tareas
-        total_tareas = contar_tareas_proyecto(conn, id)
-        
-        # Por estado
-        por_estado = {
-            "pendiente": 0,
-            "en_progreso": 0,
-            "completada": 0
-        }
-        cursor.execute(
-            "SELECT estado, COUNT(*) as total FROM tareas WHERE proyecto_id = ? GROUP BY estado",
-            (id,)
-        )
-        for row in cursor.fetchall():
-            por_estado[row["estado"]] = row["total"]
-        
-        # Por prioridad
-        por_prioridad = {
-            "baja": 0,
-            "media": 0,
-            "alta": 0
-        }
-        cursor.execute(
-            "SELECT prioridad, COUNT(*) as total FROM tareas WHERE proyecto_id = ? GROUP BY prioridad",
-            (id,)
-        )
-        for row in cursor.fetchall():
-            por_prioridad[row["prioridad"]] = row["total"]
+        contadores = obtener_contadores(conn, id)
         
         return {
             "proyecto_id": id,
             "proyecto_nombre": proyecto["nombre"],
-            "total_tareas": total_tareas,
-            "por_estado": por_estado,
-            "por_prioridad": por_prioridad
+            "total_tareas": contadores["total"],
+            "por_estado": contadores["por_estado"],
+            "por_prioridad": contadores["por_prioridad"]
         }
 
 
-@app.get("/resumen", response_model=ResumenGeneral)
+@app.get("/resumen", response_model=ResumenGeneral, dependencies=[Depends(etag_datos)])
 def get_resumen_general():
     """
     Devuelve un resumen general de toda la aplicación:
@@ -605,55 +958,33 @@ def get_resumen_general():
     - Total de tareas
     - Distribución de tareas por estado
     - Proyecto con más tareas
+    Los valores salen de la tabla contadores (mantenida por triggers).
     """
     with get_db() as conn:
-        cursor = conn.cursor()
-        
-        # Total de proyectos
-        cursor.execute("SELECT COUNT(*) as total FROM proyectos")
-        total_proyectos = cursor.fetchone()["total"]
-        
-        # Total de tareas
-        cursor.execute("SELECT COUNT(*) as total FROM tareas")
-        total_tareas = cursor.fetchone()["total"]
-        
-        # Tareas por estado
-        tareas_por_estado = {
-            "pendiente": 0,
-            "en_progreso": 0,
-            "completada": 0
-        }
-        cursor.execute("SELECT estado, COUNT(*) as total FROM tareas GROUP BY estado")
-        for row in cursor.fetchall():
-            tareas_por_estado[row["estado"]] = row["total"]
-        
-        # Proyecto con más tareas
-        proyecto_con_mas_tareas = None
-        cursor.execute("""
-            SELECT p.id, p.nombre, COUNT(t.id) as cantidad_tareas
-            FROM proyectos p
-            LEFT JOIN tareas t ON p.id = t.proyecto_id
-            GROUP BY p.id, p.nombre
-            ORDER BY cantidad_tareas DESC
-            LIMIT 1
-        """)
-        row = cursor.fetchone()
-        
-        if row and row["cantidad_tareas"] > 0:
-            proyecto_con_mas_tareas = {
-                "id": row["id"],
-                "nombre": row["nombre"],
-                "cantidad_tareas": row["cantidad_tareas"]
-            }
+        contadores = obtener_contadores(conn)
         
         return {
-            "total_proyectos": total_proyectos,
-            "total_tareas": total_tareas,
-            "tareas_por_estado": tareas_por_estado,
-            "proyecto_con_mas_tareas": proyecto_con_mas_tareas
+            "total_proyectos": contadores["proyectos"],
+            "total_tareas": contadores["total"],
+            "tareas_por_estado": contadores["por_estado"],
+            "proyecto_con_mas_tareas": proyecto_con_mas_tareas(conn)
         }
 
 
+# ==================== DIAGNÓSTICO ====================
+
+@app.get("/pool")
+def get_estadisticas_pool():
+    """
+    Devuelve las estadísticas del pool de conexiones:
+    hits, misses, esperas, timeouts y conexiones abiertas/libres.
+    """
+    stats = estadisticas_pool()
+    if stats is None:
+        return {"activo": False}
+    return {"activo": True, **stats}
+
+
 # ==================== PUNTO DE ENTRADA ====================
 
 if __name__ == "__main__":
@@ -4,7 +4,7 @@ Modelos Pydantic para validación de datos de la API de Tareas y Proyectos.
 
 from pydantic import BaseModel, Field
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 
 
 # ==================== ENUMS ====================
@@ -63,6 +63,11 @@ class TareaUpdate(BaseModel):
     proyecto_id: Optional[int] = Field(None, description="ID del proyecto al que pertenece la tarea")
 
 
+class TareaUpdateLote(TareaUpdate):
+    """Modelo para una actualización dentro de PATCH /tareas/bulk"""
+    id: int = Field(..., description="ID de la tarea a actualizar")
+
+
 class Tarea(BaseModel):
     """Modelo de respuesta para una tarea"""
     id: int
@@ -74,6 +79,24 @@ class Tarea(BaseModel):
     fecha_creacion: str
 
 
+# ==================== MODELOS DE OPERACIONES EN LOTE ====================
+
+class ResultadoItemLote(BaseModel):
+    """Resultado de un elemento de una operación en lote"""
+    indice: int  # Posición del elemento en el lote recibido
+    ok: bool
+    tarea: Optional[Tarea] = None
+    error: Optional[str] = None
+
+
+class ResultadoLote(BaseModel):
+    """Modelo de respuesta de las operaciones en lote"""
+    procesadas: int
+    exitosas: int
+    fallidas: int
+    resultados: List[ResultadoItemLote]
+
+
 # ==================== MODELOS DE RESUMEN ====================
 
 class ResumenProyecto(BaseModel):
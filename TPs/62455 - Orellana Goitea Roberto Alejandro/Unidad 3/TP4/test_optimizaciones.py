@@ -0,0 +1,334 @@
+"""
+Tests de las optimizaciones de la base de datos (contadores, migraciones).
+Ejecutar desde esta carpeta con: python -m pytest test_optimizaciones.py -v
+"""
+
+import json
+import os
+import random
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+import database
+import main
+from main import app, init_db, DB_NAME
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def setup_and_teardown():
+    """Base de datos limpia antes y después de cada test"""
+    if os.path.exists(DB_NAME):
+        os.remove(DB_NAME)
+    init_db()
+    yield
+    if os.path.exists(DB_NAME):
+        os.remove(DB_NAME)
+
+
+def resumen_por_agregados(conn, proyecto_id=None):
+    """Calcula los contadores con COUNT / GROUP BY, como antes de los triggers"""
+    where, params = ("WHERE proyecto_id = ?", (proyecto_id,)) if proyecto_id else ("", ())
+    total = conn.execute(f"SELECT COUNT(*) FROM tareas {where}", params).fetchone()[0]
+    por_estado = dict.fromkeys(database.ESTADOS, 0)
+    por_estado.update(conn.execute(
+        f"SELECT estado, COUNT(*) FROM tareas {where} GROUP BY estado", params
+    ).fetchall())
+    por_prioridad = dict.fromkeys(database.PRIORIDADES, 0)
+    por_prioridad.update(conn.execute(
+        f"SELECT prioridad, COUNT(*) FROM tareas {where} GROUP BY prioridad", params
+    ).fetchall())
+    return total, por_estado, por_prioridad
+
+
+def test_contadores_coinciden_con_agregados():
+    """Operaciones al azar: los resúmenes deben coincidir con COUNT / GROUP BY"""
+    rnd = random.Random(42)
+    proyectos = []
+    for i in range(5):
+        proyectos.append(client.post("/proyectos", json={"nombre": f"P{i}"}).json()["id"])
+    tareas = []
+
+    for _ in range(300):
+        op = rnd.random()
+        if op < 0.5 or not tareas:
+            r = client.post(f"/proyectos/{rnd.choice(proyectos)}/tareas", json={
+                "descripcion": "t",
+                "estado": rnd.choice(database.ESTADOS),
+                "prioridad": rnd.choice(database.PRIORIDADES),
+            })
+            tareas.append(r.json()["id"])
+        elif op < 0.8:
+            client.put(f"/tareas/{rnd.choice(tareas)}", json={
+                "estado": rnd.choice(database.ESTADOS),
+                "prioridad": rnd.choice(database.PRIORIDADES),
+                "proyecto_id": rnd.choice(proyectos),
+            })
+        else:
+            tarea_id = tareas.pop(rnd.randrange(len(tareas)))
+            client.delete(f"/tareas/{tarea_id}")
+
+    # Borrar un proyecto con tareas (CASCADE) y crear otro vacío
+    client.delete(f"/proyectos/{proyectos.pop(0)}")
+    proyectos.append(client.post("/proyectos", json={"nombre": "Vacío"}).json()["id"])
+
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        total, por_estado, _ = resumen_por_agregados(conn)
+        resumen = client.get("/resumen").json()
+        assert resumen["total_proyectos"] == len(proyectos)
+        assert resumen["total_tareas"] == total
+        assert resumen["tareas_por_estado"] == por_estado
+
+        maximo = conn.execute("""
+            SELECT p.id, COUNT(t.id) FROM proyectos p
+            LEFT JOIN tareas t ON p.id = t.proyecto_id
+            GROUP BY p.id ORDER BY COUNT(t.id) DESC, p.id LIMIT 1
+        """).fetchone()
+        assert resumen["proyecto_con_mas_tareas"]["id"] == maximo[0]
+        assert resumen["proyecto_con_mas_tareas"]["cantidad_tareas"] == maximo[1]
+
+        for proyecto_id in proyectos:
+            total, por_estado, por_prioridad = resumen_por_agregados(conn, proyecto_id)
+            data = client.get(f"/proyectos/{proyecto_id}/resumen").json()
+            assert data["total_tareas"] == total
+            assert data["por_estado"] == por_estado
+            assert data["por_prioridad"] == por_prioridad
+    finally:
+        conn.close()
+
+
+def test_migracion_actualiza_bd_existente():
+    """Una BD con el esquema original (v0) se actualiza sin perder datos"""
+    os.remove(DB_NAME)
+    conn = sqlite3.connect(DB_NAME)
+    database._migracion_1_tablas(conn.cursor())
+    conn.execute("INSERT INTO proyectos (nombre, fecha_creacion) VALUES ('Viejo', '2025-01-01')")
+    conn.execute("""
+        INSERT INTO tareas (descripcion, estado, prioridad, proyecto_id, fecha_creacion)
+        VALUES ('Tarea vieja', 'completada', 'alta', 1, '2025-01-01')
+    """)
+    conn.commit()
+    conn.close()
+
+    init_db()
+
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == database.VERSION_ESQUEMA
+        indices = {fila[0] for fila in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert "idx_tareas_proyecto_fecha" in indices
+        assert not {"idx_tareas_proyecto_prioridad", "idx_tareas_estado_prioridad_fecha"} & indices
+    finally:
+        conn.close()
+    data = client.get("/proyectos/1/resumen").json()
+    assert data["total_tareas"] == 1
+    assert data["por_estado"]["completada"] == 1
+    assert data["por_prioridad"]["alta"] == 1
+
+
+def test_busqueda_proyectos_sin_tildes_ni_mayusculas():
+    """GET /proyectos?nombre= usa el índice FTS y sigue sincronizado al editar/borrar"""
+    for nombre in ["Diseño Gráfico", "Análisis de Datos", "Desarrollo Web"]:
+        client.post("/proyectos", json={"nombre": nombre})
+
+    nombres = lambda q: sorted(p["nombre"] for p in client.get("/proyectos", params={"nombre": q}).json())
+    assert nombres("grafico") == ["Diseño Gráfico"]
+    assert nombres("ANÁLISIS") == ["Análisis de Datos"]
+    assert nombres("de") == ["Análisis de Datos", "Desarrollo Web"]
+    assert nombres("ño") == ["Diseño Gráfico"]  # 2 caracteres pero 3 bytes: no es un trigrama
+
+    client.put("/proyectos/1", json={"nombre": "Marketing"})
+    assert nombres("diseño") == []
+    assert nombres("market") == ["Marketing"]
+
+    client.delete("/proyectos/1")
+    assert nombres("market") == []
+
+
+def recorrer_paginas(url, params, limit):
+    """Junta los ids de todas las páginas siguiendo X-Next-Cursor"""
+    ids, cursor = [], None
+    while True:
+        pagina = dict(params, limit=limit, **({"cursor": cursor} if cursor else {}))
+        response = client.get(url, params=pagina)
+        assert response.status_code == 200
+        assert len(response.json()) <= limit
+        ids += [item["id"] for item in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids
+
+
+@pytest.mark.parametrize("params", [
+    {}, {"orden": "asc"}, {"orden": "desc"},
+    {"estado": "pendiente", "orden": "desc"}, {"proyecto_id": 2, "prioridad": "alta"},
+])
+def test_paginacion_keyset_coincide_con_listado_completo(params):
+    """Las páginas concatenadas dan exactamente el listado sin paginar"""
+    for i in range(3):
+        client.post("/proyectos", json={"nombre": f"Proyecto {i}"})
+    for i in range(40):
+        client.post(f"/proyectos/{i % 3 + 1}/tareas", json={
+            "descripcion": f"Tarea {i}",
+            "estado": ["pendiente", "completada"][i % 2],
+            "prioridad": ["alta", "baja", "media"][i % 3],
+        })
+
+    completo = [t["id"] for t in client.get("/tareas", params=params).json()]
+    assert recorrer_paginas("/tareas", params, limit=7) == completo
+
+    filtros = {k: v for k, v in params.items() if k != "proyecto_id"}
+    completo = [t["id"] for t in client.get("/proyectos/1/tareas", params=filtros).json()]
+    assert recorrer_paginas("/proyectos/1/tareas", filtros, limit=4) == completo
+
+    completo = [p["id"] for p in client.get("/proyectos").json()]
+    assert recorrer_paginas("/proyectos", {}, limit=2) == completo
+
+
+def test_paginacion_cursor_invalido():
+    """Un cursor alterado o de otro orden responde 400"""
+    assert client.get("/tareas", params={"limit": 5, "cursor": "no-es-un-cursor"}).status_code == 400
+
+    client.post("/proyectos", json={"nombre": "P"})
+    for i in range(3):
+        client.post("/proyectos/1/tareas", json={"descripcion": f"T{i}"})
+    cursor = client.get("/tareas", params={"limit": 1, "orden": "asc"}).headers["X-Next-Cursor"]
+    assert client.get("/tareas", params={"limit": 1, "orden": "desc", "cursor": cursor}).status_code == 400
+
+
+def test_exportacion_streaming_respeta_filtros(monkeypatch):
+    """GET /tareas/export devuelve lo mismo que GET /tareas, en ndjson o json"""
+    monkeypatch.setattr(main, "TAMANIO_LOTE_EXPORTACION", 7)  # varios lotes de fetchmany
+    client.post("/proyectos", json={"nombre": "P"})
+    for i in range(40):
+        client.post("/proyectos/1/tareas", json={
+            "descripcion": f"Tarea ñ {i}", "estado": ["pendiente", "completada"][i % 2]
+        })
+
+    params = {"estado": "completada", "orden": "desc"}
+    esperado = client.get("/tareas", params=params).json()
+
+    response = client.get("/tareas/export", params={**params, "format": "ndjson"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(linea) for linea in response.text.splitlines()] == esperado
+
+    response = client.get("/tareas/export", params={**params, "format": "json"})
+    assert response.json() == esperado
+
+    assert client.get("/tareas/export", params={"proyecto_id": 99}).status_code == 404
+
+
+def test_creacion_y_actualizacion_en_lote():
+    """POST /proyectos/{id}/tareas/bulk y PATCH /tareas/bulk con resultados por elemento"""
+    client.post("/proyectos", json={"nombre": "P1"})
+    client.post("/proyectos", json={"nombre": "P2"})
+    client.post("/proyectos/1/tareas", json={"descripcion": "Previa"})
+
+    lote = [{"descripcion": f"Tarea {i}", "prioridad": "alta"} for i in range(200)]
+    lote[5] = {"descripcion": "   "}
+    response = client.post("/proyectos/1/tareas/bulk", json=lote)
+    assert response.status_code == 207
+    data = response.json()
+    assert (data["exitosas"], data["fallidas"]) == (199, 1)
+    assert data["resultados"][5]["ok"] is False
+    creadas = [r["tarea"] for r in data["resultados"] if r["ok"]]
+    assert [t["id"] for t in creadas] == list(range(2, 201))
+    assert creadas == client.get("/tareas", params={"prioridad": "alta"}).json()
+    assert client.get("/proyectos/1/resumen").json()["total_tareas"] == 200
+
+    cambios = [
+        {"id": 2, "estado": "completada"},
+        {"id": 3, "estado": "completada", "proyecto_id": 2},
+        {"id": 4, "descripcion": "Editada"},
+        {"id": 999, "estado": "completada"},
+        {"id": 5, "proyecto_id": 999},
+        {"id": 2, "prioridad": "baja"},
+    ]
+    response = client.patch("/tareas/bulk", json=cambios)
+    assert response.status_code == 207
+    resultados = response.json()["resultados"]
+    assert [r["ok"] for r in resultados] == [True, True, True, False, False, False]
+    assert resultados[1]["tarea"]["proyecto_nombre"] == "P2"
+    assert resultados[2]["tarea"]["descripcion"] == "Editada"
+    assert client.get("/resumen").json()["tareas_por_estado"]["completada"] == 2
+
+    assert client.post("/proyectos/99/tareas/bulk", json=[{"descripcion": "x"}]).status_code == 400
+    assert client.patch("/tareas/bulk", json=[]).status_code == 400
+
+
+def test_etag_y_304_segun_version_de_datos():
+    """Con el ETag vigente se responde 304 sin cuerpo; cualquier escritura lo invalida"""
+    client.post("/proyectos", json={"nombre": "P1"})
+    client.post("/proyectos/1/tareas", json={"descripcion": "Tarea"})
+
+    rutas = ["/proyectos", "/proyectos/1", "/proyectos/1/tareas", "/tareas", "/proyectos/1/resumen", "/resumen"]
+    etags = {ruta: client.get(ruta).headers["etag"] for ruta in rutas}
+    assert len(set(etags.values())) == len(rutas)
+    # Mismos parámetros en otro orden: mismo ETag; otros parámetros: otro ETag
+    filtrada = client.get("/tareas", params=[("estado", "pendiente"), ("prioridad", "media")]).headers["etag"]
+    assert client.get("/tareas", params=[("prioridad", "media"), ("estado", "pendiente")]).headers["etag"] == filtrada
+    assert filtrada != etags["/tareas"]
+
+    for ruta, etag in etags.items():
+        response = client.get(ruta, headers={"If-None-Match": f'"otro", W/{etag}'})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag and response.content == b""
+
+    client.put("/tareas/1", json={"estado": "completada"})
+    for ruta, etag in etags.items():
+        response = client.get(ruta, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+    assert client.get("/resumen").json()["tareas_por_estado"]["completada"] == 1
+
+
+def test_etag_cambia_con_escrituras_por_fuera_de_la_api():
+    """La versión está en la BD: la cambia también otra conexión (otro worker, un script) con marcar_cambio"""
+    client.post("/proyectos", json={"nombre": "P1"})
+    client.post("/proyectos/1/tareas", json={"descripcion": "Tarea"})
+    etag = client.get("/tareas").headers["etag"]
+    assert client.get("/tareas", headers={"If-None-Match": etag}).status_code == 304
+
+    otra = sqlite3.connect(DB_NAME)
+    try:
+        otra.execute("UPDATE tareas SET descripcion = 'Cambiada' WHERE id = 1")
+        database.marcar_cambio(otra)
+        otra.commit()
+    finally:
+        otra.close()
+
+    response = client.get("/tareas", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["descripcion"] == "Cambiada"
+
+
+def test_version_avanza_una_vez_por_escritura():
+    """Sin triggers por fila: un lote grande avanza la versión una sola vez, y siempre hacia arriba"""
+    def version():
+        with database.get_db() as conn:
+            return database.version_datos(conn)
+
+    with database.get_db() as conn:
+        triggers = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%_version'"
+        ).fetchall()
+    assert triggers == []
+
+    versiones = [version()]
+    client.post("/proyectos", json={"nombre": "P1"})
+    versiones.append(version())
+    client.post("/proyectos/1/tareas/bulk", json=[{"descripcion": f"T{i}"} for i in range(200)])
+    versiones.append(version())
+    client.get("/tareas")
+    assert version() == versiones[-1]
+    assert versiones == sorted(set(versiones))
+
+
+def test_if_none_match_asterisco_no_oculta_un_404():
+    """`*` no es un ETag de los candidatos: no hay 304 para un recurso que no existe ni para listas vacías"""
+    assert client.get("/proyectos/999", headers={"If-None-Match": "*"}).status_code == 404
+    assert client.get("/proyectos", headers={"If-None-Match": "*"}).status_code == 200
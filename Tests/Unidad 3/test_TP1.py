@@ -2,22 +2,77 @@
 Test de autocorrección para TP3.1 - Introducción a FastAPI
 Ejecutar con: python -m pytest test_TP1.py -v
 O simplemente: python test_TP1.py
+
+Cómo se le hacen los pedidos a la API (variable de entorno TESTS_TRANSPORTE):
+- "asgi" (por defecto): se importa main.app y se le habla directamente con el
+  TestClient de FastAPI, sin servidor ni puerto. No hace falta levantar nada y
+  se pueden corregir varios TPs a la vez.
+- "servidor": se levanta uvicorn main:app en un puerto libre, se corren los tests
+  contra él por HTTP y se apaga al terminar.
+- "url": se usa un servidor que ya esté corriendo en TESTS_BASE_URL
+  (por defecto http://127.0.0.1:8000, levantado con uvicorn main:app --reload).
 """
 
 import pytest
-import requests
+import httpx
+import importlib.util
 import json
+import os
+import socket
 import time
 import subprocess
 import sys
 from typing import Dict, Any, List
 
+TRANSPORTE = os.environ.get("TESTS_TRANSPORTE", "asgi")
+BASE_URL = os.environ.get("TESTS_BASE_URL", "http://127.0.0.1:8000")
+
+
+def carpeta_del_tp() -> str:
+    """Carpeta donde está el main.py que se importaría (la del test o la actual)"""
+    spec = importlib.util.find_spec("main")
+    if spec is None or not spec.origin:
+        return os.getcwd()
+    return os.path.dirname(os.path.abspath(spec.origin))
+
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def levantar_servidor(espera: float = 15.0):
+    """Corre uvicorn main:app en un puerto libre y espera a que responda"""
+    puerto = puerto_libre()
+    url = f"http://127.0.0.1:{puerto}"
+    carpeta = carpeta_del_tp()
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", carpeta,
+         "--host", "127.0.0.1", "--port", str(puerto), "--log-level", "warning"],
+        cwd=carpeta,
+    )
+    limite = time.monotonic() + espera
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            break
+        try:
+            httpx.get(f"{url}/", timeout=1)
+            return proceso, url
+        except httpx.TransportError:
+            time.sleep(0.1)
+    proceso.kill()
+    proceso.wait()
+    return None, url
+
+
 class TestAgendaAPI:
     """
     Clase de test para verificar la implementación de la Agenda API
     """
     
-    BASE_URL = "http://127.0.0.1:8000"
+    BASE_URL = BASE_URL
+    servidor = None
     
     @classmethod
     def setup_class(cls):
@@ -27,20 +82,46 @@ class TestAgendaAPI:
         print("TP3.1: Introducción a FastAPI - Servidor Básico")
         print("="*60)
         
+        if TRANSPORTE == "asgi":
+            from fastapi.testclient import TestClient
+            from main import app
+            # Los errores de la app se ven como un 500, igual que con un servidor de verdad
+            cls.client = TestClient(app, raise_server_exceptions=False)
+            cls.client.__enter__()
+            print("✅ App importada desde main.py (sin servidor)")
+            return
+        
+        if TRANSPORTE == "servidor":
+            cls.servidor, cls.BASE_URL = levantar_servidor()
+            if cls.servidor is None:
+                pytest.exit("❌ ERROR: uvicorn main:app no arrancó (revisar el error de arriba)", returncode=1)
+            print(f"✅ Servidor levantado en {cls.BASE_URL}")
+        
         # Verificar que el servidor esté corriendo
+        cls.client = httpx.Client(base_url=cls.BASE_URL)
         try:
-            response = requests.get(f"{cls.BASE_URL}/", timeout=5)
+            cls.client.get("/", timeout=5)
             print("✅ Servidor detectado y funcionando")
-        except requests.exceptions.RequestException:
+        except httpx.TransportError:
             print("❌ ERROR: El servidor no está corriendo")
             print("💡 Ejecuta primero: uvicorn main:app --reload")
             sys.exit(1)
 
+    @classmethod
+    def teardown_class(cls):
+        if TRANSPORTE == "asgi":
+            cls.client.__exit__(None, None, None)
+        else:
+            cls.client.close()
+        if cls.servidor is not None:
+            cls.servidor.terminate()
+            cls.servidor.wait()
+
     def test_01_endpoint_raiz_existe(self):
         """Test 1: Verificar que existe el endpoint raíz"""
         print("\n📋 Test 1: Verificando endpoint raíz...")
         
-        response = requests.get(f"{self.BASE_URL}/")
+        response = self.client.get("/")
         
         assert response.status_code == 200, "El endpoint raíz debe retornar status 200"
         print("✅ Endpoint raíz responde correctamente")
@@ -49,7 +130,7 @@ class TestAgendaAPI:
         """Test 2: Verificar formato del mensaje de bienvenida"""
         print("\n📋 Test 2: Verificando formato del mensaje de bienvenida...")
         
-        response = requests.get(f"{self.BASE_URL}/")
+        response = self.client.get("/")
         data = response.json()
         
         assert "mensaje" in data, "La respuesta debe contener la clave 'mensaje'"
@@ -63,7 +144,7 @@ class TestAgendaAPI:
         """Test 3: Verificar que existe el endpoint /contactos"""
         print("\n📋 Test 3: Verificando endpoint /contactos...")
         
-        response = requests.get(f"{self.BASE_URL}/contactos")
+        response = self.client.get("/contactos")
         
         assert response.status_code == 200, "El endpoint /contactos debe retornar status 200"
         print("✅ Endpoint /contactos responde correctamente")
@@ -72,7 +153,7 @@ class TestAgendaAPI:
         """Test 4: Verificar que /contactos devuelve una lista JSON"""
         print("\n📋 Test 4: Verificando formato JSON de contactos...")
         
-        response = requests.get(f"{self.BASE_URL}/contactos")
+        response = self.client.get("/contactos")
         data = response.json()
         
         assert isinstance(data, list), "Los contactos deben ser una lista"
@@ -84,7 +165,7 @@ class TestAgendaAPI:
         """Test 5: Verificar estructura de los contactos"""
         print("\n📋 Test 5: Verificando estructura de contactos...")
         
-        response = requests.get(f"{self.BASE_URL}/contactos")
+        response = self.client.get("/contactos")
         contactos = response.json()
         
         campos_requeridos = ["nombre", "apellido", "edad", "teléfono", "email"]
@@ -107,7 +188,7 @@ class TestAgendaAPI:
         """Test 6: Verificar contactos específicos del ejemplo"""
         print("\n📋 Test 6: Verificando contactos específicos del ejemplo...")
         
-        response = requests.get(f"{self.BASE_URL}/contactos")
+        response = self.client.get("/contactos")
         contactos = response.json()
         
         # Buscar Juan Pérez
@@ -134,7 +215,7 @@ class TestAgendaAPI:
         print("\n📋 Test 7: Verificando manejo de errores 404...")
         
         # Intentar acceder a una ruta inexistente
-        response = requests.get(f"{self.BASE_URL}/ruta-inexistente")
+        response = self.client.get("/ruta-inexistente")
         
         assert response.status_code == 404, "Rutas inexistentes deben retornar 404"
         
@@ -144,7 +225,7 @@ class TestAgendaAPI:
         """Test 8: Verificar headers de respuesta"""
         print("\n📋 Test 8: Verificando headers de respuesta...")
         
-        response = requests.get(f"{self.BASE_URL}/")
+        response = self.client.get("/")
         
         assert "application/json" in response.headers.get("content-type", ""), \
             "Las respuestas deben ser application/json"
@@ -156,7 +237,7 @@ class TestAgendaAPI:
         print("\n📋 Test 9: Verificando rendimiento básico...")
         
         start_time = time.time()
-        response = requests.get(f"{self.BASE_URL}/contactos")
+        response = self.client.get("/contactos")
         end_time = time.time()
         
         response_time = end_time - start_time
@@ -169,7 +250,7 @@ class TestAgendaAPI:
         """Test 10: Verificar que la documentación automática esté disponible"""
         print("\n📋 Test 10: Verificando documentación automática...")
         
-        response = requests.get(f"{self.BASE_URL}/docs")
+        response = self.client.get("/docs")
         
         assert response.status_code == 200, "La documentación debe estar disponible en /docs"
         
@@ -184,7 +265,7 @@ def mostrar_resumen_final():
     print("✅ Si todos los tests pasaron: ¡Excelente trabajo!")
     print("❌ Si algún test falló: Revisa la implementación")
     print("\n💡 Recordatorios:")
-    print("   - Ejecuta el servidor con: uvicorn main:app --reload")
+    print("   - Para probar a mano: uvicorn main:app --reload")
     print("   - Visita la documentación en: http://127.0.0.1:8000/docs")
     print("   - Los contactos deben estar hardcoded en memoria")
     print("="*60)
@@ -9,21 +9,49 @@ client = TestClient(app)
 
 # ============== FIXTURES ==============
 
-@pytest.fixture(autouse=True)
-def setup_and_teardown():
-    """Se ejecuta antes y después de cada test"""
-    # Antes del test: eliminar base de datos si existe
+# Cómo se deja la base de datos limpia antes de cada test (variable de entorno TESTS_MODO_DB):
+# - "plantilla" (por defecto): init_db() corre una sola vez por sesión y esa BD vacía
+#   queda en memoria; antes de cada test se copia sobre DB_NAME con la API de backup
+#   de SQLite (sin borrar el archivo ni volver a crear las tablas)
+# - "recrear": borra DB_NAME y corre init_db() antes y después de cada test
+MODO_DB = os.environ.get("TESTS_MODO_DB", "plantilla")
+
+def eliminar_db():
     if os.path.exists(DB_NAME):
         os.remove(DB_NAME)
-    
-    # Inicializar base de datos limpia
+
+@pytest.fixture(scope="session")
+def plantilla_db():
+    """BD recién inicializada, guardada en memoria para restaurarla en cada test"""
+    eliminar_db()
     init_db()
-    
+    plantilla = sqlite3.connect(":memory:")
+    origen = sqlite3.connect(DB_NAME)
+    origen.backup(plantilla)
+    origen.close()
+    yield plantilla
+    plantilla.close()
+    eliminar_db()
+
+@pytest.fixture(autouse=True)
+def setup_and_teardown(request):
+    """Base de datos limpia antes de cada test"""
+    if MODO_DB == "recrear":
+        eliminar_db()
+        init_db()
+        yield
+        eliminar_db()
+        return
+    
+    # Restaurar la plantilla: reemplaza todas las páginas del archivo (tablas vacías y
+    # contadores AUTOINCREMENT en cero), también para conexiones que la app tenga abiertas
+    plantilla = request.getfixturevalue("plantilla_db")
+    destino = sqlite3.connect(DB_NAME)
+    try:
+        plantilla.backup(destino)
+    finally:
+        destino.close()
     yield
-    
-    # Después del test: limpiar
-    if os.path.exists(DB_NAME):
-        os.remove(DB_NAME)
 
 # ============== TESTS DE MIGRACIÓN A SQLite ==============
 
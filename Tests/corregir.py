@@ -0,0 +1,283 @@
+"""
+Corrección automática de todos los TPs en paralelo.
+
+Busca cada TPs/<legajo - nombre>/<unidad>/TPn/main.py, lo empareja con
+Tests/<unidad>/test_TPn.py y corre esa suite con pytest. Cada corrida se hace
+en una carpeta temporal propia (con una copia del TP y del test), así las
+suites que escriben tareas.db en la carpeta actual pueden correr a la vez.
+Se corren tantas suites en paralelo como núcleos haya.
+
+Al terminar escribe en la carpeta de salida:
+    resultados.json   resultado de cada test de cada alumno, con el tiempo de cada suite
+    TPn.csv           una fila por alumno y una columna por test (para una planilla)
+
+Los resultados quedan guardados en <salida>/cache, junto con un hash de los
+archivos del TP, de la suite y de las versiones de Python y de las dependencias.
+Si nada de eso cambió desde la corrida anterior, se reutiliza el resultado sin
+volver a correr la suite. Con --force se corre todo de nuevo.
+
+Uso (desde la raíz del repositorio):
+    python Tests/corregir.py                       # Unidad 3, TP1 a TP4
+    python Tests/corregir.py --tp 4 --alumno Orellana
+    python Tests/corregir.py --procesos 2 --salida /tmp/correccion
+    python Tests/corregir.py --force               # ignora los resultados guardados
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from fnmatch import fnmatch
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, List, Optional
+
+RAIZ = Path(__file__).resolve().parent.parent
+# TP1 corre en proceso contra main.app (TESTS_TRANSPORTE=asgi), sin servidor en el puerto 8000
+TPS_POR_DEFECTO = [1, 2, 3, 4]
+# Lo que no se copia del TP del alumno (bases de datos viejas, cachés)
+PATRONES_IGNORADOS = ("__pycache__", ".pytest_cache", "*.db", "*.db-wal", "*.db-shm", "venv", ".venv")
+IGNORAR = shutil.ignore_patterns(*PATRONES_IGNORADOS)
+# Paquetes cuya versión cambia el resultado de las suites (parte de la clave del caché)
+DEPENDENCIAS = ("fastapi", "starlette", "pydantic", "pydantic-core", "pytest", "httpx", "requests", "uvicorn")
+# Variables de entorno que leen las suites (TESTS_TRANSPORTE, TESTS_MODO_DB...) o los
+# TPs (TAREAS_ALMACEN, AGENDA_ARCHIVO...): pytest las hereda, así que también van en la clave
+PREFIJOS_ENTORNO = ("TESTS_", "TAREAS_", "AGENDA_")
+# Cambiar si cambia cómo se corre una suite o el formato de Resultado
+VERSION_CACHE = 1
+
+
+@dataclass
+class Entrega:
+    """Un TP de un alumno con la suite de tests que le corresponde"""
+    alumno: str
+    unidad: str
+    tp: int
+    carpeta: Path
+    suite: Path
+
+
+@dataclass
+class Resultado:
+    alumno: str
+    unidad: str
+    tp: int
+    suite: str
+    estado: str                     # ok, fallas, error o timeout
+    tiempo: float                   # segundos de la suite (incluye importar la app)
+    resumen: Dict[str, int] = field(default_factory=dict)
+    tests: Dict[str, str] = field(default_factory=dict)   # test -> passed/failed/error/skipped
+    detalle: str = ""               # salida de pytest si no se pudo correr
+    en_cache: bool = False          # se reutilizó de una corrida anterior
+
+
+def descubrir(unidad: str, tps: List[int], filtro_alumno: Optional[str] = None) -> List[Entrega]:
+    entregas = []
+    for tp in tps:
+        suite = RAIZ / "Tests" / unidad / f"test_TP{tp}.py"
+        if not suite.exists():
+            continue
+        for main in sorted(RAIZ.glob(f"TPs/*/{unidad}/TP{tp}/main.py")):
+            alumno = main.parents[2].name
+            if filtro_alumno and filtro_alumno.lower() not in alumno.lower():
+                continue
+            entregas.append(Entrega(alumno, unidad, tp, main.parent, suite))
+    return entregas
+
+
+def leer_junit(ruta: Path) -> Dict[str, str]:
+    """Resultado de cada test según el XML de --junitxml"""
+    tests = {}
+    for caso in ET.parse(ruta).getroot().iter("testcase"):
+        nombre = caso.get("name", "")
+        clase = caso.get("classname", "").rsplit(".", 1)[-1]
+        if clase.startswith("Test"):  # tests dentro de una clase (TP1)
+            nombre = f"{clase}::{nombre}"
+        estado = "passed"
+        for hijo in caso:
+            if hijo.tag in ("failure", "error", "skipped"):
+                estado = "failed" if hijo.tag == "failure" else hijo.tag
+        # Un error en el teardown agrega otro <testcase> con el mismo nombre: gana el peor
+        if tests.get(nombre) in (None, "passed", "skipped"):
+            tests[nombre] = estado
+    return tests
+
+
+# ==================== CACHÉ DE RESULTADOS ====================
+
+def huella_entorno() -> str:
+    """Versiones de Python y de las dependencias, y las variables de entorno que
+    cambian cómo corren las suites (si cambia algo, hay que volver a correr todo)"""
+    versiones = {"python": sys.version, "cache": VERSION_CACHE}
+    for paquete in DEPENDENCIAS:
+        try:
+            versiones[paquete] = metadata.version(paquete)
+        except metadata.PackageNotFoundError:
+            versiones[paquete] = None
+    variables = {nombre: valor for nombre, valor in os.environ.items() if nombre.startswith(PREFIJOS_ENTORNO)}
+    return json.dumps({"versiones": versiones, "variables": variables}, sort_keys=True)
+
+
+def clave_cache(entrega: Entrega, entorno: str) -> str:
+    """Hash de todo lo que se copia del TP (no solo main.py: también sus otros
+    módulos), de la suite y del entorno"""
+    h = hashlib.sha256(entorno.encode())
+    h.update(entrega.suite.read_bytes())
+    for ruta in sorted(entrega.carpeta.rglob("*")):
+        relativa = ruta.relative_to(entrega.carpeta)
+        if any(fnmatch(parte, patron) for parte in relativa.parts for patron in PATRONES_IGNORADOS):
+            continue
+        if ruta.is_file():
+            h.update(b"\0" + relativa.as_posix().encode() + b"\0")
+            h.update(ruta.read_bytes())
+    return h.hexdigest()
+
+
+def ruta_cache(carpeta: Path, entrega: Entrega) -> Path:
+    # Un archivo por TP de cada alumno: un resultado nuevo reemplaza al viejo
+    return carpeta / entrega.unidad / f"TP{entrega.tp}" / f"{entrega.alumno}.json"
+
+
+def leer_cache(carpeta: Path, entrega: Entrega, clave: str) -> Optional[Resultado]:
+    try:
+        with open(ruta_cache(carpeta, entrega), encoding="utf-8") as archivo:
+            guardado = json.load(archivo)
+        if guardado["clave"] != clave:
+            return None
+        resultado = Resultado(**guardado["resultado"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    resultado.en_cache = True
+    return resultado
+
+
+def guardar_cache(carpeta: Path, entrega: Entrega, clave: str, resultado: Resultado):
+    if resultado.estado == "timeout":  # puede haber sido la máquina cargada: no se guarda
+        return
+    ruta = ruta_cache(carpeta, entrega)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_suffix(".tmp")
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump({"clave": clave, "resultado": asdict(resultado)}, archivo, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+
+def corregir_con_cache(entrega: Entrega, timeout: float, cache: Path, entorno: str, forzar: bool) -> Resultado:
+    clave = clave_cache(entrega, entorno)
+    if not forzar:
+        resultado = leer_cache(cache, entrega, clave)
+        if resultado is not None:
+            return resultado
+    resultado = corregir(entrega, timeout)
+    guardar_cache(cache, entrega, clave, resultado)
+    return resultado
+
+
+# ==================== CORRECCIÓN ====================
+
+def corregir(entrega: Entrega, timeout: float) -> Resultado:
+    """Corre la suite sobre una copia del TP en una carpeta temporal"""
+    resultado = Resultado(entrega.alumno, entrega.unidad, entrega.tp, entrega.suite.name, "error", 0.0)
+    with tempfile.TemporaryDirectory(prefix="correccion-") as temporal:
+        trabajo = Path(temporal) / "tp"
+        shutil.copytree(entrega.carpeta, trabajo, ignore=IGNORAR)
+        shutil.copy(entrega.suite, trabajo / entrega.suite.name)
+        junit = Path(temporal) / "junit.xml"
+        comando = [sys.executable, "-m", "pytest", entrega.suite.name, "-q", "-p", "no:cacheprovider",
+                   f"--junitxml={junit}"]
+        entorno = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+        inicio = time.perf_counter()
+        try:
+            proceso = subprocess.run(comando, cwd=trabajo, env=entorno, capture_output=True,
+                                     text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            resultado.estado = "timeout"
+            resultado.tiempo = round(time.perf_counter() - inicio, 3)
+            return resultado
+        resultado.tiempo = round(time.perf_counter() - inicio, 3)
+
+        if junit.exists():
+            resultado.tests = leer_junit(junit)
+        for estado in ("passed", "failed", "error", "skipped"):
+            resultado.resumen[estado] = sum(e == estado for e in resultado.tests.values())
+        # pytest: 0 = todo bien, 1 = algún test falló; lo demás es que no se pudo correr
+        if proceso.returncode in (0, 1) and resultado.tests:
+            resultado.estado = "ok" if proceso.returncode == 0 else "fallas"
+        else:
+            resultado.detalle = (proceso.stdout + proceso.stderr)[-2000:]
+    return resultado
+
+
+def escribir_salida(resultados: List[Resultado], salida: Path):
+    salida.mkdir(parents=True, exist_ok=True)
+    with open(salida / "resultados.json", "w", encoding="utf-8") as archivo:
+        json.dump({
+            "generado": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "resultados": [asdict(r) for r in resultados],
+        }, archivo, ensure_ascii=False, indent=2)
+
+    for tp in sorted({r.tp for r in resultados}):
+        del_tp = [r for r in resultados if r.tp == tp]
+        # Columnas en el orden de la suite (el de cualquier corrida completa)
+        tests = list(dict.fromkeys(t for r in del_tp for t in r.tests))
+        with open(salida / f"TP{tp}.csv", "w", encoding="utf-8", newline="") as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(["alumno", "estado", "aprobados", "total", "tiempo_s"] + tests)
+            for r in del_tp:
+                escritor.writerow([r.alumno, r.estado, r.resumen.get("passed", 0), len(tests), r.tiempo]
+                                  + [r.tests.get(t, "") for t in tests])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Corre las suites de tests de todos los alumnos en paralelo")
+    parser.add_argument("--unidad", default="Unidad 3")
+    parser.add_argument("--tp", type=int, nargs="+", default=TPS_POR_DEFECTO, help="TPs a corregir")
+    parser.add_argument("--alumno", help="Solo los alumnos cuya carpeta contenga este texto")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1, help="Suites en paralelo")
+    parser.add_argument("--timeout", type=float, default=300, help="Segundos máximos por suite")
+    parser.add_argument("--salida", type=Path, default=RAIZ / "correccion", help="Carpeta de resultados")
+    parser.add_argument("--force", action="store_true", help="Volver a correr todo aunque haya resultados guardados")
+    args = parser.parse_args(argv)
+
+    entregas = descubrir(args.unidad, args.tp, args.alumno)
+    if not entregas:
+        print("No se encontraron TPs para corregir")
+        return 1
+    print(f"Corrigiendo {len(entregas)} TPs con {args.procesos} procesos en paralelo...")
+
+    inicio = time.perf_counter()
+    resultados = []
+    # Cada suite corre en su propio proceso de pytest; los hilos solo esperan a que terminen
+    with ThreadPoolExecutor(max_workers=args.procesos) as pool:
+        entorno = huella_entorno()
+        pendientes = [pool.submit(corregir_con_cache, e, args.timeout, args.salida / "cache", entorno, args.force)
+                      for e in entregas]
+        for futuro in as_completed(pendientes):
+            r = futuro.result()
+            resultados.append(r)
+            total = sum(r.resumen.values())
+            origen = " (caché)" if r.en_cache else ""
+            print(f"  TP{r.tp} {r.alumno:<45} {r.estado:<8} {r.resumen.get('passed', 0):>3}/{total:<3} {r.tiempo:6.2f}s{origen}")
+    resultados.sort(key=lambda r: (r.tp, r.alumno))
+
+    escribir_salida(resultados, args.salida)
+    reutilizados = sum(r.en_cache for r in resultados)
+    print(f"Listo en {time.perf_counter() - inicio:.1f}s ({reutilizados} de {len(resultados)} desde el caché). "
+          f"Resultados en {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
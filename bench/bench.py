@@ -0,0 +1,242 @@
+"""
+Pruebas de carga de los TPs de la Unidad 3 (agenda, tareas en memoria, tareas
+en SQLite, proyectos y tareas).
+
+Por cada TP de cada alumno copia la carpeta a un directorio temporal (sin las
+bases de datos, igual que Tests/corregir.py) y corre bench/carga.py con el
+escenario de ese TP (ver bench/escenarios.py), en proceso (asgi) y contra
+uvicorn por HTTP (http). Mide latencia p50/p95/p99, pedidos por segundo y RSS
+máximo (la mediana de --repeticiones corridas).
+
+Líneas base:
+    --guardar   escribe el resultado en bench/lineas_base/<unidad>/<alumno>/TPn-<modo>.json
+    --comparar  compara contra esa línea base y termina con código 1 si algo empeoró
+                más que --umbral (latencias o RSS más altos, pedidos por segundo más bajos,
+                errores nuevos). También termina con código 1 si no hubo ninguna línea
+                base comparable (faltan o son de otros parámetros); con --estricto,
+                si falta alguna
+
+Las líneas base van al repo: guardan los parámetros de la corrida y el entorno
+(Python, dependencias, CPUs). Solo se comparan corridas con los mismos
+parámetros; si el entorno cambió se avisa, porque los números dejan de ser
+comparables.
+
+Uso (desde la raíz del repo):
+    python bench/bench.py --tp 3 --alumno Orellana
+    python bench/bench.py --tp 1 2 3 4 --alumno Orellana --guardar
+    python bench/bench.py --alumno Orellana --comparar --umbral 0.4
+    python bench/bench.py --tp 4 --modo http --pedidos 5000 --concurrencia 64
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, List, Optional
+
+AQUI = Path(__file__).resolve().parent
+sys.path.insert(0, str(AQUI.parent / "Tests"))
+from corregir import IGNORAR, RAIZ, Entrega, descubrir  # noqa: E402
+
+LINEAS_BASE = AQUI / "lineas_base"
+# Cambiar si cambian los escenarios o el formato del resultado: invalida las líneas base
+VERSION_FORMATO = 1
+DEPENDENCIAS = ("fastapi", "starlette", "pydantic", "uvicorn", "httpx")
+# Métricas que se comparan: (clave, True si más alto es peor)
+METRICAS = [("p50_ms", True), ("p95_ms", True), ("p99_ms", True), ("rps", False), ("rss_max_mb", True)]
+
+
+def entorno() -> Dict[str, object]:
+    datos = {"python": platform.python_version(), "sistema": platform.system(), "cpus": os.cpu_count()}
+    for paquete in DEPENDENCIAS:
+        try:
+            datos[paquete] = metadata.version(paquete)
+        except metadata.PackageNotFoundError:
+            datos[paquete] = None
+    return datos
+
+
+def commit_actual() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parametros(args) -> Dict[str, int]:
+    return {"pedidos": args.pedidos, "concurrencia": args.concurrencia,
+            "calentamiento": args.calentamiento, "semilla": args.semilla, "repeticiones": args.repeticiones}
+
+
+def ruta_linea_base(carpeta: Path, entrega: Entrega, modo: str) -> Path:
+    return carpeta / entrega.unidad / entrega.alumno / f"TP{entrega.tp}-{modo}.json"
+
+
+def mediana_de(resultados: List[dict]) -> dict:
+    """Mediana de cada métrica entre repeticiones (también por operación)"""
+    combinado = {}
+    for clave, valor in resultados[0].items():
+        if isinstance(valor, dict):
+            combinado[clave] = mediana_de([r[clave] for r in resultados if clave in r])
+        elif isinstance(valor, (int, float)) and all(r.get(clave) is not None for r in resultados):
+            combinado[clave] = statistics.median(r[clave] for r in resultados)
+        else:
+            combinado[clave] = valor
+    return combinado
+
+
+def medir_una_vez(entrega: Entrega, modo: str, args) -> dict:
+    """Corre carga.py sobre una copia del TP; lanza RuntimeError si no se pudo medir"""
+    with tempfile.TemporaryDirectory(prefix="bench-") as temporal:
+        trabajo = Path(temporal) / "tp"
+        shutil.copytree(entrega.carpeta, trabajo, ignore=IGNORAR)
+        salida = Path(temporal) / "resultado.json"
+        comando = [sys.executable, str(AQUI / "carga.py"), "--tp", str(entrega.tp), "--modo", modo,
+                   "--salida", str(salida), f"--pedidos={args.pedidos}", f"--concurrencia={args.concurrencia}",
+                   f"--calentamiento={args.calentamiento}", f"--semilla={args.semilla}"]
+        entorno_proceso = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+        try:
+            proceso = subprocess.run(comando, cwd=trabajo, env=entorno_proceso, capture_output=True,
+                                     text=True, timeout=args.timeout)
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"no terminó en {args.timeout}s")
+        if proceso.returncode != 0 or not salida.exists():
+            raise RuntimeError((proceso.stdout + proceso.stderr)[-1500:])
+        with open(salida, encoding="utf-8") as archivo:
+            return json.load(archivo)
+
+
+def medir(entrega: Entrega, modo: str, args) -> dict:
+    # En máquinas con pocos núcleos los percentiles altos varían bastante de una corrida a otra
+    return mediana_de([medir_una_vez(entrega, modo, args) for _ in range(args.repeticiones)])
+
+
+def comparar(actual: dict, base: dict, umbral: float) -> List[str]:
+    """Regresiones de `actual` respecto de `base` (lista vacía si no hay)"""
+    regresiones = []
+    for metrica, mas_alto_es_peor in METRICAS:
+        antes, ahora = base.get(metrica), actual.get(metrica)
+        if not antes or ahora is None:
+            continue
+        cambio = (ahora - antes) / antes
+        if (cambio if mas_alto_es_peor else -cambio) > umbral:
+            regresiones.append(f"{metrica}: {antes} -> {ahora} ({cambio:+.0%})")
+    if actual["errores"] > base["errores"]:
+        regresiones.append(f"errores: {base['errores']} -> {actual['errores']}")
+    return regresiones
+
+
+def comparar_con_linea_base(ruta: Path, resultado: dict, args, datos_entorno: dict) -> Optional[bool]:
+    """Muestra las regresiones respecto de la línea base guardada; True si hay alguna,
+    None si no hay una línea base comparable"""
+    try:
+        with open(ruta, encoding="utf-8") as archivo:
+            base = json.load(archivo)
+    except (OSError, ValueError):
+        print(f"       ⚠️ sin línea base en {ruta}")
+        return None
+    if base.get("formato") != VERSION_FORMATO or base.get("parametros") != parametros(args):
+        print("       ⚠️ la línea base es de otro formato o con otros parámetros: no se compara")
+        return None
+    if base.get("entorno") != datos_entorno:
+        print(f"       ⚠️ la línea base se midió en otro entorno: {base.get('entorno')}")
+    regresiones = comparar(resultado, base["resultado"], args.umbral)
+    for regresion in regresiones:
+        print(f"       ❌ {regresion}")
+    return bool(regresiones)
+
+
+def mostrar(entrega: Entrega, modo: str, resultado: dict):
+    print(f"  TP{entrega.tp} {modo:<4} {entrega.alumno:<45} {resultado['rps']:>8.1f} ped/s  "
+          f"p50 {resultado['p50_ms']:>7.2f}  p95 {resultado['p95_ms']:>7.2f}  p99 {resultado['p99_ms']:>7.2f} ms  "
+          f"RSS {resultado['rss_max_mb']} MB  errores {resultado['errores']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--unidad", default="Unidad 3", help="Carpeta de la unidad (default: Unidad 3)")
+    parser.add_argument("--tp", type=int, nargs="+", default=[1, 2, 3, 4], help="TPs a medir")
+    parser.add_argument("--alumno", help="Solo carpetas de alumno que contengan este texto")
+    parser.add_argument("--modo", nargs="+", choices=["asgi", "http"], default=["asgi", "http"])
+    parser.add_argument("--pedidos", type=int, default=2000, help="Pedidos medidos por TP y modo")
+    parser.add_argument("--concurrencia", type=int, default=16, help="Usuarios simultáneos")
+    parser.add_argument("--calentamiento", type=int, default=100, help="Pedidos previos que no se miden")
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--repeticiones", type=int, default=3, help="Corridas por TP y modo (se toma la mediana)")
+    parser.add_argument("--timeout", type=float, default=600, help="Segundos máximos por TP y modo")
+    parser.add_argument("--lineas-base", type=Path, default=LINEAS_BASE, help="Carpeta de líneas base")
+    parser.add_argument("--guardar", action="store_true", help="Guardar el resultado como línea base")
+    parser.add_argument("--comparar", action="store_true", help="Comparar contra la línea base guardada")
+    parser.add_argument("--umbral", type=float, default=0.25, help="Empeoramiento tolerado (0.25 = 25%%)")
+    parser.add_argument("--estricto", action="store_true",
+                        help="Con --comparar, fallar si algún TP no tiene una línea base comparable")
+    args = parser.parse_args(argv)
+
+    entregas = descubrir(args.unidad, args.tp, args.alumno)
+    if not entregas:
+        print("No se encontró ningún TP para medir")
+        return 1
+
+    datos_entorno = entorno()
+    hubo_regresion = hubo_error = False
+    comparados = sin_comparar = 0
+    print(f"Midiendo {len(entregas)} TPs: {args.pedidos} pedidos, concurrencia {args.concurrencia}")
+    for entrega in entregas:
+        for modo in args.modo:
+            try:
+                resultado = medir(entrega, modo, args)
+            except RuntimeError as error:
+                print(f"  TP{entrega.tp} {modo:<4} {entrega.alumno:<45} error: {error}")
+                hubo_error = True
+                continue
+            mostrar(entrega, modo, resultado)
+            ruta = ruta_linea_base(args.lineas_base, entrega, modo)
+
+            if args.comparar:
+                regresion = comparar_con_linea_base(ruta, resultado, args, datos_entorno)
+                if regresion is None:
+                    sin_comparar += 1
+                else:
+                    comparados += 1
+                    hubo_regresion = hubo_regresion or regresion
+
+            if args.guardar:
+                ruta.parent.mkdir(parents=True, exist_ok=True)
+                with open(ruta, "w", encoding="utf-8") as archivo:
+                    json.dump({
+                        "formato": VERSION_FORMATO,
+                        "generado": datetime.now().isoformat(timespec="seconds"),
+                        "commit": commit_actual(),
+                        "entorno": datos_entorno,
+                        "parametros": parametros(args),
+                        "resultado": resultado,
+                    }, archivo, ensure_ascii=False, indent=2)
+                    archivo.write("\n")
+
+    falta_comparar = False
+    if args.comparar:
+        if sin_comparar:
+            print(f"⚠️ {sin_comparar} de {comparados + sin_comparar} sin una línea base comparable")
+        # Si no se pudo comparar nada (por ej. otros --pedidos), no es un "sin regresiones"
+        falta_comparar = comparados == 0 or (args.estricto and sin_comparar > 0)
+        if hubo_regresion:
+            print("❌ Hay regresiones")
+        elif falta_comparar:
+            print("❌ No se comparó contra ninguna línea base" if comparados == 0
+                  else "❌ Faltan líneas base comparables (--estricto)")
+        else:
+            print(f"✅ Sin regresiones ({comparados} comparados)")
+    return 1 if hubo_regresion or hubo_error or falta_comparar else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Generador de carga para un TP (lo lanza bench.py, uno por TP y modo).
+
+Se corre con la carpeta del TP como directorio actual y escribe el resultado
+en JSON en el archivo de --salida (no por stdout: las apps de los alumnos
+imprimen cosas).
+
+Modos:
+    asgi   importa main.app y le habla directamente (httpx.ASGITransport), sin
+           red. El RSS máximo es el de este proceso: app más generador de carga.
+    http   levanta uvicorn main:app en un puerto libre y le pega por HTTP. El RSS
+           máximo es el del proceso de uvicorn.
+
+La secuencia de operaciones sale de --semilla: dos corridas con los mismos
+parámetros hacen los mismos pedidos (salvo el orden en que se intercalan).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from escenarios import ESCENARIOS, Escenario, Estado
+
+# ru_maxrss está en KB en Linux y en bytes en macOS; en Windows no hay resource
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def percentil(ordenadas: List[float], p: float) -> float:
+    """Percentil por rango más cercano de una lista ya ordenada"""
+    if not ordenadas:
+        return 0.0
+    indice = max(0, min(len(ordenadas) - 1, round(p / 100 * len(ordenadas)) - 1))
+    return ordenadas[indice]
+
+
+def resumir(latencias: List[float], errores: int) -> Dict[str, float]:
+    ordenadas = sorted(latencias)
+    return {
+        "pedidos": len(ordenadas),
+        "errores": errores,
+        "p50_ms": round(percentil(ordenadas, 50) * 1000, 3),
+        "p95_ms": round(percentil(ordenadas, 95) * 1000, 3),
+        "p99_ms": round(percentil(ordenadas, 99) * 1000, 3),
+        "max_ms": round(ordenadas[-1] * 1000, 3) if ordenadas else 0.0,
+    }
+
+
+def rss_maximo_mb(quien) -> Optional[float]:
+    if resource is None:
+        return None
+    kb = resource.getrusage(quien).ru_maxrss
+    if sys.platform == "darwin":
+        kb /= 1024
+    return round(kb / 1024, 1)
+
+
+async def correr_plan(cliente: httpx.AsyncClient, escenario: Escenario, estado: Estado,
+                      plan: List[str], concurrencia: int, rnd: random.Random):
+    """Reparte el plan entre `concurrencia` usuarios simultáneos; latencias por operación"""
+    latencias: Dict[str, List[float]] = {nombre: [] for nombre in escenario.operaciones}
+    errores: Dict[str, int] = {nombre: 0 for nombre in escenario.operaciones}
+    pendientes = iter(plan)
+
+    async def usuario():
+        for nombre in pendientes:  # el iterador es compartido: cada pedido lo toma un solo usuario
+            inicio = time.perf_counter()
+            try:
+                respuesta = await escenario.operaciones[nombre](cliente, estado, rnd)
+                fallo = respuesta.status_code >= 400
+            except httpx.HTTPError:
+                fallo = True
+            latencias[nombre].append(time.perf_counter() - inicio)
+            errores[nombre] += fallo
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(usuario() for _ in range(concurrencia)))
+    return time.perf_counter() - inicio, latencias, errores
+
+
+async def medir(cliente: httpx.AsyncClient, tp: int, args) -> dict:
+    escenario = ESCENARIOS[tp]
+    estado = Estado()
+    await escenario.preparar(cliente, estado)
+
+    rnd = random.Random(args.semilla)
+    nombres = list(escenario.pesos)
+    pesos = [escenario.pesos[n] for n in nombres]
+    calentamiento = rnd.choices(nombres, pesos, k=args.calentamiento)
+    plan = rnd.choices(nombres, pesos, k=args.pedidos)
+    await correr_plan(cliente, escenario, estado, calentamiento, args.concurrencia, rnd)
+    segundos, latencias, errores = await correr_plan(cliente, escenario, estado, plan, args.concurrencia, rnd)
+
+    todas = [t for lista in latencias.values() for t in lista]
+    return {
+        "escenario": escenario.nombre,
+        "segundos": round(segundos, 3),
+        "rps": round(len(todas) / segundos, 1),
+        **resumir(todas, sum(errores.values())),
+        "operaciones": {n: resumir(latencias[n], errores[n]) for n in nombres if latencias[n]},
+    }
+
+
+# ==================== MODOS ====================
+
+async def medir_asgi(tp: int, args) -> dict:
+    sys.path.insert(0, os.getcwd())
+    import main
+
+    # Como los tests: la BD se crea antes de usar la app (si la app no lo hace sola)
+    if callable(getattr(main, "init_db", None)):
+        main.init_db()
+    transporte = httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+            resultado = await medir(cliente, tp, args)
+    resultado["rss_max_mb"] = rss_maximo_mb(resource.RUSAGE_SELF) if resource else None
+    return resultado
+
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def esperar_servidor(url: str, proceso: subprocess.Popen, espera: float = 20.0):
+    limite = time.monotonic() + espera
+    async with httpx.AsyncClient() as cliente:
+        while time.monotonic() < limite and proceso.poll() is None:
+            try:
+                await cliente.get(f"{url}/", timeout=1)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("uvicorn main:app no arrancó")
+
+
+async def medir_http(tp: int, args) -> dict:
+    subprocess.run([sys.executable, "-c", "import main; getattr(main, 'init_db', lambda: None)()"], check=True)
+    puerto = puerto_libre()
+    url = f"http://127.0.0.1:{puerto}"
+    proceso = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+                                "--port", str(puerto), "--log-level", "warning", "--no-access-log"])
+    try:
+        await esperar_servidor(url, proceso)
+        limites = httpx.Limits(max_connections=args.concurrencia, max_keepalive_connections=args.concurrencia)
+        async with httpx.AsyncClient(base_url=url, limits=limites, timeout=30) as cliente:
+            resultado = await medir(cliente, tp, args)
+    finally:
+        proceso.terminate()
+        proceso.wait()
+    # Máximo entre los hijos que terminaron: uvicorn (el que creó la BD es mucho más chico)
+    resultado["rss_max_mb"] = rss_maximo_mb(resource.RUSAGE_CHILDREN) if resource else None
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tp", type=int, required=True, choices=sorted(ESCENARIOS))
+    parser.add_argument("--modo", choices=["asgi", "http"], default="asgi")
+    parser.add_argument("--pedidos", type=int, default=2000)
+    parser.add_argument("--concurrencia", type=int, default=16)
+    parser.add_argument("--calentamiento", type=int, default=100)
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--salida", required=True, help="Archivo JSON donde se escribe el resultado")
+    args = parser.parse_args(argv)
+
+    medir_modo = medir_asgi if args.modo == "asgi" else medir_http
+    resultado = asyncio.run(medir_modo(args.tp, args))
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump(resultado, archivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+# Escenarios de carga de cada TP de la Unidad 3.
+#
+# Un escenario prepara datos iniciales (sin medir) y después mezcla operaciones
+# con pesos parecidos al uso real: muchas lecturas, algunas altas, cambios y
+# bajas. Altas y bajas pesan lo mismo para que la cantidad de datos no crezca
+# durante la corrida y dos corridas con los mismos parámetros sean comparables.
+# Solo se usan endpoints pedidos en los enunciados, así sirve para cualquier alumno.
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+DESCRIPCIONES = ["Comprar leche", "Estudiar Python", "Pagar la luz", "Leer el apunte de FastAPI",
+                 "Preparar el parcial", "Llamar al médico", "Ordenar el escritorio", "Comprar pan"]
+PALABRAS = ["comprar", "estudiar", "fastapi", "parcial", "inexistente"]
+ESTADOS = ["pendiente", "en_progreso", "completada"]
+PRIORIDADES = ["baja", "media", "alta"]
+
+
+@dataclass
+class Estado:
+    """Ids que existen en la app en cada momento (los eligen las operaciones)"""
+    tareas: List[int] = field(default_factory=list)
+    proyectos: List[int] = field(default_factory=list)
+
+
+Operacion = Callable[[httpx.AsyncClient, Estado, random.Random], Awaitable[httpx.Response]]
+
+
+@dataclass
+class Escenario:
+    nombre: str
+    preparar: Callable[[httpx.AsyncClient, Estado], Awaitable[None]]
+    operaciones: Dict[str, Operacion]
+    pesos: Dict[str, int]
+
+
+def id_de(respuesta: httpx.Response) -> Optional[int]:
+    """Id del objeto creado (algunos TPs lo devuelven dentro de otra clave)"""
+    try:
+        datos = respuesta.json()
+    except ValueError:
+        return None
+    if isinstance(datos, dict):
+        if isinstance(datos.get("id"), int):
+            return datos["id"]
+        for valor in datos.values():
+            if isinstance(valor, dict) and isinstance(valor.get("id"), int):
+                return valor["id"]
+    return None
+
+
+@contextmanager
+def reservada(ids: List[int], rnd: random.Random):
+    """Saca un id al azar mientras se usa, para que otro usuario no lo borre en el medio
+    (el 404 sería culpa del escenario, no de la app)"""
+    i = ids.pop(rnd.randrange(len(ids)))
+    try:
+        yield i
+    finally:
+        ids.append(i)
+
+
+def nueva_tarea(rnd: random.Random, con_prioridad: bool) -> dict:
+    tarea = {"descripcion": rnd.choice(DESCRIPCIONES), "estado": rnd.choice(ESTADOS)}
+    if con_prioridad:
+        tarea["prioridad"] = rnd.choice(PRIORIDADES)
+    return tarea
+
+
+# ==================== TP1: AGENDA ====================
+
+async def _raiz(cliente, estado, rnd):
+    return await cliente.get("/")
+
+
+async def _contactos(cliente, estado, rnd):
+    return await cliente.get("/contactos")
+
+
+async def _sin_preparar(cliente, estado):
+    pass
+
+
+# ==================== TP2 y TP3: TAREAS ====================
+
+def operaciones_tareas(con_prioridad: bool) -> Dict[str, Operacion]:
+    async def crear(cliente, estado, rnd):
+        respuesta = await cliente.post("/tareas", json=nueva_tarea(rnd, con_prioridad))
+        nuevo = id_de(respuesta)
+        if nuevo is not None:
+            estado.tareas.append(nuevo)
+        return respuesta
+
+    async def eliminar(cliente, estado, rnd):
+        if not estado.tareas:
+            return await crear(cliente, estado, rnd)
+        tarea_id = estado.tareas.pop(rnd.randrange(len(estado.tareas)))
+        return await cliente.delete(f"/tareas/{tarea_id}")
+
+    async def actualizar(cliente, estado, rnd):
+        if not estado.tareas:
+            return await crear(cliente, estado, rnd)
+        with reservada(estado.tareas, rnd) as tarea_id:
+            return await cliente.put(f"/tareas/{tarea_id}", json={"estado": rnd.choice(ESTADOS)})
+
+    operaciones = {
+        "listar": lambda cliente, estado, rnd: cliente.get("/tareas"),
+        "filtrar_estado": lambda cliente, estado, rnd: cliente.get("/tareas", params={"estado": rnd.choice(ESTADOS)}),
+        "buscar_texto": lambda cliente, estado, rnd: cliente.get("/tareas", params={"texto": rnd.choice(PALABRAS)}),
+        "resumen": lambda cliente, estado, rnd: cliente.get("/tareas/resumen"),
+        "crear": crear,
+        "actualizar": actualizar,
+        "eliminar": eliminar,
+        "completar_todas": lambda cliente, estado, rnd: cliente.put("/tareas/completar_todas"),
+    }
+    if con_prioridad:
+        operaciones["filtrar_prioridad"] = lambda cliente, estado, rnd: cliente.get(
+            "/tareas", params={"prioridad": rnd.choice(PRIORIDADES), "estado": rnd.choice(ESTADOS)})
+        operaciones["ordenar"] = lambda cliente, estado, rnd: cliente.get(
+            "/tareas", params={"orden": rnd.choice(["asc", "desc"])})
+    return operaciones
+
+
+def preparar_tareas(cantidad: int, con_prioridad: bool):
+    async def preparar(cliente, estado):
+        rnd = random.Random(0)
+        crear = operaciones_tareas(con_prioridad)["crear"]
+        for _ in range(cantidad):
+            await crear(cliente, estado, rnd)
+    return preparar
+
+
+PESOS_TAREAS = {"listar": 25, "filtrar_estado": 15, "buscar_texto": 15, "resumen": 10,
+                "crear": 10, "actualizar": 14, "eliminar": 10, "completar_todas": 1}
+
+
+# ==================== TP4: PROYECTOS Y TAREAS ====================
+
+async def _crear_tarea_de_proyecto(cliente, estado, rnd):
+    proyecto_id = rnd.choice(estado.proyectos)
+    respuesta = await cliente.post(f"/proyectos/{proyecto_id}/tareas", json=nueva_tarea(rnd, True))
+    nuevo = id_de(respuesta)
+    if nuevo is not None:
+        estado.tareas.append(nuevo)
+    return respuesta
+
+
+async def _actualizar_tarea_de_proyecto(cliente, estado, rnd):
+    if not estado.tareas:
+        return await _crear_tarea_de_proyecto(cliente, estado, rnd)
+    with reservada(estado.tareas, rnd) as tarea_id:
+        return await cliente.put(f"/tareas/{tarea_id}",
+                                 json={"estado": rnd.choice(ESTADOS), "prioridad": rnd.choice(PRIORIDADES)})
+
+
+async def _eliminar_tarea_de_proyecto(cliente, estado, rnd):
+    if not estado.tareas:
+        return await _crear_tarea_de_proyecto(cliente, estado, rnd)
+    tarea_id = estado.tareas.pop(rnd.randrange(len(estado.tareas)))
+    return await cliente.delete(f"/tareas/{tarea_id}")
+
+
+OPERACIONES_PROYECTOS: Dict[str, Operacion] = {
+    "listar_proyectos": lambda cliente, estado, rnd: cliente.get("/proyectos"),
+    "ver_proyecto": lambda cliente, estado, rnd: cliente.get(f"/proyectos/{rnd.choice(estado.proyectos)}"),
+    "tareas_proyecto": lambda cliente, estado, rnd: cliente.get(f"/proyectos/{rnd.choice(estado.proyectos)}/tareas"),
+    "filtrar_tareas": lambda cliente, estado, rnd: cliente.get(
+        "/tareas", params={"estado": rnd.choice(ESTADOS), "prioridad": rnd.choice(PRIORIDADES)}),
+    "resumen_proyecto": lambda cliente, estado, rnd: cliente.get(f"/proyectos/{rnd.choice(estado.proyectos)}/resumen"),
+    "resumen": lambda cliente, estado, rnd: cliente.get("/resumen"),
+    "crear_tarea": _crear_tarea_de_proyecto,
+    "actualizar_tarea": _actualizar_tarea_de_proyecto,
+    "eliminar_tarea": _eliminar_tarea_de_proyecto,
+}
+
+PESOS_PROYECTOS = {"listar_proyectos": 10, "ver_proyecto": 10, "tareas_proyecto": 20, "filtrar_tareas": 15,
+                   "resumen_proyecto": 8, "resumen": 5, "crear_tarea": 10, "actualizar_tarea": 12,
+                   "eliminar_tarea": 10}
+
+
+async def _preparar_proyectos(cliente, estado, proyectos: int = 20, tareas_por_proyecto: int = 10):
+    rnd = random.Random(0)
+    for i in range(proyectos):
+        respuesta = await cliente.post("/proyectos", json={"nombre": f"Proyecto {i}",
+                                                           "descripcion": f"Proyecto de prueba {i}"})
+        nuevo = id_de(respuesta)
+        if nuevo is None:
+            raise RuntimeError(f"POST /proyectos no devolvió un id ({respuesta.status_code})")
+        estado.proyectos.append(nuevo)
+    for _ in range(proyectos * tareas_por_proyecto):
+        await _crear_tarea_de_proyecto(cliente, estado, rnd)
+
+
+ESCENARIOS: Dict[int, Escenario] = {
+    1: Escenario("agenda", _sin_preparar, {"raiz": _raiz, "contactos": _contactos}, {"raiz": 1, "contactos": 9}),
+    2: Escenario("tareas en memoria", preparar_tareas(200, False), operaciones_tareas(False), PESOS_TAREAS),
+    3: Escenario("tareas en SQLite", preparar_tareas(200, True), operaciones_tareas(True),
+                 dict(PESOS_TAREAS, filtrar_prioridad=8, ordenar=7)),
+    4: Escenario("proyectos y tareas", _preparar_proyectos, OPERACIONES_PROYECTOS, PESOS_PROYECTOS),
+}